@@ -0,0 +1,577 @@
+import argparse
+import ast
+import json
+import os
+from itertools import chain
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from ExtractorMetbull import CAMPOS_BASICOS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow las etapas siguen intercambiando CSV
+    pa = pq = None
+
+# -------------------------------------------------------------------
+# Formato de intercambio columnar (Parquet / Arrow IPC)
+# -------------------------------------------------------------------
+# Las etapas se pasaban CSV: los dicts anidados salían como texto y se
+# recuperaban con ast.literal_eval, y todo se releía con dtype=str. Aquí
+# cada tabla tiene un esquema real:
+#   - lat/lon/masa en float64 y años en int64,
+#   - basic_info y classification como struct, geography y Data_MB109
+#     como map<string, string>, images como struct con lista de fotos,
+#   - <base>.parquet (zstd, compacto) o <base>.arrow (IPC sin comprimir:
+#     se lee con memory-map sin copiar),
+#   - lectura de solo las columnas pedidas,
+#   - el CSV se sigue exportando junto al archivo columnar.
+# Al leer se usa el archivo más reciente de <base>.arrow/.parquet/.csv.
+# leer_tabla y leer_bloques aceptan también una lista de rutas base (las
+# particiones de un directorio, p. ej. una por país) y las unen al leer.
+
+EXTENSIONES = (".arrow", ".parquet", ".csv")    # a igual fecha, el primero gana
+FORMATOS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+TEXTO, REAL, ENTERO = "texto", "real", "entero"
+BASIC_INFO, CLASIFICACION, PARES, IMAGENES = "basic_info", "classification", "pares", "imagenes"
+ANIDADOS = {BASIC_INFO, CLASIFICACION, PARES, IMAGENES}
+
+CAMPOS_BASIC_INFO = [c.replace(":", "") for c in CAMPOS_BASICOS]
+CAMPOS_FOTO = ["autor", "referencia", "foto_original"]
+
+# Columnas no listadas → texto
+COLUMNAS_CNEOS = {
+    "date": TEXTO, "energy": REAL, "impact-e": REAL, "lat": REAL, "lat-dir": TEXTO,
+    "lon": REAL, "lon-dir": TEXTO, "alt": REAL, "vel": REAL,
+}
+
+COLUMNAS_PRELIMPIEZA = {
+    "Mass_grams": REAL,
+    "basic_info": BASIC_INFO,
+    "classification": CLASIFICACION,
+    "geography": PARES,
+    "Data_MB109": PARES,
+    "images": IMAGENES,
+}
+
+COLUMNAS_METBULL = {
+    "Name": TEXTO, "Year": ENTERO, "Mass": REAL, "Country": TEXTO, "Type": TEXTO,
+    "Place": TEXTO, "Status": TEXTO, "Fall": TEXTO,
+    "basic_name": TEXTO, "basic_abbrev": TEXTO, "basic_fall": TEXTO,
+    "basic_yearFound": ENTERO, "basic_country": TEXTO,
+    "classification_recomend": TEXTO,
+    "coordinadesExact": TEXTO, "coordinadesLat": REAL, "coordinadesLon": REAL,
+    "coordinadesRecomend": TEXTO, "coordinadesLatRecomend": REAL, "coordinadesLonRecomend": REAL,
+}
+
+ESQUEMAS = {
+    "meteoritos_NasaCNEOS": COLUMNAS_CNEOS,
+    "meteoritos_Metbull_PreLimpieza": COLUMNAS_PRELIMPIEZA,
+    "meteoritos_Metbull": COLUMNAS_METBULL,
+}
+
+
+def disponible():
+    return pa is not None
+
+
+def esquema_para(ruta):
+    """Columnas tipadas según el nombre del archivo (meteoritos_NasaCNEOS.csv → COLUMNAS_CNEOS)."""
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    return ESQUEMAS.get(base, {})
+
+
+# -------------------------------------------------------------------
+# pandas → Arrow
+# -------------------------------------------------------------------
+
+def _tipo_arrow(tipo):
+    texto = pa.string()
+    return {
+        TEXTO: texto,
+        REAL: pa.float64(),
+        ENTERO: pa.int64(),
+        BASIC_INFO: pa.struct([(c, texto) for c in CAMPOS_BASIC_INFO]),
+        CLASIFICACION: pa.struct([("Recommended", texto)]),
+        PARES: pa.map_(texto, texto),
+        IMAGENES: pa.struct([("fotos", pa.list_(pa.struct([(c, texto) for c in CAMPOS_FOTO])))]),
+    }[tipo]
+
+
+def _nulo(valor):
+    return valor is None or (isinstance(valor, float) and valor != valor) or valor is pd.NA
+
+
+def _texto(valor):
+    return None if _nulo(valor) else str(valor)
+
+
+def _dict(valor):
+    """Dict tal cual, o el que había en el CSV como texto; cualquier otra cosa → None."""
+    if isinstance(valor, str) and valor.startswith("{"):
+        try:
+            valor = ast.literal_eval(valor)
+        except (ValueError, SyntaxError):
+            return None
+    return valor if isinstance(valor, dict) else None
+
+
+# repr de Python → JSON, en este orden (\x01 guarda las comillas simples escapadas)
+_REEMPLAZOS_JSON = [("\\'", "\x01"), ('"', '\\"'), ("'", '"'), ("\x01", "'"),
+                    (": None", ": null"), (", None", ", null"), ("[None", "[null")]
+
+
+def _a_json(textos):
+    """
+    Series de repr de Python → Series de JSON (reemplazos de texto por
+    columna). Los que traen escapes que no se traducen así (\\\\, \\u)
+    quedan en "null" y esas filas van por literal_eval.
+    """
+    sin_traduccion = textos.str.contains(r"\\\\|\\[uU]", regex=True)
+    for viejo, nuevo in _REEMPLAZOS_JSON:
+        textos = textos.str.replace(viejo, nuevo, regex=False)
+    return textos.mask(sin_traduccion, "null")
+
+
+def _json_o_none(candidato):
+    try:
+        return json.loads(candidato)
+    except ValueError:
+        return None
+
+
+def dicts_desde_texto(valores):
+    """
+    Columna de dicts escritos en el CSV como repr de Python → lista de dicts,
+    sin ast.literal_eval por fila: se traduce a JSON, se decodifica toda la
+    columna con un solo json.loads y cada fila se verifica con
+    repr(dict) == texto (literal_eval(repr(x)) == x). Las que no pasan van por
+    literal_eval; el texto que no es un dict queda en None y lo demás, igual.
+    """
+    serie = pd.Series(valores).reset_index(drop=True)
+    try:
+        es_dict = serie.str.startswith("{", na=False).to_numpy(dtype=bool)
+    except AttributeError:      # sin ningún texto (todo vacío, o ya son dicts)
+        es_dict = np.zeros(len(serie), dtype=bool)
+    valores = [None if isinstance(v, str) else v for v in serie.tolist()]
+    if not es_dict.any():
+        return valores
+    textos = serie[es_dict]
+    candidatos = _a_json(textos).tolist()
+    textos = textos.tolist()
+    try:
+        decodificados = json.loads("[" + ",".join(candidatos) + "]")
+        if len(decodificados) != len(textos):
+            raise ValueError("filas desalineadas")
+    except ValueError:
+        decodificados = [_json_o_none(c) for c in candidatos]
+
+    for i, texto, d in zip(np.flatnonzero(es_dict).tolist(), textos, decodificados):
+        valores[i] = d if isinstance(d, dict) and repr(d) == texto else _dict(texto)
+    return valores
+
+
+def _anidado(tipo, valor):
+    d = _dict(valor)
+    if d is None:
+        return None
+    if tipo == BASIC_INFO:
+        return {c: _texto(d.get(c)) for c in CAMPOS_BASIC_INFO}
+    if tipo == CLASIFICACION:
+        return {"Recommended": _texto(d.get("Recommended"))}
+    if tipo == PARES:
+        return [(str(k), _texto(v)) for k, v in d.items()]
+    # IMAGENES: las entradas que no son dict ("No hay información") no aportan fotos
+    fotos = d.get("fotos")
+    if not isinstance(fotos, list):
+        return {"fotos": None}
+    return {"fotos": [{c: _texto(f.get(c)) for c in CAMPOS_FOTO} for f in fotos if isinstance(f, dict)]}
+
+
+def _columna_arrow(serie, tipo):
+    if tipo == REAL:
+        return pa.array(pd.to_numeric(serie, errors="coerce"), type=pa.float64(), from_pandas=True)
+    if tipo == ENTERO:
+        return pa.array(pd.to_numeric(serie, errors="coerce").astype("Int64"), type=pa.int64())
+    if tipo == TEXTO:
+        try:    # columna de textos y vacíos: conversión directa
+            return pa.array(serie, type=pa.string(), from_pandas=True)
+        except pa.ArrowTypeError:   # con números u otros objetos: str() de cada uno
+            return pa.array([_texto(v) for v in serie], type=pa.string())
+    return pa.array([_anidado(tipo, v) for v in serie], type=_tipo_arrow(tipo))
+
+
+def a_tabla_arrow(df, columnas=None):
+    """DataFrame → pyarrow.Table con los tipos de `columnas` (el resto, texto)."""
+    columnas = columnas or {}
+    tipos = [columnas.get(c, TEXTO) for c in df.columns]
+    return pa.Table.from_arrays(
+        [_columna_arrow(df[c], t) for c, t in zip(df.columns, tipos)],
+        schema=pa.schema([(str(c), _tipo_arrow(t)) for c, t in zip(df.columns, tipos)]),
+    )
+
+
+# -------------------------------------------------------------------
+# Arrow → pandas
+# -------------------------------------------------------------------
+
+def _objetos_python(columna):
+    """Columna anidada → dicts/listas de Python (map → dict), como los devolvía literal_eval."""
+    es_map = pa.types.is_map(columna.type)
+    return [dict(v) if es_map and v is not None else v for v in columna.to_pylist()]
+
+
+def a_dataframe(tabla):
+    """pyarrow.Table → DataFrame: enteros con nulos como Int64 y columnas anidadas como dicts."""
+    anidadas = [c for c, t in zip(tabla.column_names, tabla.schema.types) if pa.types.is_nested(t)]
+    planas = tabla.drop_columns(anidadas) if anidadas else tabla
+    df = planas.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    for c in anidadas:
+        df[c] = _objetos_python(tabla.column(c))
+    return df[tabla.column_names]
+
+
+# -------------------------------------------------------------------
+# Escritura y lectura
+# -------------------------------------------------------------------
+
+def _reemplazar(ruta, escribir):
+    """Escribe en <ruta>.tmp y renombra: el destino nunca queda a medio escribir."""
+    temporal = ruta + ".tmp"
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def guardar_tabla(df, ruta_base, columnas=None, formato="parquet", csv=True):
+    """
+    Guarda df como <ruta_base>.parquet (o .arrow) con el esquema `columnas` y,
+    si `csv`, exporta también <ruta_base>.csv. Sin pyarrow solo se escribe el
+    CSV (y se borra el columnar anterior para que no se lea uno desactualizado).
+    Devuelve las rutas escritas.
+    """
+    escritas = []
+    if csv or pa is None:   # antes que el columnar: a igual fecha se lee el columnar
+        ruta = ruta_base + ".csv"
+        _reemplazar(ruta, lambda destino: df.to_csv(destino, index=False, encoding="utf-8"))
+        escritas.append(ruta)
+
+    if pa is not None:
+        tabla = a_tabla_arrow(df, columnas)
+        ruta = ruta_base + FORMATOS[formato]
+        if formato == "arrow":
+            def escribir(destino):
+                with pa.OSFile(destino, "wb") as f, pa.ipc.new_file(f, tabla.schema) as escritor:
+                    escritor.write_table(tabla)
+        else:
+            def escribir(destino):
+                pq.write_table(tabla, destino, compression="zstd")
+        _reemplazar(ruta, escribir)
+        escritas.append(ruta)
+    else:
+        for extension in FORMATOS.values():
+            if os.path.exists(ruta_base + extension):
+                os.remove(ruta_base + extension)
+    return escritas
+
+
+def ruta_existente(ruta_base):
+    """El archivo más reciente de <ruta_base>.arrow/.parquet/.csv que se pueda leer, o None."""
+    candidatos = []
+    for preferencia, extension in enumerate(EXTENSIONES):
+        ruta = ruta_base + extension
+        if os.path.exists(ruta) and (extension == ".csv" or pa is not None):
+            candidatos.append((os.path.getmtime(ruta), -preferencia, ruta))
+    return max(candidatos)[2] if candidatos else None
+
+
+def leer_tabla_arrow(ruta, columnas=None):
+    """
+    pyarrow.Table de un .arrow (memory-map, sin copia) o .parquet, solo con
+    las `columnas` pedidas que existan.
+    """
+    if ruta.endswith(".arrow"):
+        tabla = pa.ipc.open_file(pa.memory_map(ruta, "r")).read_all()
+        if columnas is not None:
+            tabla = tabla.select([c for c in columnas if c in tabla.column_names])
+        return tabla
+    if columnas is not None:
+        nombres = pq.read_schema(ruta).names
+        columnas = [c for c in columnas if c in nombres]
+    return pq.read_table(ruta, columns=columnas, memory_map=True)
+
+
+def _leer_csv_texto(ruta, columnas=None):
+    """CSV con todo como texto; con pyarrow, su lector (varias veces más rápido que el de pandas)."""
+    if columnas is not None:
+        cabecera = pd.read_csv(ruta, nrows=0).columns
+        columnas = [c for c in cabecera if c in columnas]
+    if pa is not None:
+        try:
+            return pd.read_csv(ruta, usecols=columnas, dtype=str, engine="pyarrow")
+        except (ValueError, pa.ArrowInvalid):    # CSV que el lector de Arrow no acepta
+            pass
+    return pd.read_csv(ruta, low_memory=False, usecols=columnas, dtype=str)
+
+
+def leer_tabla(ruta_base, columnas=None, esquema=None):
+    """
+    DataFrame desde el archivo más reciente de <ruta_base>.arrow/.parquet/.csv
+    (None si no hay ninguno). El CSV se lee como texto y se le aplican los
+    tipos de `esquema` (números, años Int64 y anidadas como dicts), igual
+    que del columnar. Con una lista de rutas base, las concatena.
+    """
+    if isinstance(ruta_base, (list, tuple)):
+        partes = [df for df in (leer_tabla(b, columnas, esquema) for b in ruta_base) if df is not None]
+        if not partes:
+            return None
+        con_filas = [df for df in partes if len(df)] or partes[:1]
+        return pd.concat(con_filas, ignore_index=True) if len(con_filas) > 1 else con_filas[0]
+    ruta = ruta_existente(ruta_base)
+    if ruta is None:
+        return None
+    if not ruta.endswith(".csv"):
+        return a_dataframe(leer_tabla_arrow(ruta, columnas))
+
+    return _tipar(_leer_csv_texto(ruta, columnas), esquema)
+
+
+def _tipar(df, esquema, anidadas=True):
+    """Aplica a df los tipos de `esquema`: números, años Int64 y (si `anidadas`) dicts."""
+    for c, tipo in (esquema or {}).items():
+        if c not in df.columns:
+            continue
+        if tipo in ANIDADOS:
+            if anidadas:
+                df[c] = dicts_desde_texto(df[c])
+        elif tipo == REAL:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+        elif tipo == ENTERO:
+            numeros = pd.to_numeric(df[c], errors="coerce")
+            try:
+                df[c] = numeros.astype("Int64")
+            except TypeError:   # con decimales: se queda en float
+                df[c] = numeros
+    return df
+
+
+def registros_texto(df):
+    """
+    Lista de dicts con todo como texto y "" en los vacíos, como
+    read_csv(dtype=str).fillna(""). Los float salen en forma canónica
+    ("75" del API → "75.0"), igual lean del CSV o del columnar.
+    """
+    texto = pd.DataFrame(index=df.index)
+    for c in df.columns:
+        serie = df[c]
+        if pd.api.types.is_float_dtype(serie):
+            texto[c] = [repr(v) if v == v else "" for v in serie]
+        else:
+            texto[c] = [_texto(v) or "" for v in serie]
+    return texto.to_dict(orient="records")
+
+
+# -------------------------------------------------------------------
+# Lectura y escritura por bloques (memoria acotada)
+# -------------------------------------------------------------------
+
+def leer_bloques(ruta_base, filas, columnas=None):
+    """
+    DataFrames de a lo sumo `filas` filas desde el archivo más reciente de
+    <ruta_base>.arrow/.parquet/.csv, sin cargar la tabla entera. Del CSV todo
+    llega como texto (también las anidadas); del columnar, con sus tipos.
+    Con una lista de rutas base, las recorre en orden (un bloque no mezcla dos).
+    """
+    if isinstance(ruta_base, (list, tuple)):
+        yield from chain.from_iterable(leer_bloques(b, filas, columnas) for b in ruta_base)
+        return
+    ruta = ruta_existente(ruta_base)
+    if ruta is None:
+        return
+    if ruta.endswith(".csv"):
+        if columnas is not None:
+            cabecera = pd.read_csv(ruta, nrows=0).columns
+            columnas = [c for c in cabecera if c in columnas]
+        with pd.read_csv(ruta, usecols=columnas, dtype=str, chunksize=filas) as lector:
+            yield from lector
+    elif ruta.endswith(".arrow"):
+        # memory-map: solo se copia a memoria el bloque que se convierte
+        tabla = leer_tabla_arrow(ruta, columnas)
+        for inicio in range(0, tabla.num_rows, filas):
+            yield a_dataframe(tabla.slice(inicio, filas))
+    else:
+        archivo = pq.ParquetFile(ruta, memory_map=True)
+        if columnas is not None:
+            columnas = [c for c in columnas if c in archivo.schema_arrow.names]
+        for lote in archivo.iter_batches(batch_size=filas, columns=columnas):
+            yield a_dataframe(pa.Table.from_batches([lote]))
+
+
+class EscritorTabla:
+    """
+    Escribe <ruta_base>.csv y .parquet/.arrow de a un bloque por vez, con el
+    esquema `columnas` (como guardar_tabla, pero sin tener la tabla entera).
+    Los números del CSV se escriben con el tipo del esquema y no con el que
+    infiera cada bloque: un año sale "1999" aunque el bloque traiga vacíos.
+    Los destinos se reemplazan al cerrar (al salir del `with`; rutas en
+    .escritas); si algo falla, quedan los anteriores.
+    """
+
+    def __init__(self, ruta_base, columnas=None, formato="parquet", csv=True):
+        self.ruta_base = ruta_base
+        self.columnas = columnas or {}
+        self.formato = formato
+        self.csv = csv or pa is None
+        self.filas = 0
+        self.escritas = []
+        self._nombres = None
+        self._archivo_csv = None
+        self._archivo_columnar = None
+        self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self._descartar()
+
+    def _temporal(self, extension):
+        return self.ruta_base + extension + ".tmp"
+
+    def _abrir(self, df):
+        self._nombres = list(df.columns)
+        if self.csv:
+            self._archivo_csv = open(self._temporal(".csv"), "w", encoding="utf-8", newline="")
+        if pa is not None:
+            esquema = pa.schema([(str(c), _tipo_arrow(self.columnas.get(c, TEXTO))) for c in self._nombres])
+            destino = self._temporal(FORMATOS[self.formato])
+            if self.formato == "arrow":
+                self._archivo_columnar = pa.OSFile(destino, "wb")
+                self._escritor = pa.ipc.new_file(self._archivo_columnar, esquema)
+            else:
+                self._escritor = pq.ParquetWriter(destino, esquema, compression="zstd")
+
+    def escribir(self, df):
+        """Agrega las filas de df (mismas columnas que el primer bloque; los vacíos se saltan)."""
+        if not len(df):
+            return
+        primero = self._nombres is None
+        if primero:
+            self._abrir(df)
+        df = _tipar(df[self._nombres].copy(), self.columnas, anidadas=False)
+        if self._archivo_csv is not None:
+            df.to_csv(self._archivo_csv, index=False, header=primero)
+        if self._escritor is not None:
+            self._escritor.write_table(a_tabla_arrow(df, self.columnas))
+        self.filas += len(df)
+
+    def _cerrar_archivos(self):
+        if self._archivo_csv is not None:
+            self._archivo_csv.close()
+        if self._escritor is not None:
+            self._escritor.close()
+        if self._archivo_columnar is not None:
+            self._archivo_columnar.close()
+
+    def _descartar(self):
+        self._cerrar_archivos()
+        for extension in (".csv", *FORMATOS.values()):
+            if os.path.exists(self._temporal(extension)):
+                os.remove(self._temporal(extension))
+
+    def cerrar(self):
+        """Reemplaza los destinos (CSV antes que el columnar) y devuelve las rutas escritas."""
+        if self._nombres is None:   # ningún bloque con filas: como guardar_tabla de un df vacío
+            self.escritas = guardar_tabla(pd.DataFrame(), self.ruta_base, self.columnas, self.formato, self.csv)
+            return self.escritas
+        self._cerrar_archivos()
+        extensiones = ([".csv"] if self.csv else []) + ([FORMATOS[self.formato]] if pa is not None else [])
+        for extension in extensiones:
+            os.replace(self._temporal(extension), self.ruta_base + extension)
+            self.escritas.append(self.ruta_base + extension)
+        if pa is None:
+            for extension in FORMATOS.values():
+                if os.path.exists(self.ruta_base + extension):
+                    os.remove(self.ruta_base + extension)
+        return self.escritas
+
+
+# -------------------------------------------------------------------
+# Tablas particionadas: un archivo por clave dentro de un directorio
+# -------------------------------------------------------------------
+# Cada partición se escribe entera y de forma atómica en cuanto está lista
+# (p. ej. un país del crawl); no hay archivo unido: quien lee pasa la lista
+# de rutas base a leer_tabla / leer_bloques.
+
+def ruta_particion(directorio, clave):
+    """Ruta base de la partición `clave` (el nombre de archivo la codifica)."""
+    return os.path.join(directorio, quote(clave, safe=""))
+
+
+def guardar_particion(df, directorio, clave, columnas=None, formato="parquet"):
+    """Guarda la partición (solo columnar; sin pyarrow, CSV) y devuelve las rutas escritas."""
+    os.makedirs(directorio, exist_ok=True)
+    return guardar_tabla(df, ruta_particion(directorio, clave), columnas, formato, csv=False)
+
+
+def particiones(directorio):
+    """{clave: ruta base} de las particiones guardadas en `directorio` (las .tmp no cuentan)."""
+    if not os.path.isdir(directorio):
+        return {}
+    claves = {}
+    for nombre in sorted(os.listdir(directorio)):
+        base, extension = os.path.splitext(nombre)
+        if extension in EXTENSIONES and ruta_existente(os.path.join(directorio, base)):
+            claves[unquote(base)] = os.path.join(directorio, base)
+    return claves
+
+
+def fecha_particiones(directorio):
+    """Fecha de modificación de la partición más reciente (None si no hay)."""
+    fechas = [os.path.getmtime(ruta_existente(b)) for b in particiones(directorio).values()]
+    return max(fechas) if fechas else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intercambio columnar de las tablas de CargarDatos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_convertir = sub.add_parser("convertir", help="CSV → Parquet/Arrow con el esquema según el nombre")
+    p_convertir.add_argument("csv")
+    p_convertir.add_argument("--formato", choices=sorted(FORMATOS), default="parquet")
+
+    p_exportar = sub.add_parser("exportar", help="Parquet/Arrow → CSV")
+    p_exportar.add_argument("ruta")
+
+    p_esquema = sub.add_parser("esquema", help="Muestra el esquema y las filas de un Parquet/Arrow")
+    p_esquema.add_argument("ruta")
+
+    args = parser.parse_args()
+    if pa is None:
+        parser.error("pyarrow no está instalado")
+
+    if args.comando == "convertir":
+        base = os.path.splitext(args.csv)[0]
+        df = pd.read_csv(args.csv, low_memory=False)    # los dicts en texto se convierten al guardar
+        for ruta in guardar_tabla(df, base, esquema_para(args.csv), formato=args.formato, csv=False):
+            print(f"✅ {len(df)} filas → {ruta}")
+    elif args.comando == "exportar":
+        base = os.path.splitext(args.ruta)[0]
+        df = a_dataframe(leer_tabla_arrow(args.ruta))
+        df.to_csv(base + ".csv", index=False, encoding="utf-8")
+        print(f"✅ {len(df)} filas → {base}.csv")
+    else:
+        tabla = leer_tabla_arrow(args.ruta)
+        print(tabla.schema)
+        print(f"📦 {tabla.num_rows} filas")
@@ -0,0 +1,171 @@
+import json
+import os
+import stat
+import tempfile
+import textwrap
+import threading
+
+# -------------------------------------------------------------------
+# Almacén de resultados en JSONL (solo anexar) + compactación atómica
+# -------------------------------------------------------------------
+
+
+def normalizar_anio(anio):
+    """
+    Año como texto canónico para las claves: 873, 873.0, "873" y "873.0" → "873"
+    (según de dónde se leyó, el mismo año llega como entero o como float).
+    Lo que no es un número entero queda como str().
+    """
+    texto = str(anio).strip()
+    try:
+        numero = float(texto)
+    except ValueError:
+        return texto
+    return str(int(numero)) if numero.is_integer() else texto
+
+
+def clave_registro(registro):
+    """Clave de deduplicación (name, year), con el año normalizado."""
+    return registro.get("name"), normalizar_anio(registro.get("year"))
+
+
+class EscritorJsonl:
+    """
+    Anexa un registro por línea a medida que se terminan (O(1) por registro).
+    Es seguro entre hilos; una caída solo puede dejar incompleta la última línea,
+    que leer_jsonl descarta.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        self.escritos = 0
+
+    def escribir(self, registro):
+        linea = json.dumps(registro, ensure_ascii=False, default=str)
+        with self._lock:
+            self._archivo.write(linea + "\n")
+            self._archivo.flush()
+            self.escritos += 1
+
+    def cerrar(self):
+        with self._lock:
+            if not self._archivo.closed:
+                self._archivo.flush()
+                os.fsync(self._archivo.fileno())
+                self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def leer_jsonl(ruta):
+    """Genera los registros del JSONL uno a uno (memoria constante)."""
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r", encoding="utf-8") as f:
+        for num, linea in enumerate(f, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                print(f"⚠️ Línea {num} incompleta en {os.path.basename(ruta)}, se ignora.")
+
+
+def _indice_ultimas(ruta):
+    """
+    Recorre el JSONL y devuelve {clave: offset de su última aparición},
+    en orden de primera aparición (igual que el dict del antiguo guardar_total).
+    Solo se guardan claves y offsets, no los registros.
+    """
+    indice = {}
+    with open(ruta, "rb") as f:
+        while True:
+            offset = f.tell()
+            linea = f.readline()
+            if not linea:
+                break
+            try:
+                registro = json.loads(linea)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            indice[clave_registro(registro)] = offset
+    return indice
+
+
+def _registros_en(ruta, offsets):
+    with open(ruta, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            yield json.loads(f.readline())
+
+
+def _permisos_destino(ruta):
+    """Permisos del destino si ya existe; si no, los que daría open() con la umask actual."""
+    try:
+        return stat.S_IMODE(os.stat(ruta).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def escribir_atomico(ruta, escribir):
+    """
+    Escribe un archivo a través de un temporal en el mismo directorio y lo
+    renombra al final: el destino nunca queda a medio escribir. Conserva los
+    permisos de un open() normal (mkstemp crea el temporal con 0600).
+    """
+    directorio = os.path.dirname(ruta) or "."
+    fd, temporal = tempfile.mkstemp(prefix=".tmp_", dir=directorio)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            escribir(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporal, _permisos_destino(ruta))
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def compactar(ruta_jsonl, ruta_json=None):
+    """
+    Deduplica el JSONL por (name, year) quedándose con la última versión.
+    Reescribe el JSONL compactado y, si se indica, exporta el arreglo JSON
+    (formato indent=2 que consume ImportJsontoSql.js). Ambos de forma atómica.
+    Devuelve el número de registros únicos.
+    """
+    if not os.path.exists(ruta_jsonl):
+        return 0
+
+    offsets = list(_indice_ultimas(ruta_jsonl).values())
+
+    if ruta_json:
+        def escribir_json(f):
+            if not offsets:
+                f.write("[]")
+                return
+            f.write("[\n")
+            for i, registro in enumerate(_registros_en(ruta_jsonl, offsets)):
+                if i:
+                    f.write(",\n")
+                f.write(textwrap.indent(json.dumps(registro, ensure_ascii=False, indent=2, default=str), "  "))
+            f.write("\n]")
+
+        escribir_atomico(ruta_json, escribir_json)
+
+    def escribir_jsonl(f):
+        for registro in _registros_en(ruta_jsonl, offsets):
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    escribir_atomico(ruta_jsonl, escribir_jsonl)
+    return len(offsets)
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+
+# -------------------------------------------------------------------
+# Búsquedas web con caché de consultas
+# -------------------------------------------------------------------
+# buscar_en_web y buscar_en_web_especial piden a DuckDuckGo la misma
+# consulta "<nombre> meteorite <año>" (3 y 10 resultados). Aquí:
+#   - el proveedor de búsqueda es intercambiable (DDGS o uno falso local),
+#   - cada consulta se pide una sola vez con al menos RESULTADOS_MINIMOS
+#     resultados y la lista se comparte entre ambas variantes,
+#   - las respuestas se guardan en SQLite con TTL (cache_busquedas.sqlite),
+#   - si varios hilos piden la misma consulta a la vez, sale una sola.
+
+TTL_DEFECTO = 7 * 24 * 3600     # segundos
+RESULTADOS_MINIMOS = 10         # lo que pide buscar_en_web_especial
+
+
+def normalizar_consulta(consulta):
+    return re.sub(r"\s+", " ", consulta).strip().lower()
+
+
+# -------------------------------------------------------------------
+# Proveedores
+# -------------------------------------------------------------------
+
+class ProveedorBusqueda(ABC):
+    """Interfaz: buscar(consulta, max_resultados) → [{'href', 'title', 'body'}] en orden de ranking."""
+
+    nombre = "base"
+
+    @abstractmethod
+    def buscar(self, consulta, max_resultados):
+        ...
+
+
+class ProveedorDDGS(ProveedorBusqueda):
+    nombre = "ddgs"
+
+    def buscar(self, consulta, max_resultados):
+        from ddgs import DDGS
+
+        with DDGS() as ddgs:
+            return [{"href": r.get("href"), "title": r.get("title"), "body": r.get("body")}
+                    for r in ddgs.text(consulta, max_results=max_resultados)]
+
+
+class ProveedorFalso(ProveedorBusqueda):
+    """
+    Resultados deterministas por consulta (para pruebas y benchmarks, sin red).
+    Las URLs apuntan a `base` + /pagina/<n>, como el servidor falso de benchmarks/web.py.
+    """
+
+    nombre = "falso"
+
+    def __init__(self, base="http://127.0.0.1", latencia=0.0):
+        self.base = base.rstrip("/")
+        self.latencia = latencia
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def buscar(self, consulta, max_resultados):
+        with self._lock:
+            self.llamadas += 1
+        time.sleep(self.latencia)
+        semilla = zlib.crc32(normalizar_consulta(consulta).encode("utf-8")) % 100_000
+        return [{"href": f"{self.base}/pagina/{semilla * 100 + i}",
+                 "title": f"{consulta} — resultado {i + 1}",
+                 "body": f"Descripción {i + 1} de {consulta}"} for i in range(max_resultados)]
+
+
+# -------------------------------------------------------------------
+# Caché persistente de consultas
+# -------------------------------------------------------------------
+
+class CacheBusquedas:
+    """Resultados por (proveedor, consulta normalizada) con TTL; guarda cuántos se pidieron."""
+
+    def __init__(self, nombre="cache_busquedas.sqlite", ttl=TTL_DEFECTO):
+        self.ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), nombre)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS busquedas (
+                proveedor TEXT NOT NULL,
+                consulta TEXT NOT NULL,
+                max_resultados INTEGER NOT NULL,
+                resultados TEXT NOT NULL,
+                guardado REAL NOT NULL,
+                PRIMARY KEY (proveedor, consulta)
+            )
+        """)
+        self._con.commit()
+
+    def buscar(self, proveedor, consulta, max_resultados):
+        """Lista guardada si está vigente y se pidieron al menos `max_resultados`; si no, None."""
+        with self._lock:
+            fila = self._con.execute("""
+                SELECT max_resultados, resultados FROM busquedas
+                WHERE proveedor = ? AND consulta = ? AND guardado > ?
+            """, (proveedor, consulta, time.time() - self.ttl)).fetchone()
+        if fila is None or fila[0] < max_resultados:
+            return None
+        return json.loads(fila[1])
+
+    def guardar(self, proveedor, consulta, max_resultados, resultados):
+        with self._lock:
+            self._con.execute("""
+                INSERT OR REPLACE INTO busquedas (proveedor, consulta, max_resultados, resultados, guardado)
+                VALUES (?, ?, ?, ?, ?)
+            """, (proveedor, consulta, max_resultados, json.dumps(resultados, ensure_ascii=False), time.time()))
+            self._con.commit()
+
+    def purgar(self):
+        """Borra las consultas vencidas."""
+        with self._lock:
+            borradas = self._con.execute(
+                "DELETE FROM busquedas WHERE guardado <= ?", (time.time() - self.ttl,)).rowcount
+            self._con.commit()
+        return borradas
+
+    def estadisticas(self):
+        with self._lock:
+            total, vigentes = self._con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(guardado > ?), 0) FROM busquedas",
+                (time.time() - self.ttl,)).fetchone()
+        return {"consultas": total, "vigentes": vigentes}
+
+
+# -------------------------------------------------------------------
+# Buscador: caché + coalescencia de consultas en vuelo
+# -------------------------------------------------------------------
+
+class BuscadorWeb:
+    def __init__(self, proveedor=None, cache=None, minimo=RESULTADOS_MINIMOS):
+        self.proveedor = proveedor or ProveedorDDGS()
+        self.cache = cache
+        self.minimo = minimo
+        self._lock = threading.Lock()
+        self._en_vuelo = {}       # consulta normalizada → (Future, resultados pedidos)
+        self.estadisticas = {"consultas": 0, "aciertos": 0, "coalescidas": 0, "al_proveedor": 0}
+
+    def buscar(self, consulta, max_resultados):
+        """Primeros `max_resultados` resultados de `consulta` (lista de dicts href/title/body)."""
+        clave = normalizar_consulta(consulta)
+        pedir = max(max_resultados, self.minimo)
+        with self._lock:
+            self.estadisticas["consultas"] += 1
+
+        if self.cache is not None:
+            guardados = self.cache.buscar(self.proveedor.nombre, clave, max_resultados)
+            if guardados is not None:
+                with self._lock:
+                    self.estadisticas["aciertos"] += 1
+                return guardados[:max_resultados]
+
+        with self._lock:
+            en_vuelo = self._en_vuelo.get(clave)
+            if en_vuelo is not None and en_vuelo[1] >= max_resultados:
+                self.estadisticas["coalescidas"] += 1
+                futuro, propio = en_vuelo[0], False
+            else:
+                futuro, propio = Future(), True
+                self._en_vuelo[clave] = (futuro, pedir)
+                self.estadisticas["al_proveedor"] += 1
+
+        if not propio:
+            return futuro.result()[:max_resultados]
+
+        try:
+            resultados = self.proveedor.buscar(consulta, pedir)
+            if resultados and self.cache is not None:   # una lista vacía suele ser un bloqueo temporal
+                self.cache.guardar(self.proveedor.nombre, clave, pedir, resultados)
+            futuro.set_result(resultados)
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._en_vuelo.get(clave, (None,))[0] is futuro:
+                    del self._en_vuelo[clave]
+        return resultados[:max_resultados]
+
+
+_buscador = None
+_lock_buscador = threading.Lock()
+
+
+def buscador_compartido():
+    """Buscador DDGS con la caché de consultas, único para todo el proceso."""
+    global _buscador
+    with _lock_buscador:
+        if _buscador is None:
+            _buscador = BuscadorWeb(ProveedorDDGS(), CacheBusquedas())
+        return _buscador
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché de consultas de búsqueda web")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("estadisticas", help="Consultas guardadas y vigentes")
+    sub.add_parser("purgar", help="Borra las consultas vencidas")
+
+    args = parser.parse_args()
+    cache = CacheBusquedas()
+    if args.comando == "estadisticas":
+        e = cache.estadisticas()
+        print(f"🔎 {e['consultas']} consultas guardadas ({e['vigentes']} vigentes)")
+    else:
+        print(f"🧹 Consultas vencidas borradas: {cache.purgar()}")
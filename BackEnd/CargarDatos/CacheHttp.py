@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import zstandard
+except ImportError:  # sin zstandard se comprime con zlib
+    zstandard = None
+
+# -------------------------------------------------------------------
+# Caché HTTP en disco compartida por todos los scrapers
+# -------------------------------------------------------------------
+# Índice en SQLite (clave = URL + cabeceras relevantes) y cuerpos
+# direccionados por contenido: cache_http/objetos/ab/<sha256>.
+# Se engancha como adaptador que envuelve al existente, así sirve tanto
+# para requests.Session como para la sesión global de cloudscraper
+# (que hereda de Session y monta su propio adaptador TLS).
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+TTL_DEFECTO = 7 * 24 * 3600          # segundos antes de revalidar
+MAX_BYTES_DEFECTO = 2 * 1024 ** 3    # tamaño máximo (comprimido) antes de desalojar LRU
+
+# Cabeceras de la petición que cambian el contenido devuelto
+CABECERAS_CLAVE = ("Accept", "Accept-Language")
+
+# Cabeceras de la respuesta que no tiene sentido guardar (el cuerpo se guarda decodificado)
+CABECERAS_OMITIDAS = ("Content-Encoding", "Content-Length", "Transfer-Encoding", "Set-Cookie", "Connection")
+
+
+def _comprimir(datos):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(datos)
+    return "zlib", zlib.compress(datos, 6)
+
+
+def _descomprimir(codec, datos):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Caché comprimida con zstd pero el módulo zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(datos)
+    return zlib.decompress(datos)
+
+
+class CacheHttp:
+    """Almacén de respuestas con TTL, revalidación ETag/Last-Modified y límite LRU."""
+
+    def __init__(self, directorio=None, ttl=TTL_DEFECTO, max_bytes=MAX_BYTES_DEFECTO, offline=None):
+        self.directorio = directorio or os.path.join(script_dir, "cache_http")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Modo sin red: solo se sirve desde caché (METEORA_OFFLINE=1)
+        self.offline = os.environ.get("METEORA_OFFLINE") == "1" if offline is None else offline
+        self.estadisticas = {"aciertos": 0, "revalidados": 0, "fallos": 0, "guardados": 0, "desalojados": 0}
+
+        os.makedirs(os.path.join(self.directorio, "objetos"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(os.path.join(self.directorio, "indice.sqlite"), check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS respuestas (
+                clave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                cabeceras TEXT NOT NULL,
+                objeto TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                tamano INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                guardado REAL NOT NULL,
+                ultimo_acceso REAL NOT NULL
+            )
+        """)
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON respuestas (ultimo_acceso)")
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_objeto ON respuestas (objeto)")
+        self._con.commit()
+        # Bytes ocupados por los objetos (se mantiene en memoria para no sumar en cada escritura)
+        self._total = self._con.execute(
+            "SELECT COALESCE(SUM(tamano), 0) FROM (SELECT DISTINCT objeto, tamano FROM respuestas)"
+        ).fetchone()[0]
+
+    # --- Claves y objetos ---
+    @staticmethod
+    def clave(metodo, url, cabeceras):
+        partes = [metodo.upper(), url] + [f"{c}:{cabeceras.get(c, '')}" for c in CABECERAS_CLAVE]
+        return hashlib.sha256("\n".join(partes).encode("utf-8")).hexdigest()
+
+    def _ruta_objeto(self, objeto):
+        return os.path.join(self.directorio, "objetos", objeto[:2], objeto)
+
+    def _guardar_objeto(self, cuerpo):
+        objeto = hashlib.sha256(cuerpo).hexdigest()
+        ruta = self._ruta_objeto(objeto)
+        codec, comprimido = _comprimir(cuerpo)
+        nuevo = not os.path.exists(ruta)
+        if nuevo:  # mismo contenido → mismo objeto
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta))
+            with os.fdopen(fd, "wb") as f:
+                f.write(comprimido)
+            os.replace(temporal, ruta)
+        return objeto, codec, len(comprimido), nuevo
+
+    def _liberar_objeto(self, objeto, tamano):
+        """Borra el objeto si ya ninguna entrada lo referencia (llamar con el lock tomado)."""
+        if self._con.execute("SELECT 1 FROM respuestas WHERE objeto = ? LIMIT 1", (objeto,)).fetchone():
+            return
+        try:
+            os.remove(self._ruta_objeto(objeto))
+            self._total -= tamano
+        except OSError:
+            pass
+
+    def contar(self, evento):
+        """Suma uno a una estadística (el adaptador se usa desde varios hilos)."""
+        with self._lock:
+            self.estadisticas[evento] += 1
+
+    # --- Consulta ---
+    def buscar(self, clave):
+        with self._lock:
+            fila = self._con.execute("""
+                SELECT url, status, cabeceras, objeto, codec, etag, last_modified, guardado
+                FROM respuestas WHERE clave = ?
+            """, (clave,)).fetchone()
+        if fila is None:
+            return None
+        url, status, cabeceras, objeto, codec, etag, last_modified, guardado = fila
+        try:
+            with open(self._ruta_objeto(objeto), "rb") as f:
+                cuerpo = _descomprimir(codec, f.read())
+        except (OSError, zlib.error, RuntimeError):
+            return None
+        return {
+            "url": url, "status": status, "cabeceras": json.loads(cabeceras), "cuerpo": cuerpo,
+            "etag": etag, "last_modified": last_modified,
+            "fresca": time.time() - guardado < self.ttl,
+        }
+
+    def entradas(self, patron_url="%"):
+        """Genera las entradas guardadas cuya URL cumple el patrón LIKE (p. ej. '%metbull.php?code=%')."""
+        with self._lock:
+            claves = [c for (c,) in self._con.execute(
+                "SELECT clave FROM respuestas WHERE url LIKE ? ORDER BY url", (patron_url,))]
+        for clave in claves:
+            entrada = self.buscar(clave)
+            if entrada is not None:
+                yield entrada
+
+    def tocar(self, clave, revalidada=False):
+        """Actualiza el acceso (LRU) y, si se revalidó con 304, reinicia el TTL."""
+        ahora = time.time()
+        with self._lock:
+            if revalidada:
+                self._con.execute("UPDATE respuestas SET ultimo_acceso = ?, guardado = ? WHERE clave = ?",
+                                  (ahora, ahora, clave))
+            else:
+                self._con.execute("UPDATE respuestas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+            self._con.commit()
+
+    def guardar(self, clave, url, status, cabeceras, cuerpo):
+        objeto, codec, tamano, nuevo = self._guardar_objeto(cuerpo)
+        omitidas = {c.lower() for c in CABECERAS_OMITIDAS}
+        cabeceras = CaseInsensitiveDict({k: v for k, v in cabeceras.items() if k.lower() not in omitidas})
+        ahora = time.time()
+        with self._lock:
+            previo = self._con.execute(
+                "SELECT objeto, tamano FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+            self._con.execute("""
+                INSERT OR REPLACE INTO respuestas
+                    (clave, url, status, cabeceras, objeto, codec, tamano, etag, last_modified, guardado, ultimo_acceso)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (clave, url, status, json.dumps(dict(cabeceras)), objeto, codec, tamano,
+                  cabeceras.get("ETag"), cabeceras.get("Last-Modified"), ahora, ahora))
+            if nuevo:
+                self._total += tamano
+            if previo and previo[0] != objeto:
+                self._liberar_objeto(*previo)
+            self._con.commit()
+            self.estadisticas["guardados"] += 1
+        self.desalojar()
+
+    def desalojar(self):
+        """Elimina las entradas menos usadas hasta quedar por debajo de max_bytes."""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            for clave, objeto, tamano in self._con.execute(
+                    "SELECT clave, objeto, tamano FROM respuestas ORDER BY ultimo_acceso").fetchall():
+                self._con.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+                self.estadisticas["desalojados"] += 1
+                self._liberar_objeto(objeto, tamano)
+                if self._total <= self.max_bytes:
+                    break
+            self._con.commit()
+
+
+def _respuesta_desde_cache(entrada, peticion, adaptador):
+    respuesta = requests.Response()
+    respuesta.status_code = entrada["status"]
+    respuesta.headers = CaseInsensitiveDict(entrada["cabeceras"])
+    respuesta._content = entrada["cuerpo"]
+    respuesta._content_consumed = True   # iter_content() (stream=True) reparte el cuerpo ya leído
+    respuesta.encoding = get_encoding_from_headers(respuesta.headers)
+    respuesta.url = peticion.url
+    respuesta.request = peticion
+    respuesta.reason = "OK (caché)"
+    respuesta.connection = adaptador
+    respuesta.from_cache = True
+    return respuesta
+
+
+class AdaptadorCache(BaseAdapter):
+    """
+    Adaptador que consulta la caché antes de delegar en el adaptador real
+    (solo GET, solo se guardan respuestas 200).
+    """
+
+    def __init__(self, cache, interno=None):
+        super().__init__()
+        self.cache = cache
+        self.interno = interno or HTTPAdapter()
+
+    def close(self):
+        self.interno.close()
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return self.interno.send(request, **kwargs)
+
+        cache = self.cache
+        clave = cache.clave(request.method, request.url, request.headers)
+        entrada = cache.buscar(clave)
+
+        if entrada is not None and (entrada["fresca"] or cache.offline):
+            cache.contar("aciertos")
+            cache.tocar(clave)
+            return _respuesta_desde_cache(entrada, request, self)
+
+        if cache.offline:
+            cache.contar("fallos")
+            raise requests.ConnectionError(f"Modo offline: {request.url} no está en caché")
+
+        # Revalidación condicional de una entrada vencida
+        if entrada is not None:
+            if entrada["etag"]:
+                request.headers["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                request.headers["If-Modified-Since"] = entrada["last_modified"]
+
+        respuesta = self.interno.send(request, **kwargs)
+
+        if entrada is not None and respuesta.status_code == 304:
+            cache.contar("revalidados")
+            cache.tocar(clave, revalidada=True)
+            respuesta.close()
+            return _respuesta_desde_cache(entrada, request, self)
+
+        cache.contar("fallos")
+        if respuesta.status_code == 200:
+            cabeceras = dict(respuesta.headers)
+            if not kwargs.get("stream"):
+                cache.guardar(clave, request.url, respuesta.status_code, cabeceras, respuesta.content)
+            else:
+                # En streaming el cuerpo puede no leerse entero: quien lo lea completo decide guardarlo
+                respuesta.guardar_en_cache = lambda cuerpo: cache.guardar(
+                    clave, request.url, 200, cabeceras, cuerpo)
+        return respuesta
+
+
+_cache_compartida = None
+_lock_compartida = threading.Lock()
+
+
+def cache_compartida():
+    """Instancia única de la caché para todos los módulos de CargarDatos."""
+    global _cache_compartida
+    with _lock_compartida:
+        if _cache_compartida is None:
+            _cache_compartida = CacheHttp()
+        return _cache_compartida
+
+
+def instalar_cache(sesion, cache=None):
+    """Envuelve los adaptadores de una sesión (requests o cloudscraper) con la caché."""
+    cache = cache or cache_compartida()
+    # Se envuelven todos los prefijos montados (incluidos los específicos de un host)
+    for prefijo, interno in list(sesion.adapters.items()):
+        if not isinstance(interno, AdaptadorCache):
+            sesion.mount(prefijo, AdaptadorCache(cache, interno))
+    return sesion
+
+
+def crear_sesion(cache=None, conexiones=None):
+    """
+    Nueva requests.Session con la caché compartida montada. `conexiones` fija
+    cuántos hosts y conexiones por host guarda el pool (por defecto 10), para
+    sesiones usadas desde muchos hilos a la vez.
+    """
+    sesion = requests.Session()
+    if conexiones:
+        for prefijo in ("http://", "https://"):
+            sesion.mount(prefijo, HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones))
+    return instalar_cache(sesion, cache)
@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# -------------------------------------------------------------------
+# Caché persistente de respuestas del modelo (nivel prompt)
+# -------------------------------------------------------------------
+# Clave = (modelo, digest del modelo, SHA-256 del prompt ya renderizado).
+# Si cambia el modelo (otro digest tras un `ollama pull`) o cambia una sola
+# letra del prompt o del texto web, la entrada no se reutiliza.
+# Se guarda el texto crudo de la respuesta y las métricas de la inferencia.
+
+MAX_EDAD_DEFECTO = 180 * 24 * 3600     # segundos
+MAX_BYTES_DEFECTO = 512 * 1024 ** 2    # tamaño máximo de los textos guardados
+
+
+def huella_prompt(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class CacheIA:
+    """Respuestas del LLM por (modelo, digest, sha256(prompt)), con desalojo por edad y tamaño."""
+
+    def __init__(self, nombre="cache_ia.sqlite", max_edad=MAX_EDAD_DEFECTO, max_bytes=MAX_BYTES_DEFECTO):
+        self.ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), nombre)
+        self.max_edad = max_edad
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS respuestas (
+                modelo TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                prompt_sha TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                metricas TEXT,
+                tamano INTEGER NOT NULL,
+                creado REAL NOT NULL,
+                ultimo_acceso REAL NOT NULL,
+                aciertos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (modelo, digest, prompt_sha)
+            )
+        """)
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON respuestas (ultimo_acceso)")
+        # Contadores acumulados entre ejecuciones (para la tasa de aciertos)
+        self._con.execute("CREATE TABLE IF NOT EXISTS contadores (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+        self._con.commit()
+
+    def cerrar(self):
+        with self._lock:
+            self._con.close()
+
+    def _contar(self, nombre):
+        self._con.execute("""
+            INSERT INTO contadores (nombre, valor) VALUES (?, 1)
+            ON CONFLICT(nombre) DO UPDATE SET valor = valor + 1
+        """, (nombre,))
+
+    # --- Consulta / alta ---
+    def buscar(self, modelo, digest, prompt):
+        """Devuelve {'texto', 'metricas', 'creado'} o None."""
+        sha = huella_prompt(prompt)
+        ahora = time.time()
+        with self._lock:
+            fila = self._con.execute("""
+                SELECT texto, metricas, creado FROM respuestas
+                WHERE modelo = ? AND digest = ? AND prompt_sha = ? AND creado > ?
+            """, (modelo, digest, sha, ahora - self.max_edad)).fetchone()
+            if fila is None:
+                self._contar("fallos")
+            else:
+                self._contar("aciertos")
+                self._con.execute("""
+                    UPDATE respuestas SET ultimo_acceso = ?, aciertos = aciertos + 1
+                    WHERE modelo = ? AND digest = ? AND prompt_sha = ?
+                """, (ahora, modelo, digest, sha))
+            self._con.commit()
+        if fila is None:
+            return None
+        texto, metricas, creado = fila
+        return {"texto": texto, "metricas": json.loads(metricas) if metricas else {}, "creado": creado}
+
+    def guardar(self, modelo, digest, prompt, texto, metricas=None):
+        ahora = time.time()
+        with self._lock:
+            self._con.execute("""
+                INSERT OR REPLACE INTO respuestas
+                    (modelo, digest, prompt_sha, texto, metricas, tamano, creado, ultimo_acceso)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (modelo, digest, huella_prompt(prompt), texto,
+                  json.dumps(metricas or {}, ensure_ascii=False), len(texto.encode("utf-8")), ahora, ahora))
+            self._con.commit()
+
+    # --- Mantenimiento ---
+    def desalojar(self):
+        """Borra las entradas vencidas y después las menos usadas hasta quedar bajo max_bytes."""
+        with self._lock:
+            vencidas = self._con.execute(
+                "DELETE FROM respuestas WHERE creado <= ?", (time.time() - self.max_edad,)).rowcount
+            total = self._con.execute("SELECT COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()[0]
+            por_tamano = 0
+            if total > self.max_bytes:
+                for modelo, digest, sha, tamano in self._con.execute(
+                        "SELECT modelo, digest, prompt_sha, tamano FROM respuestas ORDER BY ultimo_acceso").fetchall():
+                    self._con.execute("DELETE FROM respuestas WHERE modelo = ? AND digest = ? AND prompt_sha = ?",
+                                      (modelo, digest, sha))
+                    por_tamano += 1
+                    total -= tamano
+                    if total <= self.max_bytes:
+                        break
+            self._con.commit()
+        return {"vencidas": vencidas, "por_tamano": por_tamano}
+
+    def estadisticas(self):
+        with self._lock:
+            contadores = dict(self._con.execute("SELECT nombre, valor FROM contadores"))
+            entradas, total = self._con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()
+            por_modelo = self._con.execute("""
+                SELECT modelo, digest, COUNT(*), SUM(aciertos) FROM respuestas GROUP BY modelo, digest
+            """).fetchall()
+        aciertos = contadores.get("aciertos", 0)
+        fallos = contadores.get("fallos", 0)
+        consultas = aciertos + fallos
+        return {
+            "entradas": entradas,
+            "bytes": total,
+            "aciertos": aciertos,
+            "fallos": fallos,
+            "tasa_aciertos": round(aciertos / consultas, 4) if consultas else None,
+            "por_modelo": [
+                {"modelo": m, "digest": d[:12], "entradas": n, "aciertos": a or 0} for m, d, n, a in por_modelo
+            ],
+        }
+
+
+_cache_ia = None
+_lock_cache_ia = threading.Lock()
+
+
+def cache_ia_compartida():
+    global _cache_ia
+    with _lock_cache_ia:
+        if _cache_ia is None:
+            _cache_ia = CacheIA()
+        return _cache_ia
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché de respuestas del modelo")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("estadisticas", help="Entradas, tamaño y tasa de aciertos")
+    p_desalojar = sub.add_parser("desalojar", help="Borra entradas vencidas o que exceden el tamaño")
+    p_desalojar.add_argument("--max-edad-dias", type=float, default=MAX_EDAD_DEFECTO / 86400)
+    p_desalojar.add_argument("--max-mb", type=float, default=MAX_BYTES_DEFECTO / 1024 ** 2)
+
+    args = parser.parse_args()
+    if args.comando == "estadisticas":
+        e = CacheIA().estadisticas()
+        tasa = f"{e['tasa_aciertos']:.1%}" if e["tasa_aciertos"] is not None else "—"
+        print(f"🗃️ {e['entradas']} respuestas ({e['bytes'] / 1024 ** 2:.1f} MB)")
+        print(f"🎯 Aciertos: {e['aciertos']} | Fallos: {e['fallos']} | Tasa de aciertos: {tasa}")
+        for m in e["por_modelo"]:
+            print(f"   {m['modelo']} @ {m['digest']}: {m['entradas']} entradas, {m['aciertos']} aciertos")
+    else:
+        cache = CacheIA(max_edad=args.max_edad_dias * 86400, max_bytes=int(args.max_mb * 1024 ** 2))
+        print(f"🧹 Desalojadas: {cache.desalojar()}")
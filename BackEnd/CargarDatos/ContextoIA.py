@@ -0,0 +1,151 @@
+import math
+import re
+
+from Relevancia import clasificador
+
+# -------------------------------------------------------------------
+# Contexto para la IA con presupuesto de tokens
+# -------------------------------------------------------------------
+# En lugar de cortar el texto web a ciegas (texto_web[:15000]):
+#   1. se separa por fuente y en oraciones,
+#   2. se descartan oraciones repetidas o casi iguales entre fuentes
+#      (las páginas repiten menús, avisos y el mismo párrafo en p/div/article),
+#   3. se agrupan en fragmentos y se puntúan con los patrones de Relevancia
+#      y la presencia del nombre del meteorito,
+#   4. se empaquetan los mejores fragmentos hasta el presupuesto y se
+#      devuelven en su orden original, bajo su línea "Fuente:".
+
+PRESUPUESTO_TOKENS = 1500
+TOKENS_POR_FRAGMENTO = 80
+UMBRAL_CASI_IGUAL = 0.8       # fracción de trigramas de palabras ya vistos
+
+_FIN_ORACION = re.compile(r"(?<=[.!?…])\s+|\n+")
+_PALABRA = re.compile(r"\w+")
+_FUENTE = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+
+
+def estimar_tokens(texto):
+    """Aproximación para llama3 (~4 caracteres por token en inglés/español)."""
+    return math.ceil(len(texto) / 4)
+
+
+def _trigramas(palabras):
+    if len(palabras) < 3:
+        return {tuple(palabras)}
+    return {tuple(palabras[i:i + 3]) for i in range(len(palabras) - 2)}
+
+
+class _Deduplicador:
+    """
+    Descarta oraciones idénticas (normalizadas) o cuyo contenido ya apareció:
+    si la mayoría de sus trigramas de palabras ya se vieron, es repetida. Así
+    también caen las oraciones pegadas a restos de menús sin puntuación.
+    """
+
+    def __init__(self, umbral=UMBRAL_CASI_IGUAL):
+        self.umbral = umbral
+        self.exactas = set()
+        self.vistos = set()
+
+    def es_nueva(self, oracion):
+        palabras = _PALABRA.findall(oracion.lower())
+        if not palabras:
+            return False
+        normalizada = " ".join(palabras)
+        if normalizada in self.exactas:
+            return False
+        self.exactas.add(normalizada)
+
+        trigramas = _trigramas(palabras)
+        repetidos = len(trigramas & self.vistos) / len(trigramas)
+        self.vistos |= trigramas
+        return repetidos < self.umbral
+
+
+def _fuentes(texto_web):
+    """Separa el texto combinado en bloques por fuente ('---' + 'Fuente: url')."""
+    for bloque in _FUENTE.split(texto_web):
+        bloque = bloque.strip()
+        if not bloque:
+            continue
+        cabecera = ""
+        if bloque.startswith("Fuente:"):
+            cabecera, _, bloque = bloque.partition("\n")
+        yield cabecera.strip(), bloque
+
+
+def _puntuar(fragmento, patron_nombre):
+    texto = fragmento.lower()
+    conteos = clasificador.contar(texto)
+    puntos = sum(1 for g in clasificador.relevantes if conteos[g])
+    puntos -= 0.5 * sum(1 for g in clasificador.irrelevantes if conteos[g])
+    if patron_nombre is not None and patron_nombre.search(texto):
+        puntos += 2
+    return puntos
+
+
+def construir_contexto(texto_web, nombre_meteorito=None, presupuesto_tokens=PRESUPUESTO_TOKENS,
+                       tokens_por_fragmento=TOKENS_POR_FRAGMENTO):
+    """
+    Devuelve (contexto, estadísticas) con el texto más relevante que cabe en
+    `presupuesto_tokens`. Si el texto ya cabe, solo se deduplica.
+    """
+    texto_web = texto_web or ""
+    nombre = (nombre_meteorito or "").lower().strip()
+    patron_nombre = re.compile(rf"\b{re.escape(nombre.split()[0])}\b") if nombre else None
+
+    dedup = _Deduplicador()
+    fragmentos = []   # (orden, fuente, texto, tokens, puntos)
+    oraciones_total = oraciones_repetidas = 0
+
+    for fuente, bloque in _fuentes(texto_web):
+        actual, tokens_actual = [], 0
+        for oracion in _FIN_ORACION.split(bloque):
+            oracion = oracion.strip()
+            if not oracion:
+                continue
+            oraciones_total += 1
+            if not dedup.es_nueva(oracion):
+                oraciones_repetidas += 1
+                continue
+            actual.append(oracion)
+            tokens_actual += estimar_tokens(oracion) + 1
+            if tokens_actual >= tokens_por_fragmento:
+                texto = " ".join(actual)
+                fragmentos.append((len(fragmentos), fuente, texto, tokens_actual, _puntuar(texto, patron_nombre)))
+                actual, tokens_actual = [], 0
+        if actual:
+            texto = " ".join(actual)
+            fragmentos.append((len(fragmentos), fuente, texto, tokens_actual, _puntuar(texto, patron_nombre)))
+
+    # Mejores fragmentos primero (a igual puntuación, los que aparecen antes);
+    # si hay alguno relevante, los que no puntúan no gastan presupuesto
+    candidatos = sorted(fragmentos, key=lambda f: (-f[4], f[0]))
+    if candidatos and candidatos[0][4] > 0:
+        candidatos = [f for f in candidatos if f[4] > 0]
+    elegidos, usados = [], 0
+    for fragmento in candidatos:
+        coste = fragmento[3] + (estimar_tokens(fragmento[1]) + 1 if fragmento[1] else 0)
+        if usados + coste > presupuesto_tokens:
+            continue
+        elegidos.append(fragmento)
+        usados += coste
+
+    # Reensamblar en el orden original, agrupando por fuente
+    partes, fuente_actual = [], None
+    for _, fuente, texto, _, _ in sorted(elegidos):
+        if fuente and fuente != fuente_actual:
+            partes.append(f"\n{fuente}")
+        fuente_actual = fuente
+        partes.append(texto)
+    contexto = "\n".join(partes).strip()
+
+    estadisticas = {
+        "tokens_antes": estimar_tokens(texto_web),
+        "tokens_despues": estimar_tokens(contexto),
+        "oraciones": oraciones_total,
+        "repetidas": oraciones_repetidas,
+        "fragmentos": len(fragmentos),
+        "elegidos": len(elegidos),
+    }
+    return contexto, estadisticas
@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import BaseAdapter
+
+# -------------------------------------------------------------------
+# Control adaptativo de tasa (AIMD) para las peticiones al LPI
+# -------------------------------------------------------------------
+# Mientras las respuestas son limpias, la concurrencia y la tasa crecen de
+# forma aditiva; ante 403/429/5xx o errores de red se recortan a la mitad
+# (una vez por ventana de enfriamiento) y se pausa según Retry-After.
+# Sustituye a los time.sleep fijos repartidos por el scraper.
+
+
+def es_recorte(status):
+    """Respuestas que indican bloqueo o saturación del servidor."""
+    return status in (403, 429) or (status is not None and status >= 500)
+
+
+def segundos_retry_after(valor):
+    """Interpreta Retry-After (segundos o fecha HTTP). None si no viene o no es válido."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _despertar(futuro):
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+class _Turno:
+    """Corrutina esperando en adquirir_async (el futuro se renueva en cada espera)."""
+
+    __slots__ = ("loop", "futuro")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.futuro = loop.create_future()
+
+
+class ControladorAIMD:
+    """Ventana de concurrencia y tasa (peticiones/s) con aumento aditivo y recorte multiplicativo."""
+
+    def __init__(self, nombre, concurrencia_inicial=4, concurrencia_min=1, concurrencia_max=32,
+                 tasa_inicial=4.0, tasa_min=0.2, tasa_max=20.0, incremento=1.0, factor=0.5,
+                 pausa_base=2.0, enfriamiento=2.0):
+        self.nombre = nombre
+        self.concurrencia = float(concurrencia_inicial)
+        self.concurrencia_min = concurrencia_min
+        self.concurrencia_max = concurrencia_max
+        self.tasa = float(tasa_inicial)
+        self.tasa_min = tasa_min
+        self.tasa_max = tasa_max
+        self.incremento = incremento
+        self.factor = factor
+        self.pausa_base = pausa_base
+        self.enfriamiento = enfriamiento
+
+        self.en_curso = 0
+        self.contadores = Counter()
+        self._cond = threading.Condition()
+        self._proximo = 0.0          # instante en que puede salir la siguiente petición
+        self._pausa_hasta = 0.0      # pausa global (Retry-After o recorte)
+        self._ultimo_recorte = 0.0
+        self._turnos = deque()       # esperas de adquirir_async, en orden de llegada
+
+    # --- Admisión ---
+    def _espera(self, ahora):
+        """Segundos a esperar (0 = puede salir, None = esperar a que se libere un hueco)."""
+        if self.en_curso >= int(self.concurrencia):
+            return None
+        return max(0.0, self._pausa_hasta - ahora, self._proximo - ahora)
+
+    def _ocupar(self, ahora):
+        self.en_curso += 1
+        self._proximo = max(ahora, self._proximo) + 1.0 / self.tasa
+
+    def adquirir(self):
+        with self._cond:
+            while True:
+                ahora = time.monotonic()
+                espera = self._espera(ahora)
+                if espera == 0:
+                    self._ocupar(ahora)
+                    return
+                self._cond.wait(timeout=espera)
+
+    def _avisar_turno(self):
+        """Despierta a la primera corrutina en espera (con self._cond tomado)."""
+        if self._turnos:
+            turno = self._turnos[0]
+            turno.loop.call_soon_threadsafe(_despertar, turno.futuro)
+
+    async def adquirir_async(self):
+        """
+        Como adquirir, sin bloquear el bucle de eventos. Las corrutinas toman
+        los huecos en orden de llegada: solo la primera de la cola espera al
+        controlador (liberar la despierta, o vence su pausa); las demás esperan
+        a que la anterior salga.
+        """
+        turno = _Turno(asyncio.get_running_loop())
+        with self._cond:
+            self._turnos.append(turno)
+        try:
+            while True:
+                with self._cond:
+                    if turno.futuro.done():
+                        turno.futuro = turno.loop.create_future()
+                    futuro = turno.futuro
+                    espera = None
+                    if self._turnos[0] is turno:
+                        ahora = time.monotonic()
+                        espera = self._espera(ahora)
+                        if espera == 0:
+                            self._ocupar(ahora)
+                            return
+                try:
+                    await asyncio.wait_for(futuro, espera)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                primero = self._turnos[0] is turno
+                self._turnos.remove(turno)
+                if primero:
+                    self._avisar_turno()
+
+    # --- Realimentación ---
+    def liberar(self, status=None, retry_after=None, error=False):
+        with self._cond:
+            self.en_curso -= 1
+            ahora = time.monotonic()
+
+            if error or es_recorte(status):
+                self.contadores["error_red" if error else str(status)] += 1
+                if ahora - self._ultimo_recorte >= self.enfriamiento:
+                    self.concurrencia = max(self.concurrencia_min, self.concurrencia * self.factor)
+                    self.tasa = max(self.tasa_min, self.tasa * self.factor)
+                    self._ultimo_recorte = ahora
+                    self.contadores["recortes"] += 1
+                pausa = retry_after if retry_after is not None else self.pausa_base
+                self._pausa_hasta = max(self._pausa_hasta, ahora + pausa)
+            else:
+                self.contadores["ok"] += 1
+                # +incremento por "ronda" completa de la ventana actual
+                self.concurrencia = min(self.concurrencia_max,
+                                        self.concurrencia + self.incremento / self.concurrencia)
+                self.tasa = min(self.tasa_max, self.tasa + self.incremento / max(self.tasa, 1.0))
+
+            self._cond.notify_all()
+            self._avisar_turno()
+
+    @contextmanager
+    def permiso(self):
+        """`with controlador.permiso() as r:` — asignar r['status'] / r['retry_after'] al terminar."""
+        self.adquirir()
+        resultado = {"status": None, "retry_after": None, "error": False}
+        try:
+            yield resultado
+        except Exception:
+            resultado["error"] = True
+            raise
+        finally:
+            self.liberar(**resultado)
+
+    @asynccontextmanager
+    async def permiso_async(self):
+        await self.adquirir_async()
+        resultado = {"status": None, "retry_after": None, "error": False}
+        try:
+            yield resultado
+        except Exception:
+            resultado["error"] = True
+            raise
+        finally:
+            self.liberar(**resultado)
+
+    # --- Observabilidad ---
+    def estado(self):
+        with self._cond:
+            return {
+                "concurrencia": round(self.concurrencia, 2),
+                "tasa": round(self.tasa, 2),
+                "en_curso": self.en_curso,
+                "contadores": dict(self.contadores),
+            }
+
+    def __str__(self):
+        e = self.estado()
+        return (f"[{self.nombre}] concurrencia={e['concurrencia']} tasa={e['tasa']}/s "
+                f"en_curso={e['en_curso']} {e['contadores']}")
+
+
+class AdaptadorControlado(BaseAdapter):
+    """Adaptador requests que pasa cada petición por el controlador y reintenta 403/429/5xx."""
+
+    def __init__(self, controlador, interno, reintentos=3):
+        super().__init__()
+        self.controlador = controlador
+        self.interno = interno
+        self.reintentos = reintentos
+
+    def close(self):
+        self.interno.close()
+
+    def send(self, request, **kwargs):
+        for intento in range(self.reintentos):
+            ultimo = intento == self.reintentos - 1
+            try:
+                with self.controlador.permiso() as r:
+                    respuesta = self.interno.send(request, **kwargs)
+                    r["status"] = respuesta.status_code
+                    r["retry_after"] = segundos_retry_after(respuesta.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout):
+                if ultimo:
+                    raise
+                continue
+
+            if es_recorte(respuesta.status_code) and not ultimo:
+                respuesta.close()
+                continue  # el controlador ya aplicó la pausa correspondiente
+            return respuesta
+
+
+def instalar_control(sesion, controlador, prefijo, reintentos=3):
+    """Monta el controlador para todas las URLs que empiezan por `prefijo`."""
+    interno = sesion.get_adapter(prefijo)
+    sesion.mount(prefijo, AdaptadorControlado(controlador, interno, reintentos))
+    return sesion
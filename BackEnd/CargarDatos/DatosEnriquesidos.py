@@ -1,19 +1,69 @@
 import json
-import re
-from ddgs import DDGS
-import requests
-from bs4 import BeautifulSoup
-import ollama
 import os
-import pandas as pd
 import concurrent.futures
 import textwrap
+import threading
+
+from AlmacenColumnar import esquema_para, leer_tabla, registros_texto
+from AlmacenJsonl import EscritorJsonl, compactar, leer_jsonl
+from BusquedaWeb import buscador_compartido
+from CacheHttp import crear_sesion
+from CacheIA import cache_ia_compartida
+from ContextoIA import PRESUPUESTO_TOKENS, construir_contexto
+from MeteoritoUnido import MeteoritoUnido
+from PlanificadorIA import PRIORIDAD_ESPECIAL, PRIORIDAD_NORMAL, planificador_compartido
+from RegistroTrabajo import RegistroTrabajo
+from Relevancia import clasificador
+from SeleccionMeteoritos import medir, resumen_tiempos, seleccionar
+from TextoWeb import EXCLUIDAS_EXTENDIDAS, HILOS_DESCARGA, descargar_texto, descargar_textos
+from UnionEventos import IndiceEventos, emparejar_vectorizado
 
 # -------------------------------------------------------------------
 # Funciones auxiliares: búsqueda y scraping
 # -------------------------------------------------------------------
 
-def buscar_en_web(meteorito, num_resultados=3):
+_sesion_http = None
+_lock_sesion = threading.Lock()
+
+
+def sesion_compartida():
+    """
+    Sesión HTTP compartida con caché en disco (METEORA_OFFLINE=1 → solo caché),
+    creada al primer uso. Su pool de conexiones alcanza para todas las
+    descargas simultáneas.
+    """
+    global _sesion_http
+    with _lock_sesion:
+        if _sesion_http is None:
+            _sesion_http = crear_sesion(conexiones=HILOS_DESCARGA)
+        return _sesion_http
+
+
+# Plazo total por meteorito para descargar sus resultados (en paralelo)
+PLAZO_BUSQUEDA = 8
+PLAZO_BUSQUEDA_ESPECIAL = 12
+
+
+def _descargar_resultados(candidatos, plazo, **parametros):
+    """
+    Descarga a la vez las páginas de `candidatos` [(url, título, descripción)].
+    Devuelve ([(url, título, descripción, contenido)], bytes) en el orden del
+    ranking, solo con las páginas que dieron texto dentro del plazo.
+    """
+    paginas = descargar_textos(sesion_compartida(), [url for url, _, _ in candidatos], plazo=plazo, **parametros)
+    obtenidos, bytes_descargados = [], 0
+    for (url, titulo, descripcion), (contenido, descarga) in zip(candidatos, paginas):
+        bytes_descargados += descarga["bytes"]
+        if descarga["motivo"] == "error":
+            print(f"⚠️ No se pudo extraer texto de {url}: {descarga['error']}")
+        elif descarga["motivo"] == "plazo":
+            print(f"⏱️ Sin respuesta dentro del plazo ({plazo}s): {url}")
+        if contenido:  # Evitar añadir vacíos
+            obtenidos.append((url, titulo, descripcion, contenido))
+    return obtenidos, bytes_descargados
+
+
+def buscar_en_web(meteorito, num_resultados=3, plazo=PLAZO_BUSQUEDA, buscador=None):
     """Busca información relevante en la web sobre un meteorito, 
     excluyendo resultados del dominio 'lpi.usra.edu'."""
     tema = f"{meteorito.get('name', '')} meteorite {meteorito.get('year', '')}".strip()
@@ -21,55 +71,47 @@ def buscar_en_web(meteorito, num_resultados=3):
 
     resultados = []
     texto_combinado = ""
+    bytes_descargados = 0
 
     try:
-        with DDGS() as ddgs:
-            for r in ddgs.text(tema, max_results=num_resultados):
-                url = r.get("href")
-                titulo = r.get("title")
-                descripcion = r.get("body")
-
-                if not url:
-                    continue
-
-                # 🔎 Excluir resultados del dominio lpi.usra.edu
-                if "lpi.usra.edu" in url:
-                    print(f"⏭️ Ignorado (LPI): {url}")
-                    continue
-
-                try:
-                    response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-                    soup = BeautifulSoup(response.text, "html.parser")
-
-                    # Eliminar etiquetas innecesarias
-                    for tag in soup(["script", "style", "noscript"]):
-                        tag.decompose()
-
-                    contenido = " ".join(p.get_text() for p in soup.find_all("p"))
-                    contenido = contenido.strip()[:5000]  # Limitar tamaño
-
-                except Exception as e:
-                    print(f"⚠️ No se pudo extraer texto de {url}: {e}")
-                    contenido = ""
-
-                if contenido:  # Evitar añadir vacíos
-                    resultados.append({
-                        "titulo": titulo,
-                        "url": url,
-                        "descripcion": descripcion,
-                        "contenido": contenido
-                    })
-                    texto_combinado += f"{titulo or ''}\n{descripcion or ''}\n{contenido}\n"
+        # Consulta cacheada y compartida con buscar_en_web_especial
+        candidatos = []
+        for r in (buscador or buscador_compartido()).buscar(tema, num_resultados):
+            url = r.get("href")
+
+            if not url:
+                continue
+
+            # 🔎 Excluir resultados del dominio lpi.usra.edu
+            if "lpi.usra.edu" in url:
+                print(f"⏭️ Ignorado (LPI): {url}")
+                continue
+
+            candidatos.append((url, r.get("title"), r.get("body")))
+
+        # Lectura en streaming y en paralelo: se corta al tener 5000 caracteres de <p>
+        obtenidos, bytes_descargados = _descargar_resultados(candidatos, plazo, timeout=10, limite=5000)
+
+        for url, titulo, descripcion, contenido in obtenidos:
+            resultados.append({
+                "titulo": titulo,
+                "url": url,
+                "descripcion": descripcion,
+                "contenido": contenido
+            })
+            texto_combinado += f"{titulo or ''}\n{descripcion or ''}\n{contenido}\n"
 
     except Exception as e:
         print(f"⚠️ Error durante la búsqueda: {e}")
 
+    print(f"📦 {bytes_descargados / 1024:.0f} KB descargados para: {tema}")
     return {
         "resultados": resultados,
-        "texto": texto_combinado.strip()
+        "texto": texto_combinado.strip(),
+        "bytes": bytes_descargados
     }
 
-def buscar_en_web_especial(meteorito, num_resultados=10):
+def buscar_en_web_especial(meteorito, num_resultados=10, plazo=PLAZO_BUSQUEDA_ESPECIAL, buscador=None):
     """
     Busca información más completa en la web sobre un meteorito.
     Se amplía el número de resultados y el texto extraído de cada página.
@@ -80,54 +122,43 @@ def buscar_en_web_especial(meteorito, num_resultados=10):
 
     resultados = []
     texto_combinado = ""
+    bytes_descargados = 0
 
     try:
-        with DDGS() as ddgs:
-            for r in ddgs.text(tema, max_results=num_resultados):
-                url = r.get("href")
-                titulo = r.get("title")
-                descripcion = r.get("body")
-
-                if not url:
-                    continue
-                if "lpi.usra.edu" in url or "wikipedia" in url.lower():
-                    print(f"⏭️ Ignorado (fuente excluida): {url}")
-                    continue
-
-                try:
-                    response = requests.get(url, timeout=12, headers={"User-Agent": "Mozilla/5.0"})
-                    soup = BeautifulSoup(response.text, "html.parser")
-
-                    # Limpieza del HTML
-                    for tag in soup(["script", "style", "noscript", "footer", "header", "nav", "aside"]):
-                        tag.decompose()
-
-                    # Extraer texto principal
-                    contenido = " ".join(p.get_text() for p in soup.find_all(["p", "article", "div", "main"]))
-                    contenido = re.sub(r"\s+", " ", contenido).strip()
-
-                    if len(contenido) > 10000:  # Limita el texto para evitar excesos
-                        contenido = contenido[:10000]
-
-                except Exception as e:
-                    print(f"⚠️ No se pudo extraer texto de {url}: {e}")
-                    contenido = ""
-
-                if contenido:
-                    resultados.append({
-                        "titulo": titulo,
-                        "url": url,
-                        "descripcion": descripcion,
-                        "contenido": contenido
-                    })
-                    texto_combinado += f"\n\n---\nFuente: {url}\n{titulo or ''}\n{descripcion or ''}\n{contenido}\n"
+        candidatos = []
+        for r in (buscador or buscador_compartido()).buscar(tema, num_resultados):
+            url = r.get("href")
+
+            if not url:
+                continue
+            if "lpi.usra.edu" in url or "wikipedia" in url.lower():
+                print(f"⏭️ Ignorado (fuente excluida): {url}")
+                continue
+
+            candidatos.append((url, r.get("title"), r.get("body")))
+
+        # Texto principal (sin menús ni pies), cortado a 10000 caracteres
+        obtenidos, bytes_descargados = _descargar_resultados(
+            candidatos, plazo, timeout=12, etiquetas=("p", "article", "div", "main"),
+            excluidas=EXCLUIDAS_EXTENDIDAS, limite=10000, espacios="normalizar")
+
+        for url, titulo, descripcion, contenido in obtenidos:
+            resultados.append({
+                "titulo": titulo,
+                "url": url,
+                "descripcion": descripcion,
+                "contenido": contenido
+            })
+            texto_combinado += f"\n\n---\nFuente: {url}\n{titulo or ''}\n{descripcion or ''}\n{contenido}\n"
 
     except Exception as e:
         print(f"⚠️ Error durante la búsqueda: {e}")
 
+    print(f"📦 {bytes_descargados / 1024:.0f} KB descargados para: {tema}")
     return {
         "resultados": resultados,
-        "texto": texto_combinado.strip()
+        "texto": texto_combinado.strip(),
+        "bytes": bytes_descargados
     }
 
 
@@ -135,12 +166,8 @@ def buscar_en_web_especial(meteorito, num_resultados=10):
 def extraer_contenido(url):
     """Extrae el texto principal de una página web."""
     try:
-        response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        soup = BeautifulSoup(response.text, "html.parser")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        texto = " ".join(p.get_text() for p in soup.find_all("p"))
-        return texto[:3000]
+        texto, _ = descargar_texto(sesion_compartida(), url, timeout=10, limite=3000, espacios=None)
+        return texto
     except Exception as e:
         print(f"⚠️ No se pudo extraer contenido de {url}: {e}")
         return ""
@@ -150,31 +177,32 @@ def extraer_contenido(url):
 # Unir meteoritos y eventos (en memoria)
 # -------------------------------------------------------------------
 
-def unir_datos(meteoritos, eventos):
+def unir_datos(meteoritos, eventos, metrica="grados", motor="vectorizado"):
+    """
+    Une cada meteorito con el evento NASA más cercano (±1 año).
+      - metrica: 'grados' (euclídea, < 0.5°) o 'haversine' (km, < RADIO_KM).
+      - motor: 'vectorizado' (NumPy por bloques) o 'indice' (rejilla en Python puro,
+        solo métrica 'grados').
+    Devuelve una lista de MeteoritoUnido (registros con __slots__ que se leen como dict).
+    """
     coincidencias = []
     usados = set()  # IDs o índices de eventos NASA ya emparejados
 
-    for m in meteoritos:
-        match_encontrado = None
-        min_distancia = float("inf")
-
-        for idx, e in enumerate(eventos):
-            # Calcular distancia geográfica
-            try:
-                distancia = ((float(e["lat"]) - float(m["coordinadesLat"])) ** 2 +
-                             (float(e["lon"]) - float(m["coordinadesLon"])) ** 2) ** 0.5
-            except (ValueError, TypeError):
-                continue
+    if motor == "vectorizado":
+        emparejados = emparejar_vectorizado(meteoritos, eventos, metrica=metrica)
+    elif motor == "indice" and metrica == "grados":
+        # Índice espacial: coordenadas y años de los eventos se parsean una sola vez
+        indice = IndiceEventos(eventos)
+        emparejados = [indice.mas_cercano(m)[0] for m in meteoritos]
+    else:
+        raise ValueError(f"Combinación no soportada: motor={motor}, metrica={metrica}")
 
-            # Coincidencia si está cerca y el año concuerda
-            try:
-                if distancia < 0.5 and abs(int(e["date"][:4]) - int(m["Year"])) <= 1:
-                    if distancia < min_distancia:
-                        min_distancia = distancia
-                        match_encontrado = e
-                        match_idx = idx
-            except (ValueError, TypeError):
-                continue
+    for m, match_idx in zip(meteoritos, emparejados):
+        # Evento más cercano cuyo año concuerda (±1)
+        match_encontrado = None
+        if match_idx is not None and match_idx >= 0:
+            match_idx = int(match_idx)
+            match_encontrado = eventos[match_idx]
 
         fotos_raw = m.get("fotos", "")
         fotos_limpias = []
@@ -189,59 +217,57 @@ def unir_datos(meteoritos, eventos):
                 })
 
         # Datos base
-        data = {
-            "name": m.get("Name", ""),
-            "status": m.get("Status", ""),
-            "fall": m.get("Fall", ""),
-            "year": m.get("Year", ""),
-            "place": m.get("Place", ""),
-            "type": m.get("Type", ""),
-            "mass": m.get("Mass", ""),
-            "country": m.get("Country", ""),
-            "basic_name": m.get("basic_name", ""),
-            "basic_abbrev": m.get("basic_abbrev", ""),
-            "basic_fall": m.get("basic_fall", ""),
-            "basic_yearFound": m.get("basic_yearFound", ""),
-            "basic_country": m.get("basic_country", ""),
-            "classification": m.get("classification_recomend", ""),
-            "coordinadesExact": m.get("coordinadesExact", ""),
-            "coordinadesLat": m.get("coordinadesLat", ""),
-            "coordinadesLon": m.get("coordinadesLon", ""),
-            "coordinadesRecomend": m.get("coordinadesRecomend", ""),
-            "coordinadesLatRecomend": m.get("coordinadesLatRecomend", ""),
-            "coordinadesLonRecomend": m.get("coordinadesLonRecomend", ""),
-            "dataMB109_Lat": m.get("DataMB109_Lat", ""),
-            "dataMB109_Lon": m.get("DataMB109_Lon", ""),
-            "dataMB109_Mass": m.get("DataMB109_Mass", ""),
-            "dataMB109_Piece": m.get("DataMB109_Piece", ""),
-            "dataMB109_Class": m.get("DataMB109_Class", ""),
-            "dataMB109_Weathering": m.get("DataMB109_Weathering", ""),
-            "dataMB109_Fayalite": m.get("DataMB109_Fayalite", ""),
-            "dataMB109_Ferrosilite": m.get("DataMB109_Ferrosilite", ""),
-            "dataMB109_Classifier": m.get("DataMB109_Classifier", ""),
-            "dataMB109_Main_mass": m.get("DataMB109_Main_mass", ""),
-            "dataMB109_Coments": m.get("DataMB109_Coments", ""),
-            "impact_date": "",
-            "impact_lat": "",
-            "impact_lon": "",
-            "impact_alt": "",
-            "impact_vel": "",
-            "impact_energy": "",
-            "impact_e": "",
-            "metBull_fotos": fotos_limpias,
-        }
+        data = MeteoritoUnido(
+            name=m.get("Name", ""),
+            status=m.get("Status", ""),
+            fall=m.get("Fall", ""),
+            year=m.get("Year", ""),
+            place=m.get("Place", ""),
+            type=m.get("Type", ""),
+            mass=m.get("Mass", ""),
+            country=m.get("Country", ""),
+            basic_name=m.get("basic_name", ""),
+            basic_abbrev=m.get("basic_abbrev", ""),
+            basic_fall=m.get("basic_fall", ""),
+            basic_yearFound=m.get("basic_yearFound", ""),
+            basic_country=m.get("basic_country", ""),
+            classification=m.get("classification_recomend", ""),
+            coordinadesExact=m.get("coordinadesExact", ""),
+            coordinadesLat=m.get("coordinadesLat", ""),
+            coordinadesLon=m.get("coordinadesLon", ""),
+            coordinadesRecomend=m.get("coordinadesRecomend", ""),
+            coordinadesLatRecomend=m.get("coordinadesLatRecomend", ""),
+            coordinadesLonRecomend=m.get("coordinadesLonRecomend", ""),
+            dataMB109_Lat=m.get("DataMB109_Lat", ""),
+            dataMB109_Lon=m.get("DataMB109_Lon", ""),
+            dataMB109_Mass=m.get("DataMB109_Mass", ""),
+            dataMB109_Piece=m.get("DataMB109_Piece", ""),
+            dataMB109_Class=m.get("DataMB109_Class", ""),
+            dataMB109_Weathering=m.get("DataMB109_Weathering", ""),
+            dataMB109_Fayalite=m.get("DataMB109_Fayalite", ""),
+            dataMB109_Ferrosilite=m.get("DataMB109_Ferrosilite", ""),
+            dataMB109_Classifier=m.get("DataMB109_Classifier", ""),
+            dataMB109_Main_mass=m.get("DataMB109_Main_mass", ""),
+            dataMB109_Coments=m.get("DataMB109_Coments", ""),
+            impact_date="",
+            impact_lat="",
+            impact_lon="",
+            impact_alt="",
+            impact_vel="",
+            impact_energy="",
+            impact_e="",
+            metBull_fotos=fotos_limpias,
+        )
 
         # Si hay coincidencia NASA → se completan campos
         if match_encontrado:
-            data.update({
-                "impact_date": match_encontrado.get("date", ""),
-                "impact_lat": match_encontrado.get("lat", ""),
-                "impact_lon": match_encontrado.get("lon", ""),
-                "impact_alt": match_encontrado.get("alt", ""),
-                "impact_vel": match_encontrado.get("vel", ""),
-                "impact_energy": match_encontrado.get("energy", ""),
-                "impact_e": match_encontrado.get("impact_e", ""),
-            })
+            data.impact_date = match_encontrado.get("date", "")
+            data.impact_lat = match_encontrado.get("lat", "")
+            data.impact_lon = match_encontrado.get("lon", "")
+            data.impact_alt = match_encontrado.get("alt", "")
+            data.impact_vel = match_encontrado.get("vel", "")
+            data.impact_energy = match_encontrado.get("energy", "")
+            data.impact_e = match_encontrado.get("impact_e", "")
             usados.add(match_idx)
 
         coincidencias.append(data)
@@ -249,50 +275,50 @@ def unir_datos(meteoritos, eventos):
     # 🔹 Agregar impactos NASA sin coincidencias
     sin_match = [e for i, e in enumerate(eventos) if i not in usados]
     for i, e in enumerate(sin_match, start=1):
-        coincidencias.append({
-            "name": f"Impacto {i}",
-            "status": "Desconocido",
-            "fall": "",
-            "year": e.get("date", "")[:4] if e.get("date") else "",
-            "place": "No identificado",
-            "type": "",
-            "mass": "",
-            "country": "",
-            "basic_name": "",
-            "basic_abbrev": "",
-            "basic_fall": "",
-            "basic_yearFound": "",
-            "basic_country": "",
-            "classification": "No hay información",
-            "coordinadesExact": "",
-            "coordinadesLat": e.get("lat", ""),
-            "coordinadesLon": e.get("lon", ""),
-            "coordinadesRecomend": "",
-            "coordinadesLatRecomend": "",
-            "coordinadesLonRecomend": "",
-            "dataMB109_Lat": "",
-            "dataMB109_Lon": "",
-            "dataMB109_Mass": "",
-            "dataMB109_Piece": "",
-            "dataMB109_Class": "",
-            "dataMB109_Weathering": "",
-            "dataMB109_Fayalite": "",
-            "dataMB109_Ferrosilite": "",
-            "dataMB109_Classifier": "",
-            "dataMB109_Main_mass": "",
-            "dataMB109_Coments": "Solo se tiene registro del impacto, sin meteorito asociado.",
-            "impact_date": e.get("date", ""),
-            "impact_lat": e.get("lat", ""),
-            "impact_lon": e.get("lon", ""),
-            "impact_alt": e.get("alt", ""),
-            "impact_vel": e.get("vel", ""),
-            "impact_energy": e.get("energy", ""),
-            "impact_e": e.get("impact_e", ""),
-            "metBull_fotos": [],
-        })
+        coincidencias.append(MeteoritoUnido(
+            name=f"Impacto {i}",
+            status="Desconocido",
+            fall="",
+            year=e.get("date", "")[:4] if e.get("date") else "",
+            place="No identificado",
+            type="",
+            mass="",
+            country="",
+            basic_name="",
+            basic_abbrev="",
+            basic_fall="",
+            basic_yearFound="",
+            basic_country="",
+            classification="No hay información",
+            coordinadesExact="",
+            coordinadesLat=e.get("lat", ""),
+            coordinadesLon=e.get("lon", ""),
+            coordinadesRecomend="",
+            coordinadesLatRecomend="",
+            coordinadesLonRecomend="",
+            dataMB109_Lat="",
+            dataMB109_Lon="",
+            dataMB109_Mass="",
+            dataMB109_Piece="",
+            dataMB109_Class="",
+            dataMB109_Weathering="",
+            dataMB109_Fayalite="",
+            dataMB109_Ferrosilite="",
+            dataMB109_Classifier="",
+            dataMB109_Main_mass="",
+            dataMB109_Coments="Solo se tiene registro del impacto, sin meteorito asociado.",
+            impact_date=e.get("date", ""),
+            impact_lat=e.get("lat", ""),
+            impact_lon=e.get("lon", ""),
+            impact_alt=e.get("alt", ""),
+            impact_vel=e.get("vel", ""),
+            impact_energy=e.get("energy", ""),
+            impact_e=e.get("impact_e", ""),
+            metBull_fotos=[],
+        ))
 
     total = len(coincidencias)
-    con_match = sum(1 for c in coincidencias if c["impact_date"])
+    con_match = sum(1 for c in coincidencias if c.impact_date)
     print(f"✅ {total} registros procesados — {con_match} con datos NASA (incluidos impactos sin meteorito)")
 
     return coincidencias
@@ -330,7 +356,17 @@ def parse_info_ia(texto):
 
     return datos
 
-def obtener_datos_con_ia(meteorito, texto_web=""):
+def contexto_para_ia(texto_web, nombre, presupuesto_tokens=PRESUPUESTO_TOKENS):
+    """Reduce el texto web a lo más relevante dentro del presupuesto de tokens."""
+    contexto, e = construir_contexto(texto_web, nombre, presupuesto_tokens)
+    if texto_web:
+        print(f"📉 Contexto {nombre}: {e['tokens_antes']} → {e['tokens_despues']} tokens "
+              f"({e['repetidas']}/{e['oraciones']} oraciones repetidas, {e['elegidos']}/{e['fragmentos']} fragmentos)")
+    return contexto
+
+
+def obtener_datos_con_ia(meteorito, texto_web="", prioridad=PRIORIDAD_NORMAL,
+                         presupuesto_tokens=PRESUPUESTO_TOKENS):
     """
     Genera información extendida de un meteorito usando Ollama (modelo llama3).
     Si un campo está vacío, devuelve 'No hay información'.
@@ -339,16 +375,20 @@ def obtener_datos_con_ia(meteorito, texto_web=""):
     """
 
     if isinstance(meteorito, dict):
-        name = meteorito.get("Name", "")
-        year = meteorito.get("Year", "")
+        # Registros unidos (MeteoritoUnido) en minúsculas; filas del MetBull con mayúscula
+        name = meteorito.get("Name", meteorito.get("name", ""))
+        year = meteorito.get("Year", meteorito.get("year", ""))
         lat = meteorito.get("coordinadesLat") or meteorito.get("DataMB109_Lat") or ""
         lon = meteorito.get("coordinadesLon") or meteorito.get("DataMB109_Lon") or ""
-        mass = meteorito.get("Mass", "")
-        country = meteorito.get("Country", "")
+        mass = meteorito.get("Mass", meteorito.get("mass", ""))
+        country = meteorito.get("Country", meteorito.get("country", ""))
     else:
         name = str(meteorito)
         year = lat = lon = mass = country = ""
 
+    # presupuesto_tokens=None → texto completo (sin compactar)
+    contexto = texto_web if presupuesto_tokens is None else contexto_para_ia(texto_web, name, presupuesto_tokens)
+
     prompt = f"""
 Actúa como un investigador experto en meteoritos que habla en español.
 Tienes los siguientes datos base y, si existe, información web.
@@ -380,7 +420,7 @@ fotos:
 videos:
 
 Texto de referencia:
-{texto_web}
+{contexto}
 
 Datos base:
 nombre: {name}
@@ -392,10 +432,8 @@ longitud: {lon}
 """
 
     try:
-        respuesta = ollama.chat(model="llama3", messages=[
-            {"role": "user", "content": prompt}
-        ])
-        texto = respuesta["message"]["content"].strip()
+        # Cola de inferencia compartida (techo OLLAMA_NUM_PARALLEL, especiales primero)
+        texto = planificador_compartido().chat(prompt, prioridad, etiqueta=name).strip()
 
         # Campos esperados
         campos = [
@@ -467,7 +505,8 @@ def parse_info_ia_especial(texto):
     return datos
 
 
-def obtener_datos_con_ia_especial(meteorito, texto_web=""):
+def obtener_datos_con_ia_especial(meteorito, texto_web="", prioridad=PRIORIDAD_ESPECIAL,
+                                  presupuesto_tokens=PRESUPUESTO_TOKENS):
     """
     Usa el modelo IA para generar información contextual extendida sobre el meteorito.
     Incluye datos de historia, origen, impacto, descubrimiento, noticias, etc.
@@ -490,6 +529,12 @@ def obtener_datos_con_ia_especial(meteorito, texto_web=""):
     energia = meteorito.get("impact_energy", "")
     place = meteorito.get("Place", "")
 
+    # presupuesto_tokens=None → recorte fijo anterior, sin compactar
+    if presupuesto_tokens is None:
+        contexto = texto_web[:15000]
+    else:
+        contexto = contexto_para_ia(texto_web, name, presupuesto_tokens)
+
     prompt = f"""
 Eres un investigador experto en meteoritos, escribe en español y con tono científico-divulgativo.
 Tu tarea es generar información completa y coherente sobre el meteorito con base en los datos y textos disponibles.
@@ -517,7 +562,7 @@ fotos:
 videos:
 
 📄 Texto de referencia:
-{texto_web[:15000]}
+{contexto}
 
 📊 Datos base:
 nombre: {name}
@@ -538,10 +583,8 @@ ferrosilita: {ferrosilite}
 """
 
     try:
-        respuesta = ollama.chat(model="llama3", messages=[
-            {"role": "user", "content": prompt}
-        ])
-        texto = respuesta["message"]["content"].strip()
+        # Cola de inferencia compartida (techo OLLAMA_NUM_PARALLEL, especiales primero)
+        texto = planificador_compartido().chat(prompt, prioridad, etiqueta=name).strip()
         nuevos_datos = parse_info_ia_especial(texto)
 
         # Fusionar datos nuevos con los existentes sin perder nada
@@ -560,38 +603,44 @@ ferrosilita: {ferrosilite}
 # -------------------------------------------------------------------
 # Guardar a JSON 
 # -------------------------------------------------------------------
-def guardar_total(resultados, nombre="meteoritos.json"):
-    """Guarda todos los resultados en un único archivo JSON, actualizando sin duplicar."""
-    ruta = os.path.join(os.path.dirname(__file__), nombre)
+ARCHIVO_JSONL = "meteoritos.jsonl"   # registro de resultados (solo anexar)
+ARCHIVO_JSON = "meteoritos.json"     # exportación compactada para ImportJsontoSql.js
 
-    # Si ya existe, cargar y actualizar sin duplicados
-    existentes = []
-    if os.path.exists(ruta):
-        try:
-            with open(ruta, "r", encoding="utf-8") as f:
-                existentes = json.load(f)
-        except json.JSONDecodeError:
-            existentes = []
 
-    # Evita duplicar por nombre y año
-    existentes_dict = {(e.get("name"), e.get("year")): e for e in existentes}
-    for r in resultados:
-        existentes_dict[(r.get("name"), r.get("year"))] = r
+def _ruta(nombre):
+    return os.path.join(os.path.dirname(__file__), nombre)
+
+
+def guardar_total(resultados, nombre=ARCHIVO_JSONL):
+    """Anexa los resultados al JSONL sin releer ni reescribir el archivo."""
+    with EscritorJsonl(_ruta(nombre)) as escritor:
+        for r in resultados:
+            escritor.escribir(r)
+    print(f"💾 {escritor.escritos} meteoritos anexados a {nombre}.")
+
 
-    # Guardar versión actualizada
-    with open(ruta, "w", encoding="utf-8") as f:
-        json.dump(list(existentes_dict.values()), f, ensure_ascii=False, indent=2)
+def compactar_total(nombre=ARCHIVO_JSONL, nombre_json=ARCHIVO_JSON):
+    """Deduplica por nombre y año al final de la ejecución y exporta el JSON (escritura atómica)."""
+    total = compactar(_ruta(nombre), _ruta(nombre_json))
+    print(f"💾 Archivo actualizado: {total} meteoritos guardados.")
 
-    print(f"💾 Archivo actualizado: {len(existentes_dict)} meteoritos guardados.")
 
+def cargar_total(nombre=ARCHIVO_JSONL):
+    """Genera los datos ya procesados uno a uno (si existen)."""
+    ruta = _ruta(nombre)
+    if nombre.endswith(".jsonl"):
+        if os.path.exists(ruta):
+            yield from leer_jsonl(ruta)
+            return
+        # Compatibilidad: resultados previos guardados solo como meteoritos.json
+        ruta = _ruta(ARCHIVO_JSON)
 
-def cargar_total(nombre="meteoritos.json"):
-    """Carga los datos ya procesados si existen."""
-    ruta = os.path.join(os.path.dirname(__file__), nombre)
     if os.path.exists(ruta):
-        with open(ruta, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                yield from json.load(f)
+        except json.JSONDecodeError:
+            return
 
 
 # -------------------------------------------------------------------
@@ -607,79 +656,17 @@ def texto_contiene_palabras_clave(texto, nombre_meteorito=None):
     Retorna True si vale la pena procesarlo con IA.
     """
 
-    if not texto or len(texto.strip()) < 100:
-        return False  # texto demasiado corto → probablemente irrelevante
-
-    texto = texto.lower()
-    nombre_meteorito = (nombre_meteorito or "").lower().strip()
-
-    # ⚡️ Frases clave o contextos importantes
-    patrones_relevantes = [
-        # --- Impacto físico / ambiental / consecuencias ---
-        r"(impact(ed|ing)?|cause(d)? (a )?(damage|change|shock|event|fire|explosion|impact)|"
-        r"impact (area|zone|site)|impact effect|blast wave|crater formation|"
-        r"released energy|energy of impact|impact velocity|entry velocity|angle of impact|"
-        r"impact magnitude|airburst|collision energy)",
-
-        # --- Historia / origen / descubrimiento ---
-        r"(discovered in|was discovered|originated from|formed in|composition of|parent body|source asteroid|"
-        r"was part of|fragmented from|classified as|recovered in|meteorite classification|"
-        r"scientists (believe|suggest)|studies (show|indicate)|analysis revealed)",
-
-        # --- Datos científicos ---
-        r"(velocity of|speed of entry|temperature reached|pressure impact|shock stage|"
-        r"kinetic energy|mass of the meteorite|density|fusion crust|matrix|chondrules|"
-        r"chemical composition|structure|grain size|surface features|melting point)",
-
-        # --- Importancia o contexto histórico ---
-        r"(news report|witnessed event|documented fall|reported by|observed fall|"
-        r"impact caused|caused panic|injured|destroyed|hit the ground|"
-        r"economic impact|affected the region|changed the landscape)"
-    ]
+    # Clasificador precompilado: un solo recorrido del texto para todos los grupos
+    return clasificador.es_relevante(texto, nombre_meteorito)
 
-    # 🚫 Contenido irrelevante (común en tiendas o páginas genéricas)
-    patrones_irrelevantes = [
-        r"(found in|located in|coordinates|latitude|longitude|"
-        r"copyright|newsletter|subscribe|buy|price|store|shop|review|discount|"
-        r"collection|museum piece|sold by|available for sale)"
-    ]
 
-    # Si hay demasiados términos irrelevantes → descartar
-    if sum(bool(re.search(p, texto)) for p in patrones_irrelevantes) >= 2:
-        return False
-
-    # Contar coincidencias relevantes (por grupos de contexto)
-    coincidencias = sum(bool(re.search(p, texto)) for p in patrones_relevantes)
-
-    # 📍 Validar si el nombre del meteorito aparece (exacto o parcial)
-    nombre_presente = False
-    if nombre_meteorito:
-        # coincidencia exacta o parcial (por ejemplo "Abadla" en "Abadla 002")
-        patron_nombre = re.escape(nombre_meteorito.split()[0])
-        if re.search(rf"\b{patron_nombre}\b", texto):
-            nombre_presente = True
-
-        # si aparece al principio del texto o en mayúsculas repetidas → más peso
-        primeros_300 = texto[:300]
-        if re.search(rf"\b{patron_nombre}\b", primeros_300):
-            coincidencias += 1
-            nombre_presente = True
-
-    # 🔍 Regla final de decisión
-    # - Requiere al menos 2 coincidencias relevantes
-    # - Y el nombre debe estar mencionado de alguna forma
-    if coincidencias >= 2 and nombre_presente:
-        return True
-    else:
-        return False
-
-
-def iniciar_procesamiento(meteoritos, eventos, filtros_personales=None):
+def iniciar_procesamiento(meteoritos, eventos, filtros_personales=None, criterios=None):
     """
     Controla todo el flujo de procesamiento:
     1. Filtra por criterios automáticos y manuales.
     2. Guarda vacíos los que no cumplen.
     3. Procesa con IA los que sí cumplen o los marcados manualmente.
+    `criterios`: masa_minima, con_fotos, anio_minimo (ver SeleccionMeteoritos).
     """
 
     print("\n🚀 Iniciando procesamiento general...\n")
@@ -687,49 +674,27 @@ def iniciar_procesamiento(meteoritos, eventos, filtros_personales=None):
     # -------------------------------
     # 🔹 Unir los datos base
     # -------------------------------
-    coincidencias = unir_datos(meteoritos, eventos)
+    tiempos = {}
+    with medir(tiempos, "unir"):
+        coincidencias = unir_datos(meteoritos, eventos)
     print(f"🔍 Total de coincidencias unidas: {len(coincidencias)}")
 
     # -------------------------------
-    # 🔹 Filtro automático (criterios básicos)
+    # 🔹 Filtro automático (máscaras sobre columnas) y lista manual
     # -------------------------------
-    df = pd.DataFrame(coincidencias)
-    df["Mass_num"] = df["mass"].apply(
-        lambda x: float(x) if str(x).replace(".", "", 1).isdigit() else 0
-    )
-    df["Year_num"] = df["year"].apply(
-        lambda y: int(y) if str(y).isdigit() else 0
-    )
-
-    df["Mass_num"] = pd.to_numeric(df.get("mass", 0), errors="coerce").fillna(0)
-
-    # Determinar si tiene fotos
-    df["tiene_fotos"] = df["metBull_fotos"].apply(lambda fotos: bool(fotos and len(fotos) > 0))
-
-    # Aplicar criterios:
-    # - Masa >= 3000 g
-    # - Tiene al menos una foto
-    cumple_criterios = df[
-        (df["Mass_num"] >= 4000) | (df["tiene_fotos"])
-    ].to_dict(orient="records")
-
-    # Los que no cumplen (impactos sin coincidencia o datos limitados)
-    no_cumple = df[~df.index.isin(
-        [df.index[df["name"] == c["name"]][0] for c in cumple_criterios]
-    )].to_dict(orient="records")
+    # Por defecto: masa >= 4000 g o al menos una foto
+    seleccion = seleccionar(coincidencias, filtros_personales, criterios)
+    cumple_criterios = seleccion["cumplen"]
+    no_cumple = seleccion["no_cumplen"]
+    especiales = seleccion["especiales"]
+    tiempos.update(seleccion["tiempos"])
 
     print(f"🧮 Cumplen criterios: {len(cumple_criterios)} | No cumplen: {len(no_cumple)}")
-
-    # -------------------------------
-    # 🔹 Filtro personal (lista manual)
-    # -------------------------------
-    especiales = []
     if filtros_personales:
-        palabras = [p.lower() for p in filtros_personales]
-        especiales = [c for c in coincidencias if any(p in c["name"].lower() for p in palabras)]
         print(f"🎯 Meteoritos marcados manualmente: {len(especiales)}")
     else:
         print("ℹ️ No se definieron filtros personales.")
+    print(f"⏱️ Selección: {resumen_tiempos(tiempos)}")
 
     # -------------------------------
     # 🔹 Procesar según el tipo
@@ -755,20 +720,29 @@ def procesar_datos(meteoritos, eventos, tipo="criterios", max_workers=8):
       - 'especiales': se procesarán distinto (por ahora igual que criterios, luego lo afinamos).
     """
 
-    procesados = cargar_total()
-    nombres_procesados = {(p.get("name"), p.get("year")) for p in procesados}
+    # 📒 Registro persistente: reanuda por etapas y solo toca filas nuevas o modificadas
+    registro = RegistroTrabajo()
+    if registro.vacio():
+        importados = registro.importar_resultados(cargar_total())
+        if importados:
+            print(f"📒 Registro inicializado con {importados} meteoritos ya procesados.")
+    pendientes = registro.registrar_unidos(meteoritos, tipo)
+
+    # Migración: si solo existe meteoritos.json, se vuelca una vez al JSONL
+    if not os.path.exists(_ruta(ARCHIVO_JSONL)):
+        guardar_total(cargar_total(ARCHIVO_JSON))
+    escritor = EscritorJsonl(_ruta(ARCHIVO_JSONL))
+
+    # Los especiales pasan delante en la cola de inferencia
+    prioridad = PRIORIDAD_ESPECIAL if tipo == "especiales" else PRIORIDAD_NORMAL
+
     campos_ia_base = [
         "ia_nombre", "ia_historia", "ia_importancia", "ia_descubrimiento", "ia_impacto",
         "ia_velocidad", "ia_energia", "ia_links", "ia_fotos", "ia_videos"
     ]
 
-    nuevos_resultados = []
-
     def procesar_uno(c):
         try:
-            if (c.get("name"), c.get("year")) in nombres_procesados:
-                return None
-
             fusionado = c.copy()
 
             # -------------------------------
@@ -778,19 +752,37 @@ def procesar_datos(meteoritos, eventos, tipo="criterios", max_workers=8):
                 print(f"⏩ Guardado vacío: {c['name']} ({c['year']})")
                 for campo in campos_ia_base:
                     fusionado[campo] = ""
+                # Primero la línea del JSONL y después el registro: si el proceso cae
+                # entre ambos, queda un duplicado (compactar lo descarta), no una pérdida
+                escritor.escribir(fusionado)
+                registro.guardar_resultado(c, fusionado, etapa="unido")
                 return fusionado
 
             # -------------------------------
             # 🌍 Si cumple criterios → buscar web y procesar IA
             # -------------------------------
             if tipo == "criterios" or tipo == "especiales":
-                print(f"\n🪐 Procesando: {c['name']} ({c['year']})")
-                busqueda = buscar_en_web(c)
-                texto_web = busqueda["texto"]
+                estado = registro.estado(c) or {}
+                etapa = estado.get("etapa", "unido")
+
+                if etapa == "unido":
+                    print(f"\n🪐 Procesando: {c['name']} ({c['year']})")
+                    busqueda = buscar_en_web(c)
+                    texto_web = busqueda["texto"]
+                    registro.marcar_buscado(c, texto_web)
+                else:
+                    print(f"\n🪐 Reanudando: {c['name']} ({c['year']}) desde '{etapa}'")
+                    texto_web = estado.get("texto_web") or ""
+
+                relevante = estado.get("relevante")
+                if relevante is None:
+                    relevante = texto_contiene_palabras_clave(texto_web, c.get("name"))
+                    registro.marcar_filtrado(c, relevante)
 
-                if texto_contiene_palabras_clave(texto_web, c.get("name")):
+                if relevante:
                     print(f"🤖 Analizando con IA...\n")
-                    c_actualizado = obtener_datos_con_ia(c, texto_web)
+                    # La IA escribe sus campos ia_* en un dict aparte (el registro unido no los tiene)
+                    c_actualizado = obtener_datos_con_ia(c.copy(), texto_web, prioridad)
 
                     info_ia_campos = parse_info_ia(
                         "\n".join(f"{k}: {v}" for k, v in c_actualizado.items() if k.startswith("ia_"))
@@ -806,6 +798,8 @@ def procesar_datos(meteoritos, eventos, tipo="criterios", max_workers=8):
                 for campo in campos_ia_base:
                     fusionado.setdefault(campo, "")
 
+                escritor.escribir(fusionado)
+                registro.guardar_resultado(c, fusionado, etapa="enriquecido" if relevante else "filtrado")
                 return fusionado
 
         except Exception as e:
@@ -813,18 +807,27 @@ def procesar_datos(meteoritos, eventos, tipo="criterios", max_workers=8):
             return None
 
     # -------------------------------
-    # 🧵 Ejecución paralela
+    # 🧵 Ejecución paralela (cada resultado se persiste en el registro al terminar)
     # -------------------------------
+    nuevos = 0
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for resultado in executor.map(procesar_uno, meteoritos):
+        for resultado in executor.map(procesar_uno, pendientes):
             if resultado:
-                nuevos_resultados.append(resultado)
-                if len(nuevos_resultados) % 10 == 0:
-                    guardar_total(nuevos_resultados)
-                    nuevos_resultados = []
+                nuevos += 1
 
-    if nuevos_resultados:
-        guardar_total(nuevos_resultados)
+    escritor.cerrar()
+    registro.cerrar()
+
+    if tipo != "vacios":
+        print(f"🔎 Búsquedas web: {buscador_compartido().estadisticas}")
+        print(f"🤖 Inferencia: {planificador_compartido().resumen()}")
+        cache_ia = cache_ia_compartida()
+        print(f"🗃️ Caché IA: tasa de aciertos {cache_ia.estadisticas()['tasa_aciertos']}, "
+              f"desalojadas {cache_ia.desalojar()}")
+
+    # Compactar una sola vez al final (deduplica por nombre y año, escritura atómica)
+    print(f"📒 {nuevos} meteoritos nuevos en esta ejecución.")
+    compactar_total()
 
     print(f"\n✅ Procesamiento tipo '{tipo}' completado.\n")
 
@@ -832,17 +835,32 @@ def procesar_datos(meteoritos, eventos, tipo="criterios", max_workers=8):
 # Uso
 # -------------------------------------------------------------------
 
-def leer_csv_a_lista(ruta):
-    """Lee un CSV y lo convierte en una lista de diccionarios, evitando warnings por tipos mixtos."""
-    if not os.path.exists(ruta):
-        print(f"⚠️ No se encontró el archivo: {ruta}")
-        return []
+# Columnas de meteoritos_Metbull que lee unir_datos (historia, referencias... no se cargan)
+COLUMNAS_UNION_METBULL = [
+    "Name", "Status", "Fall", "Year", "Place", "Type", "Mass", "Country",
+    "basic_name", "basic_abbrev", "basic_fall", "basic_yearFound", "basic_country",
+    "classification_recomend", "coordinadesExact", "coordinadesLat", "coordinadesLon",
+    "coordinadesRecomend", "coordinadesLatRecomend", "coordinadesLonRecomend",
+    "DataMB109_Lat", "DataMB109_Lon", "DataMB109_Mass", "DataMB109_Piece", "DataMB109_Class",
+    "DataMB109_Weathering", "DataMB109_Fayalite", "DataMB109_Ferrosilite", "DataMB109_Classifier",
+    "DataMB109_Main_mass", "DataMB109_Coments", "fotos",
+]
+
+
+def leer_tabla_a_lista(ruta_base, columnas=None):
+    """
+    Lee <ruta_base>.arrow/.parquet/.csv (el más reciente) y lo convierte en una
+    lista de diccionarios con todo como texto ("" en los vacíos).
+    """
     try:
-        df = pd.read_csv(ruta, low_memory=False, dtype=str)  # fuerza todo a texto
-        return df.fillna("").to_dict(orient="records")
+        df = leer_tabla(ruta_base, columnas=columnas, esquema=esquema_para(ruta_base))
     except Exception as e:
-        print(f"⚠️ Error leyendo CSV {ruta}: {e}")
+        print(f"⚠️ Error leyendo {ruta_base}: {e}")
+        return []
+    if df is None:
+        print(f"⚠️ No se encontró el archivo: {ruta_base} (.parquet/.arrow/.csv)")
         return []
+    return registros_texto(df)
 
 
 
@@ -851,13 +869,13 @@ if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, "data")
 
-    # Rutas de los CSV
-    meteoritos_path = os.path.join(data_dir, "meteoritos_Metbull.csv")
-    eventos_path = os.path.join(data_dir, "meteoritos_NasaCNEOS.csv")
+    # Rutas base (Parquet/Arrow si existen, si no CSV)
+    meteoritos_path = os.path.join(data_dir, "meteoritos_Metbull")
+    eventos_path = os.path.join(data_dir, "meteoritos_NasaCNEOS")
 
-    # Cargar datos desde los CSV
-    meteorito = leer_csv_a_lista(meteoritos_path)
-    eventos = leer_csv_a_lista(eventos_path)
+    # Cargar datos: de MetBull solo las columnas que se unen
+    meteorito = leer_tabla_a_lista(meteoritos_path, COLUMNAS_UNION_METBULL)
+    eventos = leer_tabla_a_lista(eventos_path)
     filtros_personales = ["Canyon Diablo","Ali","Willamette", "Winchcombe", "Fukang", "Hoba","Gancedo","El Chaco","Ahnighito","Bacubirito","Tunguska","Cheliábinsk","Barringer","Chicxulub","Sikhote-Alin","Allende","Mbozi","Bacubirito","Armanty","Ahnighito"]
 
     resultados = iniciar_procesamiento(meteorito, eventos, filtros_personales)
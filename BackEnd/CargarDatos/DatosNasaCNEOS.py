@@ -2,6 +2,8 @@ import os
 import requests
 import pandas as pd
 
+from AlmacenColumnar import COLUMNAS_CNEOS, guardar_tabla
+
 def obtener_nasa_fireballs(limit=1000):
     url = f"https://ssd-api.jpl.nasa.gov/fireball.api?limit={limit}"
     response = requests.get(url)
@@ -20,6 +22,7 @@ if __name__ == "__main__":
     output_dir = os.path.join(script_dir, "data")  # carpeta "data" junto al script
     os.makedirs(output_dir, exist_ok=True)  # la crea si no existe
 
-    output_path = os.path.join(output_dir, "meteoritos_NasaCNEOS.csv")
-    df.to_csv(output_path, index=False, encoding="utf-8")
-    print("Guardado en meteoritos_NasaCNEOS.csv")
\ No newline at end of file
+    # Parquet tipado (lat/lon/energía como float) + CSV exportado
+    output_base = os.path.join(output_dir, "meteoritos_NasaCNEOS")
+    for output_path in guardar_tabla(df, output_base, COLUMNAS_CNEOS):
+        print(f"Guardado en {os.path.basename(output_path)}")
\ No newline at end of file
@@ -1,114 +1,120 @@
+import argparse
+import asyncio
+import json
 import os
 import re
+import threading
 import time
-import random
 
 from bs4 import BeautifulSoup
 import pandas as pd
-import cloudscraper
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-
-# Scraper 
-scraper = cloudscraper.create_scraper()
-
-# URL 
+from AlmacenColumnar import (COLUMNAS_METBULL, COLUMNAS_PRELIMPIEZA, fecha_particiones, guardar_particion,
+                             guardar_tabla, leer_tabla, particiones, ruta_existente, ruta_particion)
+from CacheHttp import instalar_cache
+from ControlTasa import ControladorAIMD, instalar_control
+from EtapaParseo import EtapaParseo
+from ExtractorMetbull import extraer
+from FetchAsync import FetcherAsync, procesar_cola
+from IndiceMetbull import IndiceMetbull, bajas_sospechosas, comparar_listado
+from LimpiezaMetbull import limpiar_metbull, limpiar_por_bloques, masas_en_gramos
+# Los parsers vivían en este módulo; se re-exportan para los imports existentes
+from LimpiezaMetbull import normalizar_masa, parse_year, parseCoordinates  # noqa: F401
+
+# Importar este módulo no hace peticiones ni escribe archivos: el scraper y
+# la lista de países se crean al primer uso, y el crawl y la limpieza se
+# lanzan desde la línea de comandos (ver __main__).
+
+# Control AIMD único para todas las peticiones al LPI (scraper síncrono y fetcher asíncrono)
+controlador_lpi = ControladorAIMD("lpi.usra.edu")
+
+# URL
 url_base = "https://www.lpi.usra.edu/meteor/metbull.php"
 
-def parseCoordinates(coordString):
-    """
-    Convierte coordenadas en formato grados, minutos, segundos (DMS) o decimal
-    a un dict {'lat': float, 'lon': float}.
-    Ejemplos válidos:
-      "34° 39' 0\"N, 61° 10' 48\"E"
-      "34 39 0 N 61 10 48 E"
-      "34.65, 61.18"
-    """
-    if not coordString:
-        return {"lat": None, "lon": None}
-
-    # Quitar paréntesis y comillas
-    coordString = re.sub(r"[()\"\\]", "", coordString).strip()
-
-    # Separar latitud y longitud por coma, si existe
-    parts = [p.strip() for p in coordString.split(",")]
-    if len(parts) < 2:
-        # intentar separar por espacios
-        parts = re.split(r"\s+", coordString)
-        if len(parts) < 2:
-            return {"lat": None, "lon": None}
-
-    def gmsToDecimal(part):
-        """
-        Convierte un string DMS a decimal
-        """
-        # Detectar DMS
-        match = re.match(
-            r"(\d+(?:\.\d+)?)°?\s*(\d+(?:\.\d+)?)?['′]?\s*(\d+(?:\.\d+)?)?['\"″]?\s*([NSEW])?",
-            part.strip(),
-            re.I
-        )
-        if not match:
-            # si solo es número decimal
-            try:
-                return float(part)
-            except:
-                return None
+ARCHIVO_PAISES = "paises_metbull.json"     # lista de países guardada en data/
+TTL_PAISES = 30 * 24 * 3600                # segundos
+ARCHIVO_INDICE = "indice_metbull.sqlite"   # índice del crawl incremental, en data/
 
-        deg = float(match.group(1))
-        min_ = float(match.group(2)) if match.group(2) else 0
-        sec = float(match.group(3)) if match.group(3) else 0
-        dir_ = match.group(4).upper() if match.group(4) else None
+_scraper = None
+_lock_scraper = threading.Lock()
 
-        decimal = deg + min_/60 + sec/3600
 
-        if dir_ in ["S", "W"]:
-            decimal = -decimal
+def scraper_compartido():
+    """
+    Scraper del LPI, creado al primer uso (con caché HTTP en disco compartida;
+    METEORA_OFFLINE=1 → solo caché).
+    Orden: caché → control AIMD → adaptador TLS de cloudscraper.
+    """
+    global _scraper
+    with _lock_scraper:
+        if _scraper is None:
+            import cloudscraper
 
-        return decimal
+            _scraper = cloudscraper.create_scraper()
+            instalar_control(_scraper, controlador_lpi, "https://www.lpi.usra.edu/")
+            instalar_cache(_scraper)
+        return _scraper
 
-    lat = gmsToDecimal(parts[0])
-    lon = gmsToDecimal(parts[1])
-    return {"lat": lat, "lon": lon}
 
-def fetch_detail(fila, retries=3):
-    for intento in range(retries):
-        try:
-            detalle = extraer_detalles(fila["_href"])
-            fila.update(detalle)
-            fila.pop("_href", None)
-            return fila
-        except Exception as e:
-            print(f"Error en detalle {fila.get('Name')}: {e}")
-            if intento < retries - 1:
-                wait = 2 ** intento + random.random()  # backoff exponencial
-                print(f"Reintentando en {wait:.1f}s...")
-                time.sleep(wait)
-            else:
-                print("Falló después de varios intentos")
-                return fila  # devuelve la fila sin detalle
+# -------------------------------------------------------------------
+# Lista de países (guardada en disco)
+# -------------------------------------------------------------------
 
-def parse_year(year_str):
-    if not year_str or pd.isna(year_str):
-        return None
-    # Buscar los primeros dígitos consecutivos
-    match = re.match(r"(\d{3,4})", str(year_str))
-    if match:
-        return int(match.group(1))
-    return None
+def parsear_paises(html):
+    """Valores del <select name="country"> del buscador del MetBull."""
+    soup = BeautifulSoup(html, "lxml")
+    select_country = soup.find("select", {"name": "country"})
 
+    countries = []
+    if select_country:
+        for option in select_country.find_all("option"):
+            if option.get("value"):  # evitar vacíos
+                countries.append(option.get("value"))
+    return countries
 
-response = scraper.get(url_base)
-soup = BeautifulSoup(response.text, "lxml")
 
-select_country = soup.find("select", {"name": "country"})
+def listar_paises(directorio=None, refrescar=False, ttl=TTL_PAISES):
+    """
+    Países del MetBull. Se guardan en data/paises_metbull.json y se reutilizan
+    mientras no venzan (arranque sin red); si la descarga falla o no trae la
+    lista, se usa la guardada aunque esté vencida.
+    """
+    ruta = os.path.join(_directorio_datos(directorio), ARCHIVO_PAISES)
+    guardado = None
+    if os.path.exists(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            guardado = json.load(f)
+        if not refrescar and time.time() - guardado["guardado"] < ttl:
+            return guardado["paises"]
 
-countries = []
-if select_country:
-    for option in select_country.find_all("option"):
-        if option.get("value"):  # evitar vacíos
-            countries.append(option.get("value"))
+    try:
+        response = scraper_compartido().get(url_base)
+        response.raise_for_status()
+        countries = parsear_paises(response.text)
+    except Exception as e:
+        if guardado is None:
+            raise
+        print(f"⚠️ No se pudo actualizar la lista de países ({e}); se usa la guardada")
+        return guardado["paises"]
+
+    if not countries:
+        print("⚠️ La página del MetBull no trajo la lista de países")
+        return guardado["paises"] if guardado else []
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"guardado": time.time(), "paises": countries}, f, ensure_ascii=False, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+    return countries
+
+
+def seleccionar_paises(nombres=None, limite=None, directorio=None, refrescar=False):
+    """Países a rastrear: `nombres` o todos los del MetBull (menos "ALL"); los primeros `limite`."""
+    if nombres:
+        countries = list(nombres)
+    else:
+        countries = [c for c in listar_paises(directorio, refrescar) if c.upper() != "ALL"]
+    return countries[:limite] if limite else countries
 
 
 def limpiar_texto(texto: str) -> str:
@@ -116,296 +122,115 @@ def limpiar_texto(texto: str) -> str:
         return ""
     return re.sub(r"\s+", " ", texto.strip())
 
-def normalizar_masa(masa):
+
+class MeteoriteDetail:
     """
-    Normaliza la masa a gramos (g).
-    Acepta valores en g, kg, mg, t, etc.
-    Retorna float en gramos o None si no es válido.
+    Ficha de detalle del MetBull. La extracción la hace ExtractorMetbull
+    (motor="lxml" de una pasada por defecto; motor="bs4" es la implementación
+    original, útil para comparar).
     """
-    if masa is None or (isinstance(masa, float) and pd.isna(masa)):
-        return None
-
-    # Convertir todo a texto para procesar
-    if not isinstance(masa, str):
-        masa = str(masa)
-
-    masa = masa.strip().lower().replace(",", ".").replace(" ", "")
-
-    # Detectar la unidad
-    if masa.endswith("mg"):
-        unidad = "mg"
-        masa = masa.replace("mg", "")
-        factor = 0.001  # 1 mg = 0.001 g
-    elif masa.endswith("kg"):
-        unidad = "kg"
-        masa = masa.replace("kg", "")
-        factor = 1000.0  # 1 kg = 1000 g
-    elif masa.endswith("t") or masa.endswith("ton") or masa.endswith("tonne"):
-        unidad = "t"
-        masa = masa.replace("t", "").replace("ton", "").replace("tonne", "")
-        factor = 1_000_000.0  # 1 tonelada = 1,000,000 g
-    elif masa.endswith("g"):
-        unidad = "g"
-        masa = masa.replace("g", "")
-        factor = 1.0
-    else:
-        # Sin unidad conocida, asumir gramos
-        unidad = "g"
-        factor = 1.0
 
-    try:
-        valor = float(masa)
-        return round(valor * factor, 3)  # retorna en gramos
-    except ValueError:
-        return None
-
-
-
-class MeteoriteDetail:
-    def __init__(self, url=None, html=None):
+    def __init__(self, url=None, html=None, motor="lxml"):
         if url:
-            response = scraper.get(url)
+            response = scraper_compartido().get(url)
             response.raise_for_status()
-            self.soup = BeautifulSoup(response.text, "html.parser")
+            self.html = response.text
         elif html:
-            self.soup = BeautifulSoup(html, "html.parser")
+            self.html = html
         else:
             raise ValueError("Debes pasar un url o un html")
+        self.motor = motor
         self.data = {}
 
     def parse(self):
         """Extrae toda la información principal y extendida"""
-        self.data["basic_info"] = self._parse_basic_info()
-        self.data["classification"] = self._parse_classification()
-        self.data["geography"] = self._parse_geography()
-        self.data["Data_MB109"] = self._parse_data_from_MB109()
-        self.data.update(self._parse_additional_info())   # ← agrega historia, referencias, etc.
-        self.data["images"] = self._parse_images()         # ← agrega URLs de fotos
+        datos, enlaces_fotos = extraer(self.html, self.motor)
+        self.data.update(datos)                             # ← básica, clasificación, historia, referencias...
+        self.data["images"] = obtener_fotos(enlaces_fotos)  # ← agrega URLs de fotos
         return self.data
 
-    # --- 🧩 Secciones estándar del metbull ---
-    def _extract_fields(self, td, fields):
-        result = {}
-        for field in fields:
-            el = td.find("b", string=lambda t: t and field in t)
-            if el:
-                text = el.next_sibling.strip() if el.next_sibling else None
-                result[field.replace(":", "")] = text
-        return result
-
-    def _parse_basic_info(self):
-        section = self.soup.find("td", string=lambda t: t and "Basic information" in t)
-        if not section:
-            return {}
-        td = section.find_next("td")
-        fields = ["Name:", "Abbreviation:", "Observed fall:", "Year found:", "Year fell:", "Country:", "Mass:"]
-        return self._extract_fields(td, fields)
-
-    def _parse_classification(self):
-        section = next((td for td in self.soup.find_all("td", class_="inside")
-                        if "Classification" in td.get_text()), None)
-        if not section:
-            return {}
-        td = section.find_next("td")
-        classification = {}
-        recommended = td.find("b", string=lambda t: "Recommended" in t)
-        if recommended and recommended.find_next("b"):
-            classification["Recommended"] = recommended.find_next("b").get_text(strip=True)
-        return classification
-
-    def _parse_geography(self):
-        section = next((td for td in self.soup.find_all("td", class_="inside")
-                        if "Geography" in td.get_text()), None)
-        if not section:
-            return {}
-        table = section.find_next("table")
-        if not table:
-            return {}
-        geography = {}
-        for row in table.find_all("tr"):
-            cols = [c.get_text(strip=True) for c in row.find_all("td")]
-            if len(cols) == 2:
-                key, value = cols
-                geography[key.replace(":", "").strip()] = value
-        return geography
-
-    def _parse_data_from_MB109(self):
-        section = next((td for td in self.soup.find_all("td", class_="inside")
-                        if "Data from" in td.get_text()), None)
-        if not section:
-            return {}
-        table = section.find_next("table")
-        if not table:
-            return {}
-        data_from = {}
-        for row in table.find_all("tr"):
-            cols = [c.get_text(strip=True) for c in row.find_all("td")]
-            if len(cols) == 2:
-                key, value = cols
-                data_from[key.replace(":", "").strip()] = value
-        return data_from
-
-    # --- 🧠 NUEVO: secciones adicionales ---
-    def _parse_additional_info(self):
-        """
-        Busca texto de secciones adicionales como Historia, Importancia, Descubrimiento, etc.
-        """
-        result = {
-            "historia": "No hay información",
-            "importancia": "No hay información",
-            "descubrimiento": "No hay información",
-            "impacto": "No hay información",
-            "references": "No hay información",
-        }
-
-        sections = self.soup.find_all("td", class_="inside")
-        for td in sections:
-            title = td.get_text(strip=True).lower()
-
-            # Buscar "History" o "Remarks"
-            if "history" in title or "remarks" in title:
-                next_td = td.find_next("td")
-                if next_td:
-                    result["historia"] = limpiar_texto(next_td.get_text())
-                    continue
-
-            # Buscar referencias
-            if "references" in title:
-                next_td = td.find_next("td")
-                if next_td:
-                    result["references"] = limpiar_texto(next_td.get_text())
-                    continue
-
-            # Buscar impacto (si hay)
-            if "impact" in title:
-                next_td = td.find_next("td")
-                if next_td:
-                    result["impacto"] = limpiar_texto(next_td.get_text())
-                    continue
-
-        return result
-
-    # --- 🖼️ NUEVO: parsear imágenes ---
-    def _parse_images(self):
-        """
-        Extrae fotos del MetBull con manejo de bloqueos 403.
-        """
-        import time
-
-        fotos = []
-        base_url_lpi = "https://www.lpi.usra.edu/meteor/"
-
-        photo_table = self.soup.find("table", border="1", cellpadding="2", cellspacing="0")
-        if not photo_table:
-            return {"fotos": ["No hay información"]}
-
-        # Usamos el mismo cloudscraper global para evadir bloqueo
-        session = scraper
-        session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/123.0.0.0 Safari/537.36"
-            ),
-            "Referer": "https://www.lpi.usra.edu/meteor/metbull.php",
-            "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Connection": "keep-alive"
-        })
 
-        for row in photo_table.find_all("tr"):
-            cols = row.find_all("td")
-            if len(cols) != 2:
-                continue
+# --- 🖼️ Imágenes (requiere red) ---
+def obtener_fotos(enlaces_fotos):
+    """
+    Visita las páginas 'get_original_photo' con manejo de bloqueos 403.
+    """
+    if enlaces_fotos is None:
+        return {"fotos": ["No hay información"]}
+
+    fotos = []
+
+    # Usamos el mismo cloudscraper compartido para evadir bloqueo
+    session = scraper_compartido()
+    session.headers.update({
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/123.0.0.0 Safari/537.36"
+        ),
+        "Referer": "https://www.lpi.usra.edu/meteor/metbull.php",
+        "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Connection": "keep-alive"
+    })
+
+    for inter_href in enlaces_fotos:
+        autor = "No hay información"
+        referencia = "No hay información"
+        direct_link = "No hay información"
+
+        # Reintentos, pausas y Retry-After los gestiona el controlador AIMD del LPI
+        try:
+            resp = session.get(inter_href, timeout=10)
+            if resp.status_code == 403:
+                # Ajustar headers, reintentar más "humano"
+                session.headers.update({
+                    "Referer": inter_href,
+                    "Upgrade-Insecure-Requests": "1",
+                    "DNT": "1",
+                    "Accept-Encoding": "gzip, deflate, br",
+                })
+                resp = session.get(inter_href, timeout=10)
+
+            resp.raise_for_status()
+            sub_soup = BeautifulSoup(resp.text, "html.parser")
+
+            credit_b = sub_soup.find("b", string=lambda t: t and "Credit" in t)
+            if credit_b:
+                next_a = credit_b.find_next("a")
+                if next_a:
+                    autor = next_a.get_text(strip=True)
+
+            source_b = sub_soup.find("b", string=lambda t: t and "Image source" in t)
+            if source_b:
+                next_a = source_b.find_next("a")
+                if next_a:
+                    referencia = next_a.get_text(strip=True)
+
+            direct_text = sub_soup.find(string=lambda t: "Direct link to photo" in t)
+            if direct_text:
+                a_tag = direct_text.find_next("a")
+                if a_tag and a_tag.get("href"):
+                    direct_link = a_tag["href"].strip()
 
-            autor_td, foto_td = cols
+        except Exception as e:
+            print(f"⚠️ Error permanente al procesar {inter_href}: {e}")
 
-            # Miniatura
-            thumb_img = foto_td.find("img")
-            thumb_url = thumb_img["src"] if thumb_img else None
-            if thumb_url and not thumb_url.startswith("http"):
-                thumb_url = base_url_lpi + thumb_url.lstrip("/")
+        fotos.append({
+            "autor": autor,
+            "referencia": referencia,
+            "foto_original": direct_link,
+        })
 
-            inter_a = foto_td.find("a", href=lambda x: x and "get_original_photo" in x)
-            if not inter_a:
-                continue
+    if not fotos:
+        fotos = ["No hay información"]
 
-            inter_href = inter_a["href"]
-            if not inter_href.startswith("http"):
-                inter_href = base_url_lpi + inter_href.lstrip("/")
+    return {"fotos": fotos}
 
-            autor = "No hay información"
-            referencia = "No hay información"
-            direct_link = "No hay información"
 
-            # Intentar con reintentos y cookies de navegación
-            for intento in range(3):
-                try:
-                    resp = session.get(inter_href, timeout=10)
-                    if resp.status_code == 403:
-                        # Ajustar headers, reintentar más "humano"
-                        session.headers.update({
-                            "Referer": inter_href,
-                            "Upgrade-Insecure-Requests": "1",
-                            "DNT": "1",
-                            "Accept-Encoding": "gzip, deflate, br",
-                        })
-                        time.sleep(2 + intento)
-                        continue  # reintenta con nuevos headers
-
-                    resp.raise_for_status()
-                    sub_soup = BeautifulSoup(resp.text, "html.parser")
-
-                    credit_b = sub_soup.find("b", string=lambda t: t and "Credit" in t)
-                    if credit_b:
-                        next_a = credit_b.find_next("a")
-                        if next_a:
-                            autor = next_a.get_text(strip=True)
-
-                    source_b = sub_soup.find("b", string=lambda t: t and "Image source" in t)
-                    if source_b:
-                        next_a = source_b.find_next("a")
-                        if next_a:
-                            referencia = next_a.get_text(strip=True)
-
-                    direct_text = sub_soup.find(string=lambda t: "Direct link to photo" in t)
-                    if direct_text:
-                        a_tag = direct_text.find_next("a")
-                        if a_tag and a_tag.get("href"):
-                            direct_link = a_tag["href"].strip()
-                    break  # si todo fue bien, salimos del ciclo
-
-                except Exception as e:
-                    if intento == 2:
-                        print(f"⚠️ Error permanente al procesar {inter_href}: {e}")
-                    else:
-                        wait = 2 + intento
-                        print(f"403 en intento {intento+1} para {inter_href}. Reintentando en {wait}s...")
-                        time.sleep(wait)
-
-            fotos.append({
-                "autor": autor,
-                "referencia": referencia,
-                "foto_original": direct_link,
-            })
-
-            time.sleep(random.uniform(0.5, 1.2))
-
-        if not fotos:
-            fotos = ["No hay información"]
-
-        return {"fotos": fotos}
-
-def extraer_detalles(url_relativa: str) -> dict:
-    url_detalle = f"https://www.lpi.usra.edu{url_relativa}"
-    parser = MeteoriteDetail(url_detalle)
-    datos = parser.parse()
-
-    return datos
-
-  
-def buscar_meteoritos_por_pais(country: str):
-    url = (
+def url_listado(country: str) -> str:
+    """Listado completo de un país (tabla normal, hasta 50000 filas)."""
+    return (
         f"https://www.lpi.usra.edu/meteor/metbull.cfm?"
         f"sea=*&ants=&nwas=&falls=&valids=&stype=contains"
         f"&lrec=50000&map=ge&browse=&country={country.replace(' ', '+')}"
@@ -413,12 +238,31 @@ def buscar_meteoritos_por_pais(country: str):
         f"&pnt=Normal+table&sfor=names&dr=&page=0"
     )
 
-    response = scraper.get(url)
-    soup = BeautifulSoup(response.text, "lxml")
+
+# Aviso de búsqueda sin coincidencias. Sin tabla de resultados y sin este
+# aviso la página no es un listado (desafío de Cloudflare, error o cambio de
+# diseño): el país falla y se rehace, en lugar de guardarse vacío.
+_SIN_RESULTADOS = re.compile(
+    r"\bno (meteorites?|records?|results?|entries|matches)\b[^<.]{0,80}?\b(found|matched|returned)\b"
+    r"|\b(found|returned|matched) 0 (meteorites?|records?|results?|entries)\b"
+    r"|\b0 (meteorites?|records?|results?|entries) (found|matched|returned)\b",
+    re.IGNORECASE)
+
+
+def parsear_listado(html: str, country: str):
+    """
+    Devuelve (filas, filas_con_enlace) de la tabla de resultados de un país.
+    ValueError si la página no trae la tabla ni el aviso de "sin resultados".
+    """
+    soup = BeautifulSoup(html, "lxml")
 
     table = soup.find("table", {"border": "1"})
     if table is None:
-        return pd.DataFrame()
+        if _SIN_RESULTADOS.search(limpiar_texto(soup.get_text(" "))):
+            return [], []
+        titulo = limpiar_texto(soup.title.get_text()) if soup.title else ""
+        raise ValueError(f"[{country}] Página sin tabla de resultados ({titulo or 'sin título'}): "
+                         f"¿desafío de Cloudflare o cambio de diseño?")
 
     headers = [limpiar_texto(th.text) for th in table.find_all("th")]
     rows, links = [], []
@@ -436,213 +280,276 @@ def buscar_meteoritos_por_pais(country: str):
         if i % 1000 == 0:
             print(f"[{country}] Procesados {i} meteoritos...")
 
-    # 🔹 Descargar detalles en paralelo
-    def fetch_detail(fila):
-        detalle = extraer_detalles(fila["_href"])
-        fila.update(detalle)
-        fila.pop("_href", None)
-        return fila
-
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        futures = [executor.submit(fetch_detail, fila) for fila in links]
-        for i, future in enumerate(as_completed(futures), start=1):
-            try:
-                result = future.result()
-                if i % 100 == 0:
-                    print(f"Detalles descargados: {i}/{len(futures)}")
-            except Exception as e:
-                print("Error en detalle:", e)
+    return rows, links
 
 
+def armar_df_pais(rows, country: str):
     df = pd.DataFrame(rows)
 
     if "Mass" in df.columns:
-        df["Mass_grams"] = df["Mass"].apply(normalizar_masa)
+        df["Mass_grams"] = masas_en_gramos(df["Mass"])
 
     df["Country"] = country
     return df
 
-import ast
 
-def crear_csv_limpio_separado():
-    def parse_coords_safe(text):
-        if not text or not isinstance(text, str):
-            return None, None
-        coords = parseCoordinates(text)
-        return coords["lat"], coords["lon"]
-
-    clean_rows = []
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    input_path = os.path.join(script_dir, "data", "meteoritos_Metbull_PreLimpieza.csv")
-
-    if not os.path.exists(input_path):
-        print("⚠️ No se encontró el archivo meteoritos_Metbull_PreLimpieza.csv")
-        return
+async def buscar_meteoritos_paises(paises, concurrencia=16, tasa_por_host=5.0, al_terminar=None,
+                                   planificar=None):
+    """
+    Rastrea varios países a la vez con una sola cola compartida: cada listado
+    encola sus fichas de detalle, y todo pasa por un mismo cliente asíncrono
+    (keep-alive, límite global y token bucket por dominio).
+    Devuelve un DataFrame por país con resultados. Con `al_terminar(país, df)`
+    cada país se entrega (en un hilo) apenas terminan todas sus fichas y no se
+    acumula en memoria; si falló su listado o alguna ficha, no se entrega.
+    Con `planificar(país, filas)` → (filas, a_descargar) solo se descargan las
+    fichas que devuelve (crawl incremental), y listados y fichas se piden con
+    revalidación condicional aunque estén frescos en caché.
+    """
+    revalidar = planificar is not None
+    filas_por_pais = {}
+    pendientes = {}     # país → fichas sin terminar
+    fallidos = set()
+    descargados = 0
+    etapa = EtapaParseo()
+
+    async def terminar_pais(country):
+        if al_terminar is None:
+            return
+        rows = filas_por_pais.pop(country)
+        if country in fallidos:
+            print(f"⚠️ {country}: hubo fallos, no se guarda (se rehace en la próxima ejecución)")
+            return
+        # Un fallo al guardar deja el país como fallido (se rehace), sin cortar la cola
+        try:
+            await asyncio.to_thread(al_terminar, country, armar_df_pais(rows, country))
+        except Exception as e:
+            fallidos.add(country)
+            print(f"⚠️ {country}: no se pudo guardar ({e!r}); se rehace en la próxima ejecución")
+
+    # Se reutilizan las cookies y el User-Agent con los que cloudscraper pasó el desafío
+    scraper = scraper_compartido()
+    if not scraper.cookies:
+        await asyncio.to_thread(scraper.get, url_base)
+    async with FetcherAsync(concurrencia=concurrencia, tasa_por_host=tasa_por_host,
+                            cabeceras=dict(scraper.headers), cookies=scraper.cookies,
+                            controladores={"www.lpi.usra.edu": controlador_lpi}) as fetcher:
+
+        async def trabajador(tarea, cola):
+            nonlocal descargados
+            tipo, country, fila = tarea
+
+            if tipo == "listado":
+                print(f"Buscando meteoritos en {country}...")
+                try:
+                    html = await fetcher.obtener(url_listado(country), revalidar=revalidar)
+                    rows, links = await asyncio.to_thread(parsear_listado, html, country)
+                    if planificar is not None:
+                        rows, links = await asyncio.to_thread(planificar, country, rows)
+                except Exception:
+                    fallidos.add(country)
+                    raise
+                filas_por_pais[country] = rows
+                pendientes[country] = len(links)
+                for f in links:
+                    cola.put_nowait(("detalle", country, f))
+                if not links:
+                    await terminar_pais(country)
+                return
+
+            error = None
+            try:
+                html = await fetcher.obtener(f"https://www.lpi.usra.edu{fila['_href']}", revalidar=revalidar)
+                # Parseo en procesos; si el búfer está lleno, este trabajador deja de descargar
+                datos, enlaces_fotos = await etapa.parsear(html)
+                fila.update(datos)
+                fila["images"] = await asyncio.to_thread(obtener_fotos, enlaces_fotos)
+                fila.pop("_href", None)
+            except Exception as e:
+                fallidos.add(country)
+                error = e
+            # La última ficha cierra el país (fuera del except: el error original se relanza después)
+            pendientes[country] -= 1
+            if not pendientes[country]:
+                await terminar_pais(country)
+            if error is not None:
+                raise error
+            descargados += 1
+            if descargados % 100 == 0:
+                print(f"Detalles descargados: {descargados} — {controlador_lpi} {etapa}")
 
-    # Leer CSV
-    df = pd.read_csv(input_path, low_memory=False)
+        with etapa:
+            await procesar_cola([("listado", c, None) for c in paises], trabajador,
+                                trabajadores=concurrencia * 2)
 
-    # Convertir los campos que parecen diccionarios
-    def safe_eval(value):
-        try:
-            if isinstance(value, str) and value.startswith("{"):
-                return ast.literal_eval(value)
-        except Exception:
-            pass
-        return value
-
-    dict_columns = ["basic_info", "classification", "geography", "Data_MB109", "images"]
-    for col in dict_columns:
-        if col in df.columns:
-            df[col] = df[col].apply(safe_eval)
-
-    for _, row in df.iterrows():
-        # Limpiar nombre
-        name = str(row.get("Name", "")).replace("**", "").strip()
-
-        def safe_dict(value):
-            return value if isinstance(value, dict) else {}
-
-        basic_info = safe_dict(row.get("basic_info", {}))
-        classification = safe_dict(row.get("classification", {}))
-        geography = safe_dict(row.get("geography", {}))
-        Data_MB109 = safe_dict(row.get("Data_MB109", {}))
-
-        # --- Años ---
-        year_fell = parse_year(basic_info.get("Year fell")) if isinstance(basic_info, dict) else None
-        year_found = parse_year(basic_info.get("Year found")) if isinstance(basic_info, dict) else None
-        year_value = year_fell or year_found
+    print(f"📈 Estado final del controlador: {controlador_lpi}")
+    return [armar_df_pais(filas_por_pais[c], c) for c in paises if filas_por_pais.get(c)]
 
-        try:
-            basic_yearFound = int(year_value)
-        except (TypeError, ValueError):
-            basic_yearFound = None
-
-        # --- Coordenadas ---
-        coordExactText = geography.get("Catalogue of Meteorites") if isinstance(geography, dict) else None
-        coordRecomendText = geography.get("Recommended") if isinstance(geography, dict) else None
-
-        latExact, lonExact = parse_coords_safe(coordExactText)
-        latRecomend, lonRecomend = parse_coords_safe(coordRecomendText)
-
-        # --- Filtro de datos incompletos ---
-        if not basic_yearFound or (
-            latExact is None and lonExact is None and latRecomend is None and lonRecomend is None
-        ):
-            continue
-
-        clean_row = {
-            # Información básica
-            "Name": name,
-            "Year": int(parse_year(row.get("Year"))) if parse_year(row.get("Year")) else None,
-            "Mass": normalizar_masa(row.get("Mass")),
-            "Country": row.get("Country"),
-            "Type": row.get("Type"),
-            "Place": row.get("Place"),
-            "Status": row.get("Status"),
-            "Fall": row.get("Fall"),
-
-            # Basic info desglosada
-            "basic_name": basic_info.get("Name"),
-            "basic_abbrev": basic_info.get("Abbreviation"),
-            "basic_fall": basic_info.get("Observed fall"),
-            "basic_yearFound": basic_yearFound,
-            "basic_country": basic_info.get("Country"),
-
-            # Classification
-            "classification_recomend": classification.get("Recommended"),
-
-            # Coordenadas
-            "coordinadesExact": coordExactText,
-            "coordinadesLat": round(latExact, 1) if latExact is not None else None,
-            "coordinadesLon": round(lonExact, 1) if lonExact is not None else None,
-            "coordinadesRecomend": coordRecomendText,
-            "coordinadesLatRecomend": round(latRecomend, 1) if latRecomend is not None else None,
-            "coordinadesLonRecomend": round(lonRecomend, 1) if lonRecomend is not None else None,
-
-            # Data_MB109
-            "DataMB109_Lat": Data_MB109.get("Latitude"),
-            "DataMB109_Lon": Data_MB109.get("Longitude"),
-            "DataMB109_Mass": Data_MB109.get("Mass (g)"),
-            "DataMB109_Piece": Data_MB109.get("Pieces"),
-            "DataMB109_Class": Data_MB109.get("Class"),
-            "DataMB109_Weathering": Data_MB109.get("Weathering grade"),
-            "DataMB109_Fayalite": Data_MB109.get("Fayalite (mol%)"),
-            "DataMB109_Ferrosilite": Data_MB109.get("Ferrosilite (mol%)"),
-            "DataMB109_Classifier": Data_MB109.get("Classifier"),
-            "DataMB109_Main_mass": Data_MB109.get("Main mass"),
-            "DataMB109_Coments": Data_MB109.get("Comments"),
-        }
-
-        # --- Fotos ---
-        imagenes = safe_dict(row.get("images", {}))
-        fotos_info = []
-        if "fotos" in imagenes and isinstance(imagenes["fotos"], list):
-            for f in imagenes["fotos"]:
-                if isinstance(f, dict):
-                    fotos_info.append(
-                        f"{f.get('autor', 'Desconocido')} | {f.get('referencia', 'No hay información')} | {f.get('foto_original', 'No hay información')}"
-                    )
-        else:
-            fotos_info = ["No hay información"]
-
-        clean_row.update({
-            "historia": row.get("historia", "No hay información"),
-            "importancia": row.get("importancia", "No hay información"),
-            "descubrimiento": row.get("descubrimiento", "No hay información"),
-            "impacto": row.get("impacto", "No hay información"),
-            "references": row.get("references", "No hay información"),
-            "fotos": "; ".join(fotos_info)
-        })
 
-        clean_rows.append(clean_row)
+def _directorio_datos(directorio=None):
+    return directorio or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
-    df_clean = pd.DataFrame(clean_rows)
 
-    # Guardar CSV limpio
-    output_dir = os.path.join(script_dir, "data")
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "meteoritos_Metbull.csv")
-    df_clean.to_csv(output_path, index=False, encoding="utf-8")
+def directorio_paises(directorio=None):
+    """Particiones del crawl: un meteoritos_Metbull_PreLimpieza por país."""
+    return os.path.join(_directorio_datos(directorio), "meteoritos_Metbull_PreLimpieza_paises")
 
-    print(f"✅ CSV limpio generado: {output_path}")
-    print(f"📦 Total filas válidas: {len(df_clean)} / {len(df)}")
 
+def rastrear_paises(paises, directorio=None, rehacer=False, incremental=False, aceptar_bajas=False, **opciones):
+    """
+    Crawl por países a particiones: cada país se guarda en su propio archivo
+    en cuanto termina, así uno lento (Antarctica, Oman...) no retiene a los
+    demás. Los países ya guardados se saltan (salvo `rehacer`), de modo que
+    tras un fallo solo se repiten los que faltan. Devuelve los que fallaron.
+    Con `incremental` se vuelven a listar todos, pero solo se descargan las
+    fichas nuevas o cambiadas según el índice (IndiceMetbull); las demás filas
+    salen de la partición anterior. Si el listado deja fuera a la mayoría de
+    los meteoritos conocidos, el país falla y se conservan su partición y su
+    índice (página incompleta); `aceptar_bajas` las aplica igualmente.
+    """
+    destino = directorio_paises(directorio)
+    hechos = set() if rehacer or incremental else set(particiones(destino))
+    faltan = [p for p in paises if p not in hechos]
+    print(f"🌍 {len(faltan)} países por rastrear ({len(paises) - len(faltan)} ya guardados)")
+
+    indice = None
+    huellas_por_pais = {}   # país → huellas del listado, se guardan junto con la partición
+    sin_cambios, guardados = set(), set()
+
+    def planificar(country, rows):
+        base = ruta_particion(destino, country)
+        previo = leer_tabla(base) if ruta_existente(base) else None
+        previas = {} if previo is None else {f.get("Name"): f for f in previo.to_dict(orient="records")}
+        filas, a_descargar, huellas, cuenta = comparar_listado(rows, indice.conocidos(country), previas)
+        if not aceptar_bajas and bajas_sospechosas(cuenta):
+            conocidas = cuenta["eliminadas"] + cuenta["cambiadas"] + cuenta["sin cambios"]
+            raise ValueError(f"[{country}] El listado deja fuera {cuenta['eliminadas']} de {conocidas} "
+                             f"meteoritos conocidos: se conserva la partición anterior "
+                             f"(--aceptar-bajas para aplicarlo)")
+        huellas_por_pais[country] = huellas
+        if previo is not None and not (cuenta["nuevas"] or cuenta["cambiadas"] or cuenta["eliminadas"]):
+            sin_cambios.add(country)
+        print(f"🔎 {country}: {cuenta['nuevas']} nuevas, {cuenta['cambiadas']} cambiadas, "
+              f"{cuenta['eliminadas']} eliminadas, {cuenta['sin cambios']} sin cambios")
+        return filas, a_descargar
+
+    if incremental:
+        os.makedirs(_directorio_datos(directorio), exist_ok=True)
+        indice = IndiceMetbull(os.path.join(_directorio_datos(directorio), ARCHIVO_INDICE))
+        opciones.update(planificar=planificar)
+
+    def guardar(country, df):
+        if country in sin_cambios:
+            print(f"✅ {country}: sin cambios")
+        else:
+            guardar_particion(df, destino, country, COLUMNAS_PRELIMPIEZA)
+            print(f"✅ {country}: {len(df)} meteoritos guardados")
+        if indice is not None:
+            indice.actualizar(country, huellas_por_pais.pop(country, []))
+        guardados.add(country)
 
-all_data = []
+    try:
+        if faltan:
+            asyncio.run(buscar_meteoritos_paises(faltan, al_terminar=guardar, **opciones))
+    finally:
+        if indice is not None:
+            print(f"🗂️ Índice: {indice.estadisticas()}")
+            indice.cerrar()
+    fallidos = [p for p in faltan if p not in guardados]
+    if fallidos:
+        print(f"⚠️ Países sin terminar (se rehacen en la próxima ejecución): {', '.join(fallidos)}")
+    return fallidos
+
+
+def entrada_prelimpieza(directorio=None):
+    """
+    Lo que se limpia: las particiones por país si son más recientes que
+    meteoritos_Metbull_PreLimpieza (lista de rutas base, se unen al leer), o
+    la ruta base de ese archivo. None si no hay ninguno.
+    """
+    input_base = os.path.join(_directorio_datos(directorio), "meteoritos_Metbull_PreLimpieza")
+    por_pais = fecha_particiones(directorio_paises(directorio))
+    unico = ruta_existente(input_base)
+    if por_pais is not None and (unico is None or por_pais > os.path.getmtime(unico)):
+        return list(particiones(directorio_paises(directorio)).values())
+    return input_base if unico is not None else None
 
-for country in countries[:]:  
-    #if country.upper() == "ALL":
-    if True:
-        continue
 
-    print(f"Buscando meteoritos en {country}...")
-    df_country = buscar_meteoritos_por_pais(country)
-    if not df_country.empty:
-        df_country["Country"] = country  
-        all_data.append(df_country)
-    time.sleep(1)  
+def crear_csv_limpio_separado(directorio=None, filas_por_bloque=None):
+    """
+    PreLimpieza (archivo único o particiones por país) → meteoritos_Metbull
+    (.csv + .parquet). Con `filas_por_bloque` se limpia en streaming, de a un
+    bloque por vez (memoria acotada).
+    """
+    data_dir = _directorio_datos(directorio)
+    input_base = entrada_prelimpieza(directorio)
+    output_base = os.path.join(data_dir, "meteoritos_Metbull")
 
+    if input_base is None:
+        print("⚠️ No se encontró meteoritos_Metbull_PreLimpieza (.parquet/.arrow/.csv ni particiones por país)")
+        return
+    os.makedirs(data_dir, exist_ok=True)
+    if isinstance(input_base, list):
+        print(f"🧩 Leyendo {len(input_base)} particiones por país")
+
+    if filas_por_bloque:
+        leidas, validas, output_paths = limpiar_por_bloques(input_base, output_base, filas_por_bloque)
+        for output_path in output_paths:
+            print(f"✅ Limpio generado: {output_path}")
+        print(f"📦 Total filas válidas: {validas} / {leidas}")
+        return
 
-#if all_data:
-if True:    
-    #df_final = pd.concat(all_data, ignore_index=True)
-    #print("Total meteoritos encontrados:", len(df_final))
-    #print(df_final.head())
+    # Parquet/Arrow si existe; del CSV, las columnas anidadas quedan como texto
+    # y limpiar_metbull decodifica solo las filas que usa
+    df = leer_tabla(input_base)
 
-    # Crear carpeta "data" junto al script
-    #script_dir = os.path.dirname(os.path.abspath(__file__))
-    #output_dir = os.path.join(script_dir, "data")
-    #os.makedirs(output_dir, exist_ok=True)
+    # Vectorizado por columnas (LimpiezaMetbull); descarta filas sin año o sin coordenadas
+    df_clean = limpiar_metbull(df)
 
-    # Guardar CSV preliminar
-    #output_path = os.path.join(output_dir, "meteoritos_Metbull_PreLimpieza.csv")
-    #df_final.to_csv(output_path, index=False, encoding="utf-8")
-    #print(f"✅ Guardado en: {output_path}")
+    # Guardar limpio: Parquet tipado + CSV exportado
+    for output_path in guardar_tabla(df_clean, output_base, COLUMNAS_METBULL):
+        print(f"✅ Limpio generado: {output_path}")
+    print(f"📦 Total filas válidas: {len(df_clean)} / {len(df)}")
 
-    # 🔹 Llamar función de limpieza leyendo el CSV
-    crear_csv_limpio_separado()
 
-#else:
-#    print("⚠️ No se encontraron datos")
+# Protegido con __main__: EtapaParseo arranca procesos y, con el método
+# "spawn" (Windows/macOS), cada proceso vuelve a importar este script.
+# Uso: python DatosxPaisMetbull.py countries [--refrescar]
+#      python DatosxPaisMetbull.py crawl --countries Chile Oman --limit 10
+#      python DatosxPaisMetbull.py crawl --incremental [--aceptar-bajas]
+#      python DatosxPaisMetbull.py clean [--bloque 5000]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl y limpieza del Meteoritical Bulletin por país")
+    parser.add_argument("--datos", help="Carpeta de datos (por defecto, data/ junto al script)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_countries = sub.add_parser("countries", help="Lista de países del MetBull (guardada en disco)")
+    p_countries.add_argument("--refrescar", action="store_true", help="Descargarla aunque no haya vencido")
+
+    p_crawl = sub.add_parser("crawl", help="Rastrea países a particiones (solo los que faltan)")
+    p_crawl.add_argument("--countries", nargs="+", help="Países a rastrear (por defecto, todos)")
+    p_crawl.add_argument("--limit", type=int, help="Solo los primeros N países")
+    p_crawl.add_argument("--rehacer", action="store_true", help="Rastrear también los ya guardados")
+    p_crawl.add_argument("--refrescar", action="store_true", help="Descargar de nuevo la lista de países")
+    p_crawl.add_argument("--incremental", action="store_true",
+                         help="Volver a listar todos y descargar solo las fichas nuevas o cambiadas")
+    p_crawl.add_argument("--aceptar-bajas", action="store_true",
+                         help="Incremental: aplicar listados que dejan fuera a la mayoría de los conocidos")
+    p_crawl.add_argument("--concurrencia", type=int, default=16)
+    p_crawl.add_argument("--tasa", type=float, default=5.0, help="Peticiones/s por host")
+
+    p_clean = sub.add_parser("clean", help="PreLimpieza (archivo o particiones) → meteoritos_Metbull")
+    p_clean.add_argument("--bloque", type=int, help="Limpiar en streaming, de a N filas")
+
+    args = parser.parse_args()
+    if args.comando == "countries":
+        countries = listar_paises(args.datos, args.refrescar)
+        print("\n".join(countries))
+        print(f"🌍 {len(countries)} países")
+    elif args.comando == "crawl":
+        countries = seleccionar_paises(args.countries, args.limit, args.datos, args.refrescar)
+        fallidos = rastrear_paises(countries, args.datos, args.rehacer, args.incremental, args.aceptar_bajas,
+                                   concurrencia=args.concurrencia, tasa_por_host=args.tasa)
+        raise SystemExit(1 if fallidos else 0)
+    else:
+        crear_csv_limpio_separado(args.datos, args.bloque)
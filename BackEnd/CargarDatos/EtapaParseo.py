@@ -0,0 +1,68 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from ExtractorMetbull import extraer
+
+# -------------------------------------------------------------------
+# Etapa de parseo en procesos, desacoplada de la descarga
+# -------------------------------------------------------------------
+# Los hilos / corrutinas de red solo descargan HTML y lo entregan aquí;
+# el parseo (CPU, limitado por el GIL) corre en un ProcessPoolExecutor
+# con un proceso por núcleo. Entre ambas etapas hay un búfer acotado
+# (max_pendientes): si el parseo se atrasa, enviar() bloquea a los
+# descargadores en lugar de acumular HTML en memoria.
+# Los procesos solo importan ExtractorMetbull (sin efectos al importar).
+
+
+class EtapaParseo:
+    """Pool de procesos para ExtractorMetbull.extraer con contrapresión."""
+
+    def __init__(self, procesos=None, max_pendientes=None, motor="lxml"):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes or 4 * self.procesos
+        self.motor = motor
+        self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        self._huecos = threading.BoundedSemaphore(self.max_pendientes)
+        self._huecos_async = None
+        self.parseadas = 0
+
+    def _liberar(self, _futuro):
+        self.parseadas += 1
+        self._huecos.release()
+
+    def enviar(self, html):
+        """
+        Encola una página y devuelve un Future con (datos, enlaces_fotos).
+        Bloquea mientras haya max_pendientes páginas sin parsear.
+        """
+        self._huecos.acquire()
+        try:
+            futuro = self._pool.submit(extraer, html, self.motor)
+        except BaseException:
+            self._huecos.release()
+            raise
+        futuro.add_done_callback(self._liberar)
+        return futuro
+
+    async def parsear(self, html):
+        """Versión asíncrona: espera hueco en el búfer sin bloquear el event loop."""
+        if self._huecos_async is None:
+            self._huecos_async = asyncio.Semaphore(self.max_pendientes)
+        async with self._huecos_async:
+            resultado = await asyncio.wrap_future(self._pool.submit(extraer, html, self.motor))
+        self.parseadas += 1
+        return resultado
+
+    def cerrar(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __str__(self):
+        return f"[parseo] procesos={self.procesos} búfer={self.max_pendientes} parseadas={self.parseadas}"
@@ -0,0 +1,359 @@
+import re
+from bisect import bisect_right
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# -------------------------------------------------------------------
+# Extracción de las fichas de detalle del MetBull
+# -------------------------------------------------------------------
+# extraer_lxml: un único recorrido del árbol lxml indexa td/b/table/tr/a en
+# orden de documento; cada sección se resuelve con búsquedas binarias sobre
+# ese índice en lugar de volver a recorrer el árbol.
+# extraer_bs4: implementación original con BeautifulSoup (html.parser), se
+# conserva como referencia para comparar y para el benchmark.
+
+BASE_URL_LPI = "https://www.lpi.usra.edu/meteor/"
+
+CAMPOS_BASICOS = ["Name:", "Abbreviation:", "Observed fall:", "Year found:", "Year fell:", "Country:", "Mass:"]
+
+SIN_INFORMACION = {
+    "historia": "No hay información",
+    "importancia": "No hay información",
+    "descubrimiento": "No hay información",
+    "impacto": "No hay información",
+    "references": "No hay información",
+}
+
+
+def _limpiar(texto):
+    if not texto:
+        return ""
+    return re.sub(r"\s+", " ", texto.strip())
+
+
+def _absoluta(href):
+    return href if href.startswith("http") else BASE_URL_LPI + href.lstrip("/")
+
+
+# -------------------------------------------------------------------
+# Motor lxml (una sola pasada)
+# -------------------------------------------------------------------
+
+class _Indice:
+    """Posiciones en preorden (y fin de subárbol) de las etiquetas que usa el extractor."""
+
+    ETIQUETAS = ("td", "b", "table", "tr", "a")
+
+    def __init__(self, raiz):
+        self.pos = {t: [] for t in self.ETIQUETAS}
+        self.fin = {t: [] for t in self.ETIQUETAS}
+        self.elementos = {t: [] for t in self.ETIQUETAS}
+
+        contador = 0
+        pila = []
+        for evento, el in etree.iterwalk(raiz, events=("start", "end")):
+            if evento == "start":
+                etiqueta = el.tag if isinstance(el.tag, str) else None
+                if etiqueta in self.pos:
+                    self.pos[etiqueta].append(contador)
+                    self.fin[etiqueta].append(contador)
+                    self.elementos[etiqueta].append(el)
+                    pila.append((etiqueta, len(self.pos[etiqueta]) - 1))
+                else:
+                    pila.append(None)
+                contador += 1
+            else:
+                hueco = pila.pop()
+                if hueco is not None:
+                    etiqueta, i = hueco
+                    self.fin[etiqueta][i] = contador - 1
+
+    def dentro(self, etiqueta, pos, fin):
+        """Índices de los `etiqueta` descendientes del nodo [pos, fin]."""
+        lista = self.pos[etiqueta]
+        return range(bisect_right(lista, pos), bisect_right(lista, fin))
+
+    def siguiente(self, etiqueta, pos):
+        """Índice del primer `etiqueta` posterior a pos en orden de documento (find_next)."""
+        i = bisect_right(self.pos[etiqueta], pos)
+        return i if i < len(self.pos[etiqueta]) else None
+
+
+def _cadena(el):
+    """Equivalente a Tag.string de BeautifulSoup: texto del único hijo (recursivo) o None."""
+    while True:
+        hijos = list(el)
+        if not hijos:
+            return el.text or None
+        if el.text or len(hijos) > 1 or hijos[0].tail:
+            return None
+        el = hijos[0]
+        if not isinstance(el.tag, str):  # comentario
+            return el.text
+
+
+# get_text() de BeautifulSoup omite el contenido de <script>, <style> y <template>
+_TEXTOS = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+def _texto(el):
+    """Equivalente a get_text()."""
+    return "".join(_TEXTOS(el))
+
+
+def _texto_strip(el):
+    """Equivalente a get_text(strip=True)."""
+    return "".join(t.strip() for t in _TEXTOS(el) if t.strip())
+
+
+def _clases(el):
+    return (el.get("class") or "").split()
+
+
+class ExtractorLxml:
+    def __init__(self, html):
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        parser = etree.HTMLParser(encoding="utf-8")
+        self.raiz = etree.fromstring(html, parser)
+        if self.raiz is None:
+            raise ValueError("HTML vacío")
+        self.ind = _Indice(self.raiz)
+
+        # td.inside con su texto, calculados una sola vez para todas las secciones
+        self.inside = [
+            (i, _texto(el)) for i, el in enumerate(self.ind.elementos["td"]) if "inside" in _clases(el)
+        ]
+
+    def _td_siguiente(self, i_td):
+        return self.ind.siguiente("td", self.ind.pos["td"][i_td])
+
+    def _seccion_inside(self, titulo):
+        return next((i for i, texto in self.inside if titulo in texto), None)
+
+    def _b_con_texto(self, i_padre_td, contenido):
+        ind = self.ind
+        for j in ind.dentro("b", ind.pos["td"][i_padre_td], ind.fin["td"][i_padre_td]):
+            cadena = _cadena(ind.elementos["b"][j])
+            if cadena and contenido in cadena:
+                return j
+        return None
+
+    def basic_info(self):
+        ind = self.ind
+        seccion = next((i for i, el in enumerate(ind.elementos["td"])
+                        if (lambda t: t and "Basic information" in t)(_cadena(el))), None)
+        if seccion is None:
+            return {}
+        td = self._td_siguiente(seccion)
+        if td is None:
+            return {}
+        resultado = {}
+        for campo in CAMPOS_BASICOS:
+            j = self._b_con_texto(td, campo)
+            if j is not None:
+                cola = ind.elementos["b"][j].tail
+                resultado[campo.replace(":", "")] = cola.strip() if cola else None
+        return resultado
+
+    def classification(self):
+        ind = self.ind
+        seccion = self._seccion_inside("Classification")
+        if seccion is None:
+            return {}
+        td = self._td_siguiente(seccion)
+        if td is None:
+            return {}
+        classification = {}
+        j = self._b_con_texto(td, "Recommended")
+        if j is not None:
+            k = ind.siguiente("b", ind.pos["b"][j])
+            if k is not None:
+                classification["Recommended"] = _texto_strip(ind.elementos["b"][k])
+        return classification
+
+    def _tabla_pares(self, titulo):
+        ind = self.ind
+        seccion = self._seccion_inside(titulo)
+        if seccion is None:
+            return {}
+        t = ind.siguiente("table", ind.pos["td"][seccion])
+        if t is None:
+            return {}
+        pares = {}
+        for r in ind.dentro("tr", ind.pos["table"][t], ind.fin["table"][t]):
+            cols = [_texto_strip(ind.elementos["td"][c])
+                    for c in ind.dentro("td", ind.pos["tr"][r], ind.fin["tr"][r])]
+            if len(cols) == 2:
+                key, value = cols
+                pares[key.replace(":", "").strip()] = value
+        return pares
+
+    def adicional(self):
+        ind = self.ind
+        resultado = dict(SIN_INFORMACION)
+        for i, _ in self.inside:
+            titulo = _texto_strip(ind.elementos["td"][i]).lower()
+            for palabras, clave in (
+                (("history", "remarks"), "historia"),
+                (("references",), "references"),
+                (("impact",), "impacto"),
+            ):
+                if any(p in titulo for p in palabras):
+                    siguiente = self._td_siguiente(i)
+                    if siguiente is not None:
+                        resultado[clave] = _limpiar(_texto(ind.elementos["td"][siguiente]))
+                        break
+        return resultado
+
+    def enlaces_fotos(self):
+        """URLs intermedias 'get_original_photo' de la tabla de fotos, o None si no hay tabla."""
+        ind = self.ind
+        t = next((i for i, el in enumerate(ind.elementos["table"])
+                  if el.get("border") == "1" and el.get("cellpadding") == "2" and el.get("cellspacing") == "0"),
+                 None)
+        if t is None:
+            return None
+        enlaces = []
+        for r in ind.dentro("tr", ind.pos["table"][t], ind.fin["table"][t]):
+            cols = list(ind.dentro("td", ind.pos["tr"][r], ind.fin["tr"][r]))
+            if len(cols) != 2:
+                continue
+            foto_td = cols[1]
+            for a in ind.dentro("a", ind.pos["td"][foto_td], ind.fin["td"][foto_td]):
+                href = ind.elementos["a"][a].get("href")
+                if href and "get_original_photo" in href:
+                    enlaces.append(_absoluta(href))
+                    break
+        return enlaces
+
+
+def extraer_lxml(html):
+    ex = ExtractorLxml(html)
+    datos = {
+        "basic_info": ex.basic_info(),
+        "classification": ex.classification(),
+        "geography": ex._tabla_pares("Geography"),
+        "Data_MB109": ex._tabla_pares("Data from"),
+    }
+    datos.update(ex.adicional())
+    return datos, ex.enlaces_fotos()
+
+
+# -------------------------------------------------------------------
+# Motor BeautifulSoup (implementación original, referencia)
+# -------------------------------------------------------------------
+
+def _extract_fields(td, fields):
+    result = {}
+    for field in fields:
+        el = td.find("b", string=lambda t: t and field in t)
+        if el:
+            text = el.next_sibling.strip() if el.next_sibling else None
+            result[field.replace(":", "")] = text
+    return result
+
+
+def _bs4_basic_info(soup):
+    section = soup.find("td", string=lambda t: t and "Basic information" in t)
+    if not section:
+        return {}
+    td = section.find_next("td")
+    return _extract_fields(td, CAMPOS_BASICOS)
+
+
+def _bs4_classification(soup):
+    section = next((td for td in soup.find_all("td", class_="inside")
+                    if "Classification" in td.get_text()), None)
+    if not section:
+        return {}
+    td = section.find_next("td")
+    classification = {}
+    recommended = td.find("b", string=lambda t: "Recommended" in t)
+    if recommended and recommended.find_next("b"):
+        classification["Recommended"] = recommended.find_next("b").get_text(strip=True)
+    return classification
+
+
+def _bs4_tabla_pares(soup, titulo):
+    section = next((td for td in soup.find_all("td", class_="inside")
+                    if titulo in td.get_text()), None)
+    if not section:
+        return {}
+    table = section.find_next("table")
+    if not table:
+        return {}
+    pares = {}
+    for row in table.find_all("tr"):
+        cols = [c.get_text(strip=True) for c in row.find_all("td")]
+        if len(cols) == 2:
+            key, value = cols
+            pares[key.replace(":", "").strip()] = value
+    return pares
+
+
+def _bs4_adicional(soup):
+    result = dict(SIN_INFORMACION)
+
+    sections = soup.find_all("td", class_="inside")
+    for td in sections:
+        title = td.get_text(strip=True).lower()
+
+        # Buscar "History" o "Remarks"
+        if "history" in title or "remarks" in title:
+            next_td = td.find_next("td")
+            if next_td:
+                result["historia"] = _limpiar(next_td.get_text())
+                continue
+
+        # Buscar referencias
+        if "references" in title:
+            next_td = td.find_next("td")
+            if next_td:
+                result["references"] = _limpiar(next_td.get_text())
+                continue
+
+        # Buscar impacto (si hay)
+        if "impact" in title:
+            next_td = td.find_next("td")
+            if next_td:
+                result["impacto"] = _limpiar(next_td.get_text())
+                continue
+
+    return result
+
+
+def _bs4_enlaces_fotos(soup):
+    photo_table = soup.find("table", border="1", cellpadding="2", cellspacing="0")
+    if not photo_table:
+        return None
+    enlaces = []
+    for row in photo_table.find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) != 2:
+            continue
+        inter_a = cols[1].find("a", href=lambda x: x and "get_original_photo" in x)
+        if inter_a:
+            enlaces.append(_absoluta(inter_a["href"]))
+    return enlaces
+
+
+def extraer_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    datos = {
+        "basic_info": _bs4_basic_info(soup),
+        "classification": _bs4_classification(soup),
+        "geography": _bs4_tabla_pares(soup, "Geography"),
+        "Data_MB109": _bs4_tabla_pares(soup, "Data from"),
+    }
+    datos.update(_bs4_adicional(soup))
+    return datos, _bs4_enlaces_fotos(soup)
+
+
+MOTORES = {"lxml": extraer_lxml, "bs4": extraer_bs4}
+
+
+def extraer(html, motor="lxml"):
+    """Devuelve (datos, enlaces_fotos) de una ficha de detalle del MetBull."""
+    return MOTORES[motor](html)
@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from CacheHttp import cache_compartida
+from ControlTasa import es_recorte, segundos_retry_after
+
+# -------------------------------------------------------------------
+# Descarga asíncrona con pool de conexiones por host
+# -------------------------------------------------------------------
+# Un único httpx.AsyncClient (keep-alive) con:
+#   - límite global de peticiones simultáneas
+#   - límite de conexiones por host
+#   - token bucket por dominio (peticiones/segundo), o un ControladorAIMD
+#     para los dominios que lo tengan (p. ej. el LPI)
+#   - la misma caché en disco que las sesiones requests/cloudscraper
+
+class CuboTokens:
+    """Token bucket: `tasa` peticiones por segundo con ráfagas de hasta `capacidad`."""
+
+    def __init__(self, tasa, capacidad=None):
+        self.tasa = tasa
+        self.capacidad = capacidad or max(1.0, tasa)
+        self.tokens = self.capacidad
+        self.ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def tomar(self):
+        async with self._lock:
+            while True:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.tasa)
+
+
+class FetcherAsync:
+    """
+    Cliente HTTP asíncrono compartido. Usar como `async with FetcherAsync(...) as f`
+    y descargar con `await f.obtener(url)`.
+    """
+
+    def __init__(self, concurrencia=16, conexiones_por_host=8, tasa_por_host=5.0,
+                 cabeceras=None, cookies=None, cache=None, reintentos=3, timeout=30,
+                 controladores=None):
+        self.concurrencia = concurrencia
+        self.conexiones_por_host = conexiones_por_host
+        self.tasa_por_host = tasa_por_host
+        # httpx negocia su propia compresión; no heredar Accept-Encoding (p. ej. br)
+        self.cabeceras = {k: v for k, v in (cabeceras or {}).items() if k.lower() != "accept-encoding"}
+        self.cookies = cookies
+        self.cache = cache or cache_compartida()
+        self.reintentos = reintentos
+        self.timeout = timeout
+        self.controladores = controladores or {}   # host → ControladorAIMD
+        self._global = asyncio.Semaphore(concurrencia)
+        self._por_host = {}
+        self._cubos = {}
+        self.cliente = None
+
+    async def __aenter__(self):
+        self.cliente = httpx.AsyncClient(
+            headers=self.cabeceras,
+            cookies=self.cookies,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrencia,
+                                max_keepalive_connections=self.concurrencia),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cliente.aclose()
+
+    def _limites_host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._por_host:
+            self._por_host[host] = asyncio.Semaphore(self.conexiones_por_host)
+            self._cubos[host] = CuboTokens(self.tasa_por_host)
+        return self._por_host[host], self._cubos[host]
+
+    @staticmethod
+    def _texto(cabeceras, cuerpo):
+        return httpx.Response(200, headers=cabeceras, content=cuerpo).text
+
+    async def obtener(self, url, revalidar=False):
+        """
+        Devuelve el HTML de `url` (desde caché si está fresca), con reintentos.
+        Con `revalidar`, una entrada fresca también se confirma con una petición
+        condicional (ETag / Last-Modified: 304 sin cuerpo si no cambió).
+        """
+        cache = self.cache
+        clave = cache.clave("GET", url, self.cabeceras)
+        entrada = cache.buscar(clave)
+        if entrada is not None and ((entrada["fresca"] and not revalidar) or cache.offline):
+            cache.contar("aciertos")
+            cache.tocar(clave)
+            return self._texto(entrada["cabeceras"], entrada["cuerpo"])
+        if cache.offline:
+            cache.contar("fallos")
+            raise httpx.ConnectError(f"Modo offline: {url} no está en caché")
+
+        condicionales = {}
+        if entrada is not None:
+            if entrada["etag"]:
+                condicionales["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                condicionales["If-Modified-Since"] = entrada["last_modified"]
+
+        controlador = self.controladores.get(urlsplit(url).netloc)
+        for intento in range(self.reintentos):
+            ultimo = intento == self.reintentos - 1
+            respuesta = await self._enviar(url, condicionales, controlador, ultimo)
+
+            if respuesta is not None:
+                if entrada is not None and respuesta.status_code == 304:
+                    cache.contar("revalidados")
+                    cache.tocar(clave, revalidada=True)
+                    return self._texto(entrada["cabeceras"], entrada["cuerpo"])
+                if respuesta.status_code == 200:
+                    cache.contar("fallos")
+                    cache.guardar(clave, url, 200, dict(respuesta.headers), respuesta.content)
+                    return respuesta.text
+                if not es_recorte(respuesta.status_code) or ultimo:
+                    respuesta.raise_for_status()
+
+            # Con controlador la pausa ya la impone él (Retry-After / recorte);
+            # sin controlador, backoff exponencial fuera de los semáforos
+            if controlador is None:
+                await asyncio.sleep(2 ** intento + random.random())
+
+        raise httpx.HTTPError(f"Sin respuesta válida para {url}")
+
+    async def _enviar(self, url, condicionales, controlador, ultimo):
+        """Una petición; devuelve None si hubo error de red reintentable."""
+        try:
+            # El cupo global se toma al final, ya con el permiso del host: esperar el
+            # ritmo de un host lento no debe bloquear las descargas de los demás
+            if controlador is not None:
+                async with controlador.permiso_async() as r, self._global:
+                    respuesta = await self.cliente.get(url, headers=condicionales)
+                    r["status"] = respuesta.status_code
+                    r["retry_after"] = segundos_retry_after(respuesta.headers.get("Retry-After"))
+                return respuesta
+
+            semaforo_host, cubo = self._limites_host(url)
+            async with semaforo_host:
+                await cubo.tomar()
+                async with self._global:
+                    return await self.cliente.get(url, headers=condicionales)
+        except httpx.TransportError as e:
+            if ultimo:
+                raise
+            print(f"⚠️ Error de red en {url}: {e}")
+            return None
+
+
+async def procesar_cola(iniciales, trabajador, trabajadores=32):
+    """
+    Cola compartida: `trabajador(tarea, cola)` procesa una tarea y puede encolar
+    otras nuevas (p. ej. un listado de país encola sus fichas de detalle).
+    Termina cuando la cola queda vacía y no hay tareas en curso.
+    """
+    cola = asyncio.Queue()
+    for tarea in iniciales:
+        cola.put_nowait(tarea)
+
+    async def bucle():
+        while True:
+            tarea = await cola.get()
+            try:
+                await trabajador(tarea, cola)
+            except Exception as e:
+                print(f"⚠️ Error en tarea {repr(tarea)[:100]}: {e}")
+            finally:
+                cola.task_done()
+
+    tareas = [asyncio.create_task(bucle()) for _ in range(trabajadores)]
+    await cola.join()
+    for t in tareas:
+        t.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
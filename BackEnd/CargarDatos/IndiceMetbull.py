@@ -0,0 +1,123 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# -------------------------------------------------------------------
+# Índice del crawl incremental del MetBull (SQLite)
+# -------------------------------------------------------------------
+# Por país, cada meteorito conocido → (enlace a su ficha, huella de su fila
+# en el listado). En un crawl incremental el listado de cada país se compara
+# con el índice y solo se descargan las fichas de las filas nuevas o
+# cambiadas; las demás se toman de la partición anterior del país.
+# El índice de un país se actualiza después de guardar su partición: si el
+# país falla a mitad de camino, la próxima ejecución vuelve a compararlo.
+
+# Un listado que deja fuera más de esta fracción de los meteoritos conocidos
+# de un país se toma por una página incompleta, no por bajas reales.
+MAX_FRACCION_BAJAS = 0.5
+
+
+def huella_fila(fila):
+    """SHA-256 de la fila del listado (columnas de la tabla + enlace a la ficha)."""
+    contenido = json.dumps(fila, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def comparar_listado(rows, conocidos, previas):
+    """
+    Compara el listado de un país (`rows`, recién parseado) con lo conocido:
+      - conocidos: {name: (href, huella)} del índice,
+      - previas: {name: fila completa} de la partición anterior.
+    Devuelve (filas, a_descargar, huellas, cuenta):
+      - filas: el listado, con las filas sin cambios tomadas de `previas`
+        (ya tienen su ficha),
+      - a_descargar: filas nuevas o cambiadas con enlace a su ficha,
+      - huellas: [(name, href, huella)] para actualizar el índice,
+      - cuenta: nuevas / cambiadas / sin cambios / eliminadas.
+    Sin índice para el país (partición de un crawl completo) se comparan las
+    columnas del listado con las de la fila previa.
+    """
+    filas, a_descargar, huellas = [], [], []
+    cuenta = Counter()
+    vistos = set()
+    for fila in rows:
+        name = fila.get("Name")
+        h = huella_fila(fila)
+        huellas.append((name, fila.get("_href"), h))
+        vistos.add(name)
+
+        anterior = previas.get(name)
+        if name in conocidos:
+            igual = conocidos[name][1] == h
+        else:
+            igual = not conocidos and anterior is not None and all(
+                anterior.get(k) == v for k, v in fila.items() if k != "_href")
+
+        if igual and anterior is not None:
+            filas.append(anterior)
+            cuenta["sin cambios"] += 1
+        else:
+            filas.append(fila)
+            if "_href" in fila:
+                a_descargar.append(fila)
+            cuenta["cambiadas" if name in conocidos or name in previas else "nuevas"] += 1
+
+    cuenta["eliminadas"] = len((set(conocidos) | set(previas)) - vistos)
+    return filas, a_descargar, huellas, cuenta
+
+
+def bajas_sospechosas(cuenta):
+    """True si el listado deja fuera a la mayoría (o a todos) de los meteoritos conocidos del país."""
+    conocidas = cuenta["eliminadas"] + cuenta["cambiadas"] + cuenta["sin cambios"]
+    return cuenta["eliminadas"] > MAX_FRACCION_BAJAS * conocidas
+
+
+class IndiceMetbull:
+    """Meteoritos conocidos por país: name → (href, huella de la fila del listado)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(ruta, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS meteoritos (
+                pais TEXT NOT NULL,
+                name TEXT NOT NULL,
+                href TEXT,
+                huella TEXT NOT NULL,
+                visto REAL NOT NULL,
+                PRIMARY KEY (pais, name)
+            )
+        """)
+        self._con.commit()
+
+    def cerrar(self):
+        with self._lock:
+            self._con.close()
+
+    def conocidos(self, pais):
+        """{name: (href, huella)} del país."""
+        with self._lock:
+            return {name: (href, huella) for name, href, huella in self._con.execute(
+                "SELECT name, href, huella FROM meteoritos WHERE pais = ?", (pais,))}
+
+    def actualizar(self, pais, huellas):
+        """Guarda las [(name, href, huella)] del listado del país; borra los que ya no aparecen."""
+        ahora = time.time()
+        with self._lock:
+            self._con.execute("DELETE FROM meteoritos WHERE pais = ?", (pais,))
+            self._con.executemany("""
+                INSERT OR REPLACE INTO meteoritos (pais, name, href, huella, visto)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(pais, name, href, h, ahora) for name, href, h in huellas if name is not None])
+            self._con.commit()
+
+    def estadisticas(self):
+        with self._lock:
+            paises, meteoritos = self._con.execute(
+                "SELECT COUNT(DISTINCT pais), COUNT(*) FROM meteoritos").fetchone()
+        return {"paises": paises, "meteoritos": meteoritos}
@@ -0,0 +1,458 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from AlmacenColumnar import COLUMNAS_METBULL, EscritorTabla, dicts_desde_texto, leer_bloques
+
+# -------------------------------------------------------------------
+# Limpieza de meteoritos_Metbull_PreLimpieza → meteoritos_Metbull
+# -------------------------------------------------------------------
+# Antes: iterrows + literal_eval de cinco columnas por fila + parse_year,
+# normalizar_masa y parseCoordinates llamados fila a fila. Aquí:
+#   - las columnas anidadas del CSV se decodifican como JSON por columna
+#     (AlmacenColumnar.dicts_desde_texto) y sus campos se sacan columna a columna,
+#   - años con Series.str.extract, masas y coordenadas DMS/decimales con
+#     operaciones .str y NumPy; float()/round() de Python solo donde
+#     NumPy redondea distinto, para que la salida sea idéntica byte a byte,
+#   - cada texto distinto se parsea una vez y se filtra primero: el resto de
+#     columnas se arma solo para las filas que quedan.
+# Rendimiento (python -m benchmarks limpieza, 20k filas sintéticas, 1 núcleo):
+# leer + limpiar ~6x más rápido que el bucle original y ~4x de punta a punta.
+# No llega a 10x: escribir el CSV (~0,5-0,7 s) cuesta lo mismo en ambas
+# versiones y ahora domina el total.
+# La salida debe ser idéntica byte a byte a la del bucle original
+# (tests/test_limpieza_golden.py, contra un archivo dorado); los parsers
+# escalares se conservan como referencia de las versiones vectorizadas.
+
+
+# -------------------------------------------------------------------
+# Parsers escalares (regex precompiladas + memo por texto)
+# -------------------------------------------------------------------
+# Los mismos textos se repiten mucho en el catálogo: cada parser memoriza
+# el resultado por texto crudo (LRU) y los decimales simples ("-33.5, 70.2",
+# "120 g") no pasan por la regex DMS.
+
+TAMANO_MEMO = 65_536
+
+_DMS = r"(\d+(?:\.\d+)?)°?\s*(\d+(?:\.\d+)?)?['′]?\s*(\d+(?:\.\d+)?)?['\"″]?\s*([NSEW])?"
+_RE_DMS = re.compile(_DMS, re.I)
+_RE_SIN_SIGNOS = re.compile(r"[()\"\\]")
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_PAR_DECIMAL = re.compile(r"\(?\s*([+-]?[0-9]+(?:\.[0-9]+)?)\s*,\s*([+-]?[0-9]+(?:\.[0-9]+)?)\s*\)?")
+_RE_DECIMAL = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+_RE_ANIO = re.compile(r"(\d{3,4})")
+
+
+def _gms_a_decimal(parte):
+    """Convierte un texto DMS ("34° 39' 0\"N") o decimal a float; None si no se puede."""
+    match = _RE_DMS.match(parte.strip())
+    if not match:
+        # si solo es número decimal
+        try:
+            return float(parte)
+        except ValueError:
+            return None
+
+    grados, minutos, segundos, direccion = match.groups()
+    decimal = float(grados) + (float(minutos) if minutos else 0) / 60 + (float(segundos) if segundos else 0) / 3600
+    if direccion and direccion.upper() in ("S", "W"):
+        decimal = -decimal
+    return decimal
+
+
+@lru_cache(maxsize=TAMANO_MEMO)
+def _coordenadas_memo(texto):
+    # Camino rápido: "lat, lon" decimal, con o sin paréntesis
+    par = _RE_PAR_DECIMAL.fullmatch(texto.strip())
+    if par:
+        return float(par.group(1)), float(par.group(2))
+
+    # Quitar paréntesis y comillas
+    texto = _RE_SIN_SIGNOS.sub("", texto).strip()
+
+    # Separar latitud y longitud por coma, si existe
+    partes = [p.strip() for p in texto.split(",")]
+    if len(partes) < 2:
+        # intentar separar por espacios
+        partes = _RE_ESPACIOS.split(texto)
+        if len(partes) < 2:
+            return None, None
+    return _gms_a_decimal(partes[0]), _gms_a_decimal(partes[1])
+
+
+def parseCoordinates(coordString):
+    """
+    Convierte coordenadas en formato grados, minutos, segundos (DMS) o decimal
+    a un dict {'lat': float, 'lon': float}.
+    Ejemplos válidos:
+      "34° 39' 0\"N, 61° 10' 48\"E"
+      "34 39 0 N 61 10 48 E"
+      "34.65, 61.18"
+    """
+    if not coordString:
+        return {"lat": None, "lon": None}
+    lat, lon = _coordenadas_memo(coordString)
+    return {"lat": lat, "lon": lon}
+
+
+@lru_cache(maxsize=TAMANO_MEMO)
+def _anio_memo(texto):
+    # Buscar los primeros dígitos consecutivos
+    match = _RE_ANIO.match(texto)
+    return int(match.group(1)) if match else None
+
+
+def parse_year(year_str):
+    if not year_str or pd.isna(year_str):
+        return None
+    return _anio_memo(str(year_str))
+
+
+# Unidad → factor a gramos, en el orden en que se prueban los sufijos
+_UNIDADES = (("mg", 0.001), ("kg", 1000.0), ("t", 1_000_000.0), ("ton", 1_000_000.0),
+             ("tonne", 1_000_000.0), ("g", 1.0))
+
+
+@lru_cache(maxsize=TAMANO_MEMO)
+def _gramos_memo(masa):
+    masa = masa.strip().lower().replace(",", ".").replace(" ", "")
+
+    # Camino rápido: número sin unidad (se asume gramos)
+    if _RE_DECIMAL.fullmatch(masa):
+        return round(float(masa), 3)
+
+    factor = 1.0
+    for unidad, factor_unidad in _UNIDADES:
+        if masa.endswith(unidad):
+            factor = factor_unidad
+            if factor_unidad == 1_000_000.0:    # toneladas: se quitan todas las "t"/"ton"/"tonne"
+                masa = masa.replace("t", "").replace("ton", "").replace("tonne", "")
+            else:
+                masa = masa.replace(unidad, "")
+            break
+
+    try:
+        return round(float(masa) * factor, 3)  # retorna en gramos
+    except ValueError:
+        return None
+
+
+def normalizar_masa(masa):
+    """
+    Normaliza la masa a gramos (g).
+    Acepta valores en g, kg, mg, t, etc.
+    Retorna float en gramos o None si no es válido.
+    """
+    if masa is None or (isinstance(masa, float) and pd.isna(masa)):
+        return None
+    return _gramos_memo(masa if isinstance(masa, str) else str(masa))
+
+
+# -------------------------------------------------------------------
+# Parsers vectorizados (misma salida que los escalares)
+# -------------------------------------------------------------------
+
+def _serie(valores):
+    return pd.Series(list(valores), dtype=object)
+
+
+def _por_texto_unico(textos, parser):
+    """
+    Aplica `parser` (Series de textos → tupla de arrays) una vez por texto
+    distinto y reparte el resultado a todas las filas: años, masas y
+    coordenadas se repiten mucho en el MetBull.
+    """
+    codigos, unicos = pd.factorize(np.asarray(textos, dtype=object))
+    return tuple(r[codigos] for r in parser(pd.Series(unicos, dtype=object)))
+
+
+def _a_float(textos):
+    """
+    float() de Python por texto (acepta lo mismo: '1e3', '1_000', 'nan'...).
+    Devuelve (valores, válidos); NaN donde no es número.
+    """
+    valores = np.full(len(textos), np.nan)
+    validos = np.zeros(len(textos), dtype=bool)
+    for i, texto in enumerate(textos.tolist()):
+        try:
+            valores[i] = float(texto)
+            validos[i] = True
+        except ValueError:
+            pass
+    return valores, validos
+
+
+def _anios_texto(textos):
+    digitos = textos.str.extract(r"^(\d{3,4})", expand=False)
+    return (digitos.map(int, na_action="ignore").to_numpy(dtype="float64", na_value=np.nan),)
+
+
+def anios(valores):
+    """parse_year vectorizado: float64 con el año o NaN donde parse_year da None."""
+    s = _serie(valores)
+    presentes = (s.notna() & s.ne("")).to_numpy(dtype=bool)
+    resultado = np.full(len(s), np.nan)
+    if presentes.any():
+        resultado[presentes], = _por_texto_unico(s[presentes].map(str), _anios_texto)
+    return resultado
+
+
+def _gramos_texto(textos):
+    texto = (textos.str.strip().str.lower()
+             .str.replace(",", ".", regex=False).str.replace(" ", "", regex=False))
+
+    mg = texto.str.endswith("mg")
+    kg = ~mg & texto.str.endswith("kg")
+    t = ~mg & ~kg & (texto.str.endswith("t") | texto.str.endswith("ton") | texto.str.endswith("tonne"))
+    g = ~mg & ~kg & ~t & texto.str.endswith("g")
+
+    numero = texto.copy()
+    numero[mg] = texto[mg].str.replace("mg", "", regex=False)
+    numero[kg] = texto[kg].str.replace("kg", "", regex=False)
+    numero[t] = (texto[t].str.replace("t", "", regex=False)
+                 .str.replace("ton", "", regex=False).str.replace("tonne", "", regex=False))
+    numero[g] = texto[g].str.replace("g", "", regex=False)
+    factor = np.select([mg.to_numpy(), kg.to_numpy(), t.to_numpy()], [0.001, 1000.0, 1_000_000.0], 1.0)
+
+    valor, validos = _a_float(numero)
+    # round() de Python (redondeo decimal exacto); np.round difiere en algunos .xxx5.
+    # Como en Python, un producto fuera de rango da inf sin avisar.
+    with np.errstate(over="ignore"):
+        gramos = valor[validos] * factor[validos]
+    valor[validos] = [round(v, 3) for v in gramos.tolist()]
+    return (valor,)
+
+
+def masas_en_gramos(valores):
+    """normalizar_masa vectorizado: float64 en gramos o NaN donde normalizar_masa da None."""
+    s = _serie(valores)
+    presentes = s.notna().to_numpy(dtype=bool)
+    resultado = np.full(len(s), np.nan)
+    if presentes.any():
+        resultado[presentes], = _por_texto_unico(s[presentes].map(str), _gramos_texto)
+    return resultado
+
+
+def _grados(partes):
+    """gmsToDecimal vectorizado sobre una Series de textos → (valores, válidos)."""
+    g = partes.str.strip().str.extract("^" + _DMS, flags=re.I)
+    casan = g[0].notna().to_numpy(dtype=bool)
+    valores = np.full(len(partes), np.nan)
+    validos = casan.copy()
+
+    grados = g[0][casan].astype("float64").to_numpy()
+    minutos = g[1][casan].astype("float64").fillna(0).to_numpy()
+    segundos = g[2][casan].astype("float64").fillna(0).to_numpy()
+    decimal = grados + minutos / 60 + segundos / 3600
+    negativo = g[3][casan].str.upper().isin(["S", "W"]).to_numpy(dtype=bool)
+    valores[casan] = np.where(negativo, -decimal, decimal)
+
+    # Sin forma DMS: float() del texto tal cual ("-23.5")
+    if not casan.all():
+        valores[~casan], validos[~casan] = _a_float(partes[~casan])
+    return valores, validos
+
+
+def _coordenadas_texto(textos):
+    limpio = textos.str.replace(r"[()\"\\]", "", regex=True).str.strip()
+
+    # Separar por coma; si no hay, por espacios
+    partes = limpio.str.split(",")
+    con_coma = (partes.str.len() >= 2).to_numpy(dtype=bool)
+    espacios = limpio[~con_coma].str.split(r"\s+", regex=True)
+    con_espacios = (espacios.str.len() >= 2).to_numpy(dtype=bool)
+
+    primera = pd.concat([partes[con_coma].str[0].str.strip(), espacios[con_espacios].str[0]])
+    segunda = pd.concat([partes[con_coma].str[1].str.strip(), espacios[con_espacios].str[1]])
+    filas = primera.index.to_numpy()
+
+    n = len(textos)
+    lat, lon = np.full(n, np.nan), np.full(n, np.nan)
+    lat_ok, lon_ok = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    lat[filas], lat_ok[filas] = _grados(primera)
+    lon[filas], lon_ok[filas] = _grados(segunda)
+    return lat, lat_ok, lon, lon_ok
+
+
+def coordenadas(textos):
+    """
+    parseCoordinates vectorizado (con la regla de parse_coords_safe: lo que no
+    es texto o está vacío no tiene coordenadas). Devuelve
+    (lat, lat_válida, lon, lon_válida); NaN/False donde el escalar da None.
+    """
+    s = _serie(textos)
+    n = len(s)
+    lat, lon = np.full(n, np.nan), np.full(n, np.nan)
+    lat_ok, lon_ok = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+
+    es_texto = np.fromiter((isinstance(v, str) and v != "" for v in s), dtype=bool, count=n)
+    if es_texto.any():
+        lat[es_texto], lat_ok[es_texto], lon[es_texto], lon_ok[es_texto] = \
+            _por_texto_unico(s[es_texto], _coordenadas_texto)
+    return lat, lat_ok, lon, lon_ok
+
+
+# -------------------------------------------------------------------
+# Limpieza de la tabla completa
+# -------------------------------------------------------------------
+
+CAMPOS_MB109 = {
+    "DataMB109_Lat": "Latitude",
+    "DataMB109_Lon": "Longitude",
+    "DataMB109_Mass": "Mass (g)",
+    "DataMB109_Piece": "Pieces",
+    "DataMB109_Class": "Class",
+    "DataMB109_Weathering": "Weathering grade",
+    "DataMB109_Fayalite": "Fayalite (mol%)",
+    "DataMB109_Ferrosilite": "Ferrosilite (mol%)",
+    "DataMB109_Classifier": "Classifier",
+    "DataMB109_Main_mass": "Main mass",
+    "DataMB109_Coments": "Comments",
+}
+
+TEXTOS_ADICIONALES = ["historia", "importancia", "descubrimiento", "impacto", "references"]
+
+SIN_INFORMACION = "No hay información"
+
+
+def _campo(dicts, clave):
+    """Valor de `clave` en cada dict de la columna (lo que no es dict cuenta como {})."""
+    return [d.get(clave) if isinstance(d, dict) else None for d in dicts]
+
+
+def _entero_o_none(valores):
+    return [int(v) if v == v else None for v in valores.tolist()]
+
+
+def _redondeado(valores, validos, decimales):
+    return [round(v, decimales) if ok else None for v, ok in zip(valores.tolist(), validos.tolist())]
+
+
+def _texto_fotos(imagenes):
+    imagenes = imagenes if isinstance(imagenes, dict) else {}
+    if "fotos" not in imagenes or not isinstance(imagenes["fotos"], list):
+        return SIN_INFORMACION
+    return "; ".join(
+        f"{f.get('autor', 'Desconocido')} | {f.get('referencia', SIN_INFORMACION)} | "
+        f"{f.get('foto_original', SIN_INFORMACION)}"
+        for f in imagenes["fotos"] if isinstance(f, dict)
+    )
+
+
+def limpiar_metbull(df):
+    """
+    DataFrame de PreLimpieza → DataFrame limpio. Las columnas anidadas pueden
+    venir como dict (Parquet/Arrow) o como el texto del CSV; del texto solo se
+    decodifican las filas que hacen falta. Descarta las filas sin año
+    (Year fell/Year found) o sin ninguna coordenada.
+    """
+    n = len(df)
+
+    def columna(nombre, defecto=None):
+        if nombre in df.columns:
+            return df[nombre].to_numpy(dtype=object)
+        return np.full(n, defecto, dtype=object)
+
+    def anidada(nombre, filas=None):
+        if nombre not in df.columns:
+            return np.full(n if filas is None else len(filas), None, dtype=object)
+        serie = df[nombre] if filas is None else df[nombre].iloc[filas]
+        return np.array(dicts_desde_texto(serie), dtype=object)
+
+    basic_info = anidada("basic_info")
+    geography = anidada("geography")
+
+    # --- Filtro: año básico y al menos una coordenada (solo se parsean las que tienen año) ---
+    anio_fell = anios(_campo(basic_info, "Year fell"))
+    anio_found = anios(_campo(basic_info, "Year found"))
+    anio_basico = np.where(np.isnan(anio_fell) | (anio_fell == 0), anio_found, anio_fell)
+    con_anio = np.flatnonzero(~np.isnan(anio_basico) & (anio_basico != 0))
+
+    geografia = geography[con_anio]
+    texto_exacto = np.array(_campo(geografia, "Catalogue of Meteorites"), dtype=object)
+    texto_recomend = np.array(_campo(geografia, "Recommended"), dtype=object)
+    # Catalogue y Recommended suelen traer el mismo texto: se parsean juntas
+    lat, lat_ok, lon, lon_ok = coordenadas(np.concatenate([texto_exacto, texto_recomend]))
+    m = len(con_anio)
+    lat_e, lat_e_ok, lon_e, lon_e_ok = lat[:m], lat_ok[:m], lon[:m], lon_ok[:m]
+    lat_r, lat_r_ok, lon_r, lon_r_ok = lat[m:], lat_ok[m:], lon[m:], lon_ok[m:]
+
+    validas = np.flatnonzero(lat_e_ok | lon_e_ok | lat_r_ok | lon_r_ok)   # posiciones dentro de con_anio
+    filas = con_anio[validas]
+    if not len(filas):
+        return pd.DataFrame()
+
+    basicos = basic_info[filas]
+    clasificacion = anidada("classification", filas)
+    mb109 = anidada("Data_MB109", filas)
+    anio = anios(columna("Year")[filas])
+    anio[anio == 0] = np.nan
+
+    limpio = {
+        # Información básica
+        "Name": [str(v).replace("**", "").strip() for v in columna("Name", "")[filas]],
+        "Year": _entero_o_none(anio),
+        "Mass": [None if v != v else v for v in masas_en_gramos(columna("Mass")[filas]).tolist()],
+        "Country": columna("Country")[filas].tolist(),
+        "Type": columna("Type")[filas].tolist(),
+        "Place": columna("Place")[filas].tolist(),
+        "Status": columna("Status")[filas].tolist(),
+        "Fall": columna("Fall")[filas].tolist(),
+
+        # Basic info desglosada
+        "basic_name": _campo(basicos, "Name"),
+        "basic_abbrev": _campo(basicos, "Abbreviation"),
+        "basic_fall": _campo(basicos, "Observed fall"),
+        "basic_yearFound": _entero_o_none(anio_basico[filas]),
+        "basic_country": _campo(basicos, "Country"),
+
+        # Classification
+        "classification_recomend": _campo(clasificacion, "Recommended"),
+
+        # Coordenadas
+        "coordinadesExact": texto_exacto[validas].tolist(),
+        "coordinadesLat": _redondeado(lat_e[validas], lat_e_ok[validas], 1),
+        "coordinadesLon": _redondeado(lon_e[validas], lon_e_ok[validas], 1),
+        "coordinadesRecomend": texto_recomend[validas].tolist(),
+        "coordinadesLatRecomend": _redondeado(lat_r[validas], lat_r_ok[validas], 1),
+        "coordinadesLonRecomend": _redondeado(lon_r[validas], lon_r_ok[validas], 1),
+    }
+
+    # Data_MB109
+    for destino, clave in CAMPOS_MB109.items():
+        limpio[destino] = _campo(mb109, clave)
+
+    # Textos y fotos
+    for nombre in TEXTOS_ADICIONALES:
+        limpio[nombre] = columna(nombre, SIN_INFORMACION)[filas].tolist()
+    limpio["fotos"] = [_texto_fotos(i) for i in anidada("images", filas)]
+
+    return pd.DataFrame(limpio)
+
+
+# -------------------------------------------------------------------
+# Limpieza por bloques (memoria acotada)
+# -------------------------------------------------------------------
+
+FILAS_POR_BLOQUE = 5000
+
+
+def limpiar_por_bloques(entrada_base, salida_base, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Lee <entrada_base> (.arrow/.parquet/.csv, o una lista de rutas base) de
+    a `filas_por_bloque` filas, limpia cada bloque y lo agrega a
+    <salida_base>.csv/.parquet: la memoria depende del tamaño del bloque y no
+    del catálogo. Informa conservadas y descartadas por bloque. Devuelve
+    (leídas, conservadas, rutas escritas).
+    """
+    leidas = conservadas = 0
+    with EscritorTabla(salida_base, COLUMNAS_METBULL) as escritor:
+        for numero, bloque in enumerate(leer_bloques(entrada_base, filas_por_bloque), 1):
+            limpio = limpiar_metbull(bloque)
+            escritor.escribir(limpio)
+            leidas += len(bloque)
+            conservadas += len(limpio)
+            print(f"🧩 Bloque {numero}: {len(limpio)} conservadas, {len(bloque) - len(limpio)} descartadas")
+    return leidas, conservadas, escritor.escritas
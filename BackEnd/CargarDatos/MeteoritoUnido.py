@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+
+# -------------------------------------------------------------------
+# Registro unido MetBull ↔ CNEOS
+# -------------------------------------------------------------------
+# unir_datos devuelve uno por meteorito (y por bola de fuego sin meteorito);
+# lo comparten la selección y el enriquecimiento. Con __slots__ cada registro
+# ocupa ~0,34 KB en vez de los ~0,83 KB de un dict de 39 claves. Se lee como
+# un dict (r["name"], r.get(...), r.items()) y solo se convierte a dict al
+# enriquecerlo para escribir el JSON (copy / a_dict).
+
+
+@dataclass(slots=True, eq=False)
+class MeteoritoUnido:
+    name: str = ""
+    status: str = ""
+    fall: str = ""
+    year: str = ""
+    place: str = ""
+    type: str = ""
+    mass: str = ""
+    country: str = ""
+    basic_name: str = ""
+    basic_abbrev: str = ""
+    basic_fall: str = ""
+    basic_yearFound: str = ""
+    basic_country: str = ""
+    classification: str = ""
+    coordinadesExact: str = ""
+    coordinadesLat: str = ""
+    coordinadesLon: str = ""
+    coordinadesRecomend: str = ""
+    coordinadesLatRecomend: str = ""
+    coordinadesLonRecomend: str = ""
+    dataMB109_Lat: str = ""
+    dataMB109_Lon: str = ""
+    dataMB109_Mass: str = ""
+    dataMB109_Piece: str = ""
+    dataMB109_Class: str = ""
+    dataMB109_Weathering: str = ""
+    dataMB109_Fayalite: str = ""
+    dataMB109_Ferrosilite: str = ""
+    dataMB109_Classifier: str = ""
+    dataMB109_Main_mass: str = ""
+    dataMB109_Coments: str = ""
+    impact_date: str = ""
+    impact_lat: str = ""
+    impact_lon: str = ""
+    impact_alt: str = ""
+    impact_vel: str = ""
+    impact_energy: str = ""
+    impact_e: str = ""
+    metBull_fotos: list = field(default_factory=list)
+
+    # --- Lectura como dict (mismas claves y orden que el dict de antes) ---
+    def __getitem__(self, clave):
+        if clave not in _POSICIONES:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __setitem__(self, clave, valor):
+        if clave not in _POSICIONES:
+            raise KeyError(f"{clave} no es un campo de MeteoritoUnido (usar a_dict())")
+        setattr(self, clave, valor)
+
+    def __contains__(self, clave):
+        return clave in _POSICIONES
+
+    def __iter__(self):
+        return iter(CAMPOS_UNIDOS)
+
+    def __len__(self):
+        return len(CAMPOS_UNIDOS)
+
+    def get(self, clave, defecto=None):
+        return getattr(self, clave) if clave in _POSICIONES else defecto
+
+    def keys(self):
+        return CAMPOS_UNIDOS
+
+    def values(self):
+        return _valores(self)
+
+    def items(self):
+        return zip(CAMPOS_UNIDOS, _valores(self))
+
+    def a_dict(self):
+        """Dict nuevo con los campos en orden (lo que se escribe en el JSON)."""
+        return dict(zip(CAMPOS_UNIDOS, _valores(self)))
+
+    copy = a_dict
+
+
+CAMPOS_UNIDOS = tuple(f.name for f in fields(MeteoritoUnido))
+_POSICIONES = frozenset(CAMPOS_UNIDOS)
+_valores = attrgetter(*CAMPOS_UNIDOS)
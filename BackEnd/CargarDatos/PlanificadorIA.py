@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import ollama
+
+from CacheIA import cache_ia_compartida
+
+# -------------------------------------------------------------------
+# Planificador de inferencia para Ollama
+# -------------------------------------------------------------------
+# Todas las llamadas al modelo pasan por una cola con prioridad atendida
+# por `concurrencia` hilos: nunca llegan al servidor más peticiones
+# simultáneas que las que puede atender (OLLAMA_NUM_PARALLEL). Los
+# meteoritos especiales (filtros_personales) se atienden primero.
+# Las respuestas se leen en streaming y se miden tokens/s por petición.
+# Antes de encolar se consulta la caché de prompts (CacheIA), salvo que
+# no se conozca el digest del modelo (la clave no distinguiría versiones).
+
+MODELO_DEFECTO = "llama3"
+
+PRIORIDAD_ESPECIAL = 0
+PRIORIDAD_NORMAL = 1
+
+# Ollama atiende 4 peticiones en paralelo por defecto si hay memoria suficiente
+NUM_PARALLEL_DEFECTO = 4
+
+
+def concurrencia_ollama():
+    """Peticiones simultáneas que admite el servidor local (OLLAMA_NUM_PARALLEL)."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", NUM_PARALLEL_DEFECTO)))
+    except ValueError:
+        return NUM_PARALLEL_DEFECTO
+
+
+class PlanificadorIA:
+    """
+    Cola de inferencia con prioridad y techo de concurrencia.
+      - enviar(prompt, prioridad) → Future con (texto, métricas)
+      - chat(prompt, prioridad)   → texto (bloqueante)
+      - await chat_async(prompt)  → texto
+    """
+
+    def __init__(self, modelo=MODELO_DEFECTO, concurrencia=None, host=None, cliente=None, cache=None):
+        self.modelo = modelo
+        self.cache = cache
+        self._digest = None
+        self._sin_digest_avisado = False
+        self.concurrencia = concurrencia or concurrencia_ollama()
+        # host=None → OLLAMA_HOST o http://localhost:11434
+        self.cliente = cliente or ollama.Client(host=host)
+        self._cola = queue.PriorityQueue()
+        self._secuencia = itertools.count()   # desempate FIFO dentro de la misma prioridad
+        self._lock = threading.Lock()
+        self.metricas = []
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self.aciertos_cache = 0
+        self._hilos = [threading.Thread(target=self._bucle, daemon=True, name=f"ia-{i}")
+                       for i in range(self.concurrencia)]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def digest(self):
+        """
+        Digest del modelo instalado (parte de la clave de caché), o None si no se
+        conoce (modelo no listado o servidor sin responder). Solo se recuerda
+        cuando se encontró: sin digest no se usa la caché.
+        """
+        if self._digest is None:
+            try:
+                nombres = (self.modelo, f"{self.modelo}:latest")
+                self._digest = next((m["digest"] for m in self.cliente.list()["models"]
+                                     if m["model"] in nombres and m["digest"]), None)
+            except Exception as e:
+                motivo = f"no se pudo consultar ({e})"
+            else:
+                motivo = "no aparece entre los modelos instalados"
+            if self._digest is None and not self._sin_digest_avisado:
+                self._sin_digest_avisado = True
+                print(f"⚠️ Digest de {self.modelo}: {motivo}; sin caché de prompts")
+        return self._digest
+
+    # --- Envío ---
+    def enviar(self, prompt, prioridad=PRIORIDAD_NORMAL, etiqueta="", al_fragmento=None):
+        """
+        Encola un prompt. `al_fragmento(texto)` recibe cada fragmento a medida
+        que llega (streaming). Devuelve un Future con (texto, métricas).
+        Si el prompt ya está en caché se resuelve al instante sin llegar al modelo.
+        """
+        futuro = Future()
+        digest = self.digest() if self.cache is not None else None
+        if digest:
+            entrada = self.cache.buscar(self.modelo, digest, prompt)
+            if entrada is not None:
+                with self._lock:
+                    self.aciertos_cache += 1
+                print(f"🗃️ {etiqueta or 'IA'}: respuesta desde caché")
+                if al_fragmento:
+                    al_fragmento(entrada["texto"])
+                futuro.set_result((entrada["texto"], dict(entrada["metricas"], etiqueta=etiqueta, cache=True)))
+                return futuro
+        tarea = (prompt, etiqueta, al_fragmento, futuro, time.perf_counter())
+        self._cola.put((prioridad, next(self._secuencia), tarea))
+        return futuro
+
+    def chat(self, prompt, prioridad=PRIORIDAD_NORMAL, etiqueta="", al_fragmento=None):
+        texto, _ = self.enviar(prompt, prioridad, etiqueta, al_fragmento).result()
+        return texto
+
+    async def chat_async(self, prompt, prioridad=PRIORIDAD_NORMAL, etiqueta="", al_fragmento=None):
+        texto, _ = await asyncio.wrap_future(self.enviar(prompt, prioridad, etiqueta, al_fragmento))
+        return texto
+
+    # --- Ejecución ---
+    def _bucle(self):
+        while True:
+            _, _, tarea = self._cola.get()
+            if tarea is None:
+                break
+            prompt, etiqueta, al_fragmento, futuro, encolado = tarea
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self.en_curso += 1
+                self.max_en_curso = max(self.max_en_curso, self.en_curso)
+            try:
+                futuro.set_result(self._ejecutar(prompt, etiqueta, al_fragmento, encolado))
+            except Exception as e:
+                futuro.set_exception(e)
+            finally:
+                with self._lock:
+                    self.en_curso -= 1
+
+    def _ejecutar(self, prompt, etiqueta, al_fragmento, encolado):
+        inicio = time.perf_counter()
+        partes = []
+        final = None
+        for fragmento in self.cliente.chat(model=self.modelo, stream=True,
+                                           messages=[{"role": "user", "content": prompt}]):
+            texto = fragmento["message"]["content"]
+            if texto:
+                partes.append(texto)
+                if al_fragmento:
+                    al_fragmento(texto)
+            if fragmento["done"]:
+                final = fragmento
+        fin = time.perf_counter()
+
+        # Contadores que Ollama envía en el último fragmento (duraciones en ns)
+        tokens = (final and final["eval_count"]) or 0
+        duracion = ((final and final["eval_duration"]) or 0) / 1e9
+        metricas = {
+            "etiqueta": etiqueta,
+            "espera_s": round(inicio - encolado, 3),
+            "total_s": round(fin - inicio, 3),
+            "tokens_prompt": (final and final["prompt_eval_count"]) or 0,
+            "tokens": tokens,
+            "tokens_s": round(tokens / duracion, 2) if duracion else None,
+        }
+        with self._lock:
+            self.metricas.append(metricas)
+        print(f"🤖 {etiqueta or 'IA'}: {metricas['tokens_prompt']} tokens de prompt, "
+              f"{tokens} generados en {metricas['total_s']}s ({metricas['tokens_s']} tokens/s)")
+        texto = "".join(partes)
+        digest = self.digest() if self.cache is not None else None
+        if digest:
+            self.cache.guardar(self.modelo, digest, prompt, texto, metricas)
+        return texto, metricas
+
+    # --- Observabilidad / cierre ---
+    def resumen(self):
+        with self._lock:
+            metricas = list(self.metricas)
+        tokens = sum(m["tokens"] for m in metricas)
+        segundos = sum(m["total_s"] for m in metricas)
+        return {
+            "peticiones": len(metricas),
+            "tokens": tokens,
+            "tokens_prompt": sum(m["tokens_prompt"] for m in metricas),
+            "tokens_s_medio": round(tokens / segundos, 2) if segundos else None,
+            "max_en_curso": self.max_en_curso,
+            "aciertos_cache": self.aciertos_cache,
+        }
+
+    def cerrar(self):
+        """Atiende lo pendiente y detiene los hilos."""
+        for _ in self._hilos:
+            self._cola.put((float("inf"), next(self._secuencia), None))
+        for hilo in self._hilos:
+            hilo.join()
+
+
+_planificador = None
+_lock_planificador = threading.Lock()
+
+
+def planificador_compartido():
+    """Instancia única del planificador para todo el proceso."""
+    global _planificador
+    with _lock_planificador:
+        if _planificador is None:
+            _planificador = PlanificadorIA(cache=cache_ia_compartida())
+        return _planificador
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from AlmacenJsonl import normalizar_anio
+
+# -------------------------------------------------------------------
+# Registro de trabajo persistente (SQLite) para el enriquecimiento
+# -------------------------------------------------------------------
+# Cada meteorito se identifica por (name, year) y avanza por etapas:
+#   unido → buscado → filtrado → enriquecido
+# Un registro está terminado cuando tiene 'resultado' (enriquecido, o
+# descartado por el filtro de relevancia, o guardado vacío). 'resultado'
+# guarda solo la huella del registro final: el contenido vive en el JSONL
+# (AlmacenJsonl), así el registro no duplica cada resultado.
+
+ETAPAS = ("unido", "buscado", "filtrado", "enriquecido")
+
+
+def clave(registro):
+    """Clave (name, year) normalizada a texto (el año con normalizar_anio: 873.0 → '873')."""
+    return str(registro.get("name", "")), normalizar_anio(registro.get("year", ""))
+
+
+def _sha256(datos):
+    contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def _base(registro):
+    return {k: v for k, v in registro.items() if not k.startswith("ia_")}
+
+
+def huella(registro):
+    """SHA-256 de los datos base del registro (sin los campos ia_*, con el año normalizado)."""
+    base = _base(registro)
+    if "year" in base:
+        base["year"] = normalizar_anio(base["year"])
+    return _sha256(base)
+
+
+def huellas_anteriores(registro):
+    """
+    Huellas que pudo guardar la versión anterior, que no normalizaba el año:
+    con el año tal cual, como entero y como float ('873' / '873.0').
+    """
+    base = _base(registro)
+    anio = normalizar_anio(base.get("year", ""))
+    variantes = {base.get("year", "")}
+    if anio.lstrip("-").isdigit():
+        variantes |= {anio, f"{anio}.0", int(anio), float(anio)}
+    return {_sha256(dict(base, year=v)) for v in variantes}
+
+
+def huella_resultado(resultado):
+    """SHA-256 del resultado final completo (incluye los campos ia_*)."""
+    return _sha256(resultado)
+
+
+class RegistroTrabajo:
+    """
+    Libro de trabajo durable. Las escrituras son UPSERT por clave (O(1)), así que
+    una ejecución interrumpida de /actualizarJson se reanuda en la etapa exacta
+    donde quedó cada meteorito y solo se tocan filas nuevas o modificadas.
+    """
+
+    def __init__(self, nombre="registro_trabajo.sqlite"):
+        self.ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), nombre)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS registros (
+                name TEXT NOT NULL,
+                year TEXT NOT NULL,
+                huella TEXT NOT NULL,
+                tipo TEXT,
+                etapa TEXT NOT NULL,
+                texto_web TEXT,
+                relevante INTEGER,
+                resultado TEXT,
+                actualizado REAL NOT NULL,
+                PRIMARY KEY (name, year)
+            )
+        """)
+        self._con.commit()
+        self._migrar_claves()
+        self._migrar_resultados()
+
+    def _migrar_claves(self):
+        """
+        Años guardados como '873.0' pasan a '873' (normalizar_anio). Si ya existe
+        la fila normalizada se conserva la más reciente de las dos.
+        """
+        filas = [(name, year, actualizado) for name, year, actualizado
+                 in self._con.execute("SELECT name, year, actualizado FROM registros")
+                 if normalizar_anio(year) != year]
+        for name, year, actualizado in filas:
+            anio = normalizar_anio(year)
+            otra = self._con.execute("SELECT actualizado FROM registros WHERE name = ? AND year = ?",
+                                     (name, anio)).fetchone()
+            if otra is not None and otra[0] >= actualizado:
+                self._con.execute("DELETE FROM registros WHERE name = ? AND year = ?", (name, year))
+                continue
+            if otra is not None:
+                self._con.execute("DELETE FROM registros WHERE name = ? AND year = ?", (name, anio))
+            self._con.execute("UPDATE registros SET year = ? WHERE name = ? AND year = ?", (anio, name, year))
+        if filas:
+            self._con.commit()
+            print(f"📒 Registro: {len(filas)} claves con el año normalizado.")
+
+    def _migrar_resultados(self):
+        """Registros de versiones anteriores guardaban el JSON completo: se reemplaza por su huella."""
+        filas = self._con.execute(
+            "SELECT name, year, resultado FROM registros WHERE resultado IS NOT NULL AND length(resultado) != 64"
+        ).fetchall()
+        if not filas:
+            return
+        self._con.executemany(
+            "UPDATE registros SET resultado = ? WHERE name = ? AND year = ?",
+            ((huella_resultado(json.loads(resultado)), name, year) for name, year, resultado in filas))
+        self._con.commit()
+        self._con.execute("VACUUM")
+        print(f"📒 Registro: {len(filas)} resultados migrados a huella.")
+
+    def cerrar(self):
+        with self._lock:
+            self._con.close()
+
+    def vacio(self):
+        with self._lock:
+            return self._con.execute("SELECT 1 FROM registros LIMIT 1").fetchone() is None
+
+    # --- Alta de registros (etapa 'unido') ---
+    def registrar_unidos(self, registros, tipo):
+        """
+        Da de alta los registros unidos. Los nuevos o los que cambiaron de huella
+        vuelven a la etapa 'unido'; los demás conservan su progreso.
+        Devuelve la lista de registros que aún no están terminados.
+        """
+        with self._lock:
+            existentes = {
+                (n, y): (h, bool(terminado))
+                for n, y, h, terminado in self._con.execute(
+                    "SELECT name, year, huella, resultado IS NOT NULL FROM registros")
+            }
+            ahora = time.time()
+            altas, pendientes, rehuellas = [], [], []
+            for r in registros:
+                k = clave(r)
+                h = huella(r)
+                previo = existentes.get(k)
+                if previo is not None and previo[0] != h and previo[0] in huellas_anteriores(r):
+                    # Misma fila con la huella de la versión anterior: se actualiza sin perder progreso
+                    rehuellas.append((h, *k))
+                    previo = (h, previo[1])
+                if previo is None or previo[0] != h:
+                    altas.append((k[0], k[1], h, tipo, "unido", ahora))
+                    pendientes.append(r)
+                elif not previo[1]:
+                    pendientes.append(r)
+
+            self._con.executemany("""
+                INSERT INTO registros (name, year, huella, tipo, etapa, actualizado)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name, year) DO UPDATE SET
+                    huella = excluded.huella, tipo = excluded.tipo, etapa = excluded.etapa,
+                    texto_web = NULL, relevante = NULL, resultado = NULL,
+                    actualizado = excluded.actualizado
+            """, altas)
+            self._con.executemany("UPDATE registros SET huella = ? WHERE name = ? AND year = ?", rehuellas)
+            self._con.commit()
+
+        print(f"📒 Registro: {len(altas)} nuevos o modificados, {len(pendientes)} pendientes.")
+        return pendientes
+
+    def importar_resultados(self, resultados, tipo="importado"):
+        """Marca como terminados resultados ya existentes (p. ej. un meteoritos.json previo)."""
+        ahora = time.time()
+        filas = (
+            (*clave(r), huella(r), tipo, "enriquecido", huella_resultado(r), ahora)
+            for r in resultados
+        )
+        with self._lock:
+            cursor = self._con.executemany("""
+                INSERT OR REPLACE INTO registros
+                    (name, year, huella, tipo, etapa, resultado, actualizado)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, filas)
+            self._con.commit()
+        return cursor.rowcount
+
+    # --- Avance por etapas ---
+    def estado(self, registro):
+        """Devuelve dict con etapa, texto_web y relevante del registro (o None)."""
+        with self._lock:
+            fila = self._con.execute(
+                "SELECT etapa, texto_web, relevante FROM registros WHERE name = ? AND year = ?",
+                clave(registro)).fetchone()
+        if fila is None:
+            return None
+        etapa, texto_web, relevante = fila
+        return {
+            "etapa": etapa,
+            "texto_web": texto_web,
+            "relevante": None if relevante is None else bool(relevante),
+        }
+
+    def marcar_buscado(self, registro, texto_web):
+        self._actualizar(registro, "buscado", texto_web=texto_web)
+
+    def marcar_filtrado(self, registro, relevante):
+        self._actualizar(registro, "filtrado", relevante=int(bool(relevante)))
+
+    def guardar_resultado(self, registro, resultado, etapa="enriquecido"):
+        """Marca el registro como terminado con la huella de su resultado (el contenido va al JSONL)."""
+        self._actualizar(registro, etapa, resultado=huella_resultado(resultado))
+
+    def _actualizar(self, registro, etapa, **campos):
+        if etapa not in ETAPAS:
+            raise ValueError(f"Etapa desconocida: {etapa}")
+        asignaciones = ", ".join(f"{c} = ?" for c in campos)
+        valores = [etapa, time.time(), *campos.values(), *clave(registro)]
+        with self._lock:
+            self._con.execute(
+                f"UPDATE registros SET etapa = ?, actualizado = ?"
+                f"{', ' + asignaciones if asignaciones else ''} WHERE name = ? AND year = ?",
+                valores)
+            self._con.commit()
+
+    # --- Consultas ---
+    def textos_web(self):
+        """Itera (name, year, texto_web) de los registros ya buscados (para benchmarks y pruebas)."""
+        # Conexión de solo lectura propia: en modo WAL no bloquea a los escritores
+        con = sqlite3.connect(self.ruta)
+        try:
+            yield from con.execute(
+                "SELECT name, year, texto_web FROM registros WHERE texto_web IS NOT NULL AND texto_web != ''")
+        finally:
+            con.close()
+
+    def resumen(self):
+        """Conteo de registros por etapa y terminados."""
+        with self._lock:
+            filas = self._con.execute("""
+                SELECT etapa, COUNT(*), SUM(resultado IS NOT NULL)
+                FROM registros GROUP BY etapa
+            """).fetchall()
+        return {etapa: {"total": total, "terminados": terminados or 0}
+                for etapa, total, terminados in filas}
@@ -0,0 +1,216 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+try:
+    import ahocorasick
+except ImportError:  # sin pyahocorasick se usan las regex por grupo
+    ahocorasick = None
+
+# -------------------------------------------------------------------
+# Patrones de relevancia para los textos web de cada meteorito
+# -------------------------------------------------------------------
+# Compartidos por el filtro texto_contiene_palabras_clave (DatosEnriquesidos)
+# y por el armado de contexto para la IA (ContextoIA).
+
+# ⚡️ Frases clave o contextos importantes
+PATRONES_RELEVANTES = [
+    # --- Impacto físico / ambiental / consecuencias ---
+    r"(impact(ed|ing)?|cause(d)? (a )?(damage|change|shock|event|fire|explosion|impact)|"
+    r"impact (area|zone|site)|impact effect|blast wave|crater formation|"
+    r"released energy|energy of impact|impact velocity|entry velocity|angle of impact|"
+    r"impact magnitude|airburst|collision energy)",
+
+    # --- Historia / origen / descubrimiento ---
+    r"(discovered in|was discovered|originated from|formed in|composition of|parent body|source asteroid|"
+    r"was part of|fragmented from|classified as|recovered in|meteorite classification|"
+    r"scientists (believe|suggest)|studies (show|indicate)|analysis revealed)",
+
+    # --- Datos científicos ---
+    r"(velocity of|speed of entry|temperature reached|pressure impact|shock stage|"
+    r"kinetic energy|mass of the meteorite|density|fusion crust|matrix|chondrules|"
+    r"chemical composition|structure|grain size|surface features|melting point)",
+
+    # --- Importancia o contexto histórico ---
+    r"(news report|witnessed event|documented fall|reported by|observed fall|"
+    r"impact caused|caused panic|injured|destroyed|hit the ground|"
+    r"economic impact|affected the region|changed the landscape)"
+]
+
+# 🚫 Contenido irrelevante (común en tiendas o páginas genéricas)
+PATRONES_IRRELEVANTES = [
+    r"(found in|located in|coordinates|latitude|longitude|"
+    r"copyright|newsletter|subscribe|buy|price|store|shop|review|discount|"
+    r"collection|museum piece|sold by|available for sale)"
+]
+
+NOMBRES_RELEVANTES = ["impacto", "historia", "cientifico", "importancia"]
+NOMBRES_IRRELEVANTES = ["irrelevante"]
+
+# Las frases que acepta cada patrón, escritas una por una (las carga el
+# autómata). Si se cambia un patrón hay que cambiar su lista:
+# tests/test_relevancia.py comprueba que coinciden.
+FRASES_RELEVANTES = [
+    ["impact", "impacted", "impacting",
+     *[f"{verbo} {articulo}{efecto}" for verbo in ("cause", "caused") for articulo in ("", "a ")
+       for efecto in ("damage", "change", "shock", "event", "fire", "explosion", "impact")],
+     "impact area", "impact zone", "impact site", "impact effect", "blast wave", "crater formation",
+     "released energy", "energy of impact", "impact velocity", "entry velocity", "angle of impact",
+     "impact magnitude", "airburst", "collision energy"],
+
+    ["discovered in", "was discovered", "originated from", "formed in", "composition of", "parent body",
+     "source asteroid", "was part of", "fragmented from", "classified as", "recovered in",
+     "meteorite classification", "scientists believe", "scientists suggest", "studies show",
+     "studies indicate", "analysis revealed"],
+
+    ["velocity of", "speed of entry", "temperature reached", "pressure impact", "shock stage",
+     "kinetic energy", "mass of the meteorite", "density", "fusion crust", "matrix", "chondrules",
+     "chemical composition", "structure", "grain size", "surface features", "melting point"],
+
+    ["news report", "witnessed event", "documented fall", "reported by", "observed fall", "impact caused",
+     "caused panic", "injured", "destroyed", "hit the ground", "economic impact", "affected the region",
+     "changed the landscape"],
+]
+
+FRASES_IRRELEVANTES = [
+    ["found in", "located in", "coordinates", "latitude", "longitude", "copyright", "newsletter", "subscribe",
+     "buy", "price", "store", "shop", "review", "discount", "collection", "museum piece", "sold by",
+     "available for sale"],
+]
+
+
+# -------------------------------------------------------------------
+# Clasificador precompilado (una sola pasada por el texto)
+# -------------------------------------------------------------------
+# Los patrones no tienen repeticiones abiertas: cada grupo es una lista
+# finita de frases (FRASES_*), que se cargan en un autómata
+# Aho-Corasick (pyahocorasick) que recorre el texto una sola vez y reporta
+# todas las frases, incluso solapadas ("impact caused" también empieza con
+# "impact"). Cada grupo cuenta las posiciones donde empieza alguna de sus
+# frases, lo mismo que encontraría su regex.
+# Sin pyahocorasick se usan las regex por grupo, compiladas una sola vez.
+# Una única regex combinada con lookahead resultó más lenta que los grupos
+# por separado en el motor de `re`.
+
+MIN_LONGITUD = 100
+MIN_COINCIDENCIAS = 2
+MAX_IRRELEVANTES = 2
+CARACTERES_INICIO = 300
+
+
+@lru_cache(maxsize=4096)
+def _patron_nombre(nombre):
+    """Primer término del nombre y su regex (p. ej. "abadla" para "Abadla 002")."""
+    termino = nombre.split()[0]
+    return termino, re.compile(rf"\b{re.escape(termino)}\b")
+
+
+def _buscar_nombre(texto, termino, patron, fin):
+    """
+    Como patron.search(texto, 0, fin), pero salta con str.find entre las
+    apariciones del término (el \\b inicial impide a `re` buscar el literal).
+    """
+    i = texto.find(termino, 0, fin)
+    while i != -1:
+        m = patron.match(texto, i, fin)
+        if m is not None:
+            return m
+        i = texto.find(termino, i + 1, fin)
+    return None
+
+
+class ClasificadorRelevancia:
+    """
+    Grupos [(nombre, patrón, frases)]: el patrón para el motor regex y las
+    frases (las mismas que acepta el patrón) para el autómata.
+    """
+
+    def __init__(self, relevantes=None, irrelevantes=None, motor="aho-corasick"):
+        relevantes = relevantes or list(zip(NOMBRES_RELEVANTES, PATRONES_RELEVANTES, FRASES_RELEVANTES))
+        irrelevantes = irrelevantes or list(zip(NOMBRES_IRRELEVANTES, PATRONES_IRRELEVANTES, FRASES_IRRELEVANTES))
+        self.relevantes = [nombre for nombre, _, _ in relevantes]
+        self.irrelevantes = [nombre for nombre, _, _ in irrelevantes]
+        self._nombres = self.relevantes + self.irrelevantes
+        self._grupos = [(nombre, re.compile(p)) for nombre, p, _ in relevantes + irrelevantes]
+        self._automata = self._construir_automata(relevantes + irrelevantes) if motor != "regex" else None
+        self.motor = "aho-corasick" if self._automata is not None else "regex"
+
+    @staticmethod
+    def _construir_automata(grupos):
+        if ahocorasick is None:
+            return None
+        expandidos = [(nombre, frases) for nombre, _, frases in grupos]
+        # Dentro de un grupo basta la frase más corta: si "impact" empieza en
+        # una posición, "impacted" no agrega otra. Así cada (grupo, inicio) se
+        # reporta una sola vez. Una frase puede pertenecer a varios grupos.
+        por_frase = {}
+        for i, (_, frases) in enumerate(expandidos):
+            minimas = []
+            for frase in sorted(set(frases), key=len):
+                if not any(frase.startswith(m) for m in minimas):
+                    minimas.append(frase)
+            for frase in minimas:
+                por_frase.setdefault(frase, []).append(i)
+        automata = ahocorasick.Automaton()
+        for frase, grupos_frase in por_frase.items():
+            automata.add_word(frase, tuple(grupos_frase))
+        automata.make_automaton()
+        return automata
+
+    def contar(self, texto):
+        """Ocurrencias por grupo (posiciones de inicio) en `texto`, ya en minúsculas."""
+        conteos = dict.fromkeys(self.relevantes + self.irrelevantes, 0)
+        if self._automata is not None:
+            por_grupo = Counter(chain.from_iterable(grupos for _, grupos in self._automata.iter(texto)))
+            for i, nombre in enumerate(self._nombres):
+                conteos[nombre] = por_grupo[i]
+            return conteos
+        for nombre, patron in self._grupos:
+            m = patron.search(texto)
+            while m is not None:
+                conteos[nombre] += 1
+                m = patron.search(texto, m.start() + 1)
+        return conteos
+
+    def _presencia(self, texto):
+        """Sin autómata: 1 si el grupo aparece (re.search se detiene en la primera), 0 si no."""
+        return {nombre: int(patron.search(texto) is not None) for nombre, patron in self._grupos}
+
+    def evaluar(self, texto, nombre_meteorito=None):
+        """
+        Misma regla que texto_contiene_palabras_clave, con el detalle:
+        {'relevante', 'conteos', 'coincidencias', 'irrelevantes', 'nombre_presente'}.
+        Con el motor regex, 'conteos' solo indica presencia (0/1) por grupo.
+        """
+        if not texto or len(texto.strip()) < MIN_LONGITUD:
+            return {"relevante": False, "conteos": {}, "coincidencias": 0, "irrelevantes": 0,
+                    "nombre_presente": False}
+
+        texto = texto.lower()
+        nombre = (nombre_meteorito or "").lower().strip()
+        conteos = self.contar(texto) if self._automata is not None else self._presencia(texto)
+        irrelevantes = sum(1 for g in self.irrelevantes if conteos[g])
+        coincidencias = sum(1 for g in self.relevantes if conteos[g])
+
+        nombre_presente = False
+        if nombre:
+            termino, patron = _patron_nombre(nombre)
+            m = _buscar_nombre(texto, termino, patron, len(texto))
+            nombre_presente = m is not None
+            # ¿Aparece en los primeros caracteres? (endpos equivale a texto[:300])
+            if ((m is not None and m.end() <= CARACTERES_INICIO)
+                    or _buscar_nombre(texto, termino, patron, CARACTERES_INICIO) is not None):
+                coincidencias += 1
+                nombre_presente = True
+
+        relevante = (irrelevantes < MAX_IRRELEVANTES and coincidencias >= MIN_COINCIDENCIAS
+                     and nombre_presente)
+        return {"relevante": relevante, "conteos": conteos, "coincidencias": coincidencias,
+                "irrelevantes": irrelevantes, "nombre_presente": nombre_presente}
+
+    def es_relevante(self, texto, nombre_meteorito=None):
+        return self.evaluar(texto, nombre_meteorito)["relevante"]
+
+
+clasificador = ClasificadorRelevancia()
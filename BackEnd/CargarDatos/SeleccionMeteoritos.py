@@ -0,0 +1,109 @@
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Selección de meteoritos a procesar (iniciar_procesamiento)
+# -------------------------------------------------------------------
+# A partir de las coincidencias unidas decide cuáles cumplen los criterios
+# automáticos y cuáles están en la lista manual, con máscaras booleanas:
+#   - masa y fotos se evalúan una vez por columna,
+#   - los que no cumplen son el complemento de la máscara (antes se buscaba
+#     cada nombre en toda la columna "name": O(n²)),
+#   - la lista manual se compila en una sola regex de subcadenas.
+# Las listas devueltas son los mismos registros de `coincidencias`, en su orden.
+
+MASA_MINIMA = 4000      # gramos
+CON_FOTOS = True        # con al menos una foto de MetBull también cumple
+ANIO_MINIMO = None      # sin filtro por año
+
+
+@contextmanager
+def medir(tiempos, etapa):
+    """Guarda en tiempos[etapa] los segundos que tarda el bloque."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[etapa] = time.perf_counter() - inicio
+
+
+def resumen_tiempos(tiempos):
+    return " | ".join(f"{etapa} {segundos:.3f}s" for etapa, segundos in tiempos.items())
+
+
+def compilar_nombres(filtros_personales):
+    """
+    Regex única para la lista manual: encuentra cualquiera de los filtros como
+    subcadena del nombre en minúsculas (lo que hacía any(p in nombre.lower())).
+    None si la lista está vacía.
+    """
+    if not filtros_personales:
+        return None
+    palabras = sorted({p.lower() for p in filtros_personales}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in palabras))
+
+
+def _numeros(valores):
+    """Texto o número → float64 (0 donde no es un número)."""
+    return pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def mascara_criterios(coincidencias, masa_minima=MASA_MINIMA, con_fotos=CON_FOTOS, anio_minimo=ANIO_MINIMO,
+                      tiempos=None):
+    """
+    True donde el meteorito cumple: (masa >= masa_minima o tiene fotos) y, si
+    se pide, año >= anio_minimo. masa_minima=None o con_fotos=False desactivan
+    ese criterio.
+    """
+    tiempos = {} if tiempos is None else tiempos
+    cumple = np.zeros(len(coincidencias), dtype=bool)
+
+    if masa_minima is not None:
+        with medir(tiempos, "masa"):
+            cumple |= _numeros([c.get("mass") for c in coincidencias]) >= masa_minima
+
+    if con_fotos:
+        with medir(tiempos, "fotos"):
+            cumple |= np.fromiter(
+                (hasattr(f, "__len__") and len(f) > 0 for f in (c.get("metBull_fotos") for c in coincidencias)),
+                dtype=bool, count=len(coincidencias))
+
+    if anio_minimo is not None:
+        with medir(tiempos, "año"):
+            cumple &= _numeros([c.get("year") for c in coincidencias]) >= anio_minimo
+
+    return cumple
+
+
+def mascara_nombres(coincidencias, patron):
+    """True donde el nombre contiene alguno de los filtros manuales."""
+    if patron is None:
+        return np.zeros(len(coincidencias), dtype=bool)
+    buscar = patron.search
+    return np.fromiter((buscar(str(c.get("name") or "").lower()) is not None for c in coincidencias),
+                       dtype=bool, count=len(coincidencias))
+
+
+def seleccionar(coincidencias, filtros_personales=None, criterios=None):
+    """
+    Separa las coincidencias unidas. Devuelve un dict con:
+      - cumplen / no_cumplen: según los criterios automáticos (kwargs de mascara_criterios),
+      - especiales: los marcados en la lista manual,
+      - tiempos: segundos por paso.
+    """
+    tiempos = {}
+    cumple = mascara_criterios(coincidencias, tiempos=tiempos, **(criterios or {}))
+
+    with medir(tiempos, "separar"):
+        cumplen = [coincidencias[i] for i in np.flatnonzero(cumple)]
+        no_cumplen = [coincidencias[i] for i in np.flatnonzero(~cumple)]
+
+    with medir(tiempos, "manual"):
+        marcados = mascara_nombres(coincidencias, compilar_nombres(filtros_personales))
+        especiales = [coincidencias[i] for i in np.flatnonzero(marcados)]
+
+    return {"cumplen": cumplen, "no_cumplen": no_cumplen, "especiales": especiales, "tiempos": tiempos}
@@ -0,0 +1,318 @@
+import codecs
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+
+# -------------------------------------------------------------------
+# Descarga en streaming + extracción incremental del texto de una página
+# -------------------------------------------------------------------
+# Las búsquedas web solo conservan los primeros miles de caracteres del
+# texto de <p> (o <p>/<article>/<div>/<main> en la búsqueda especial).
+# En lugar de descargar la página entera y pasarla a BeautifulSoup, se lee
+# la respuesta por bloques, se alimenta un HTMLParser incremental y se deja
+# de leer en cuanto el principio del texto final ya no puede cambiar.
+# El resultado es el mismo que:
+#     soup = BeautifulSoup(html, "html.parser")
+#     for tag in soup(excluidas): tag.decompose()
+#     " ".join(t.get_text() for t in soup.find_all(etiquetas))
+# seguido del recorte de espacios y del límite de caracteres.
+
+TAMANO_BLOQUE = 16 * 1024
+MAX_BYTES_PAGINA = 3 * 1024 ** 2          # cuerpos más grandes no se leen
+HILOS_DESCARGA = 32                       # pool compartido por todas las búsquedas en curso
+TIPOS_HTML = ("text/html", "application/xhtml+xml")
+
+EXCLUIDAS_BASICAS = ("script", "style", "noscript")
+EXCLUIDAS_EXTENDIDAS = EXCLUIDAS_BASICAS + ("footer", "header", "nav", "aside")
+
+# Elementos vacíos: BeautifulSoup los cierra al abrirlos
+VACIAS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+          "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+          "image", "isindex", "nextid", "spacer"}
+
+# Cadenas solo de estos espacios se reducen a "\n" o " " (salvo dentro de <pre>/<textarea>)
+ESPACIOS_ASCII = "\x20\x0a\x09\x0c\x0d"
+PRESERVAN_ESPACIOS = {"pre", "textarea"}
+
+_ESPACIOS = re.compile(r"\s+")
+_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+def ajustar_espacios(texto, espacios):
+    """'recortar' → strip(); 'normalizar' → espacios colapsados y strip(); otro valor → sin cambios."""
+    if espacios == "recortar":
+        return texto.strip()
+    if espacios == "normalizar":
+        return _ESPACIOS.sub(" ", texto).strip()
+    return texto
+
+
+class ExtractorTexto(HTMLParser):
+    """
+    Parser incremental: cada elemento de `etiquetas` ocupa un hueco en orden
+    de apertura y acumula el texto de sus descendientes (fuera de `excluidas`).
+    `listo` pasa a True cuando los primeros `limite` caracteres del texto
+    final ya están decididos.
+    """
+
+    def __init__(self, etiquetas=("p",), excluidas=EXCLUIDAS_BASICAS, limite=5000, espacios="recortar"):
+        super().__init__(convert_charrefs=True)
+        self.etiquetas = set(etiquetas)
+        self.excluidas = set(excluidas)
+        self.limite = limite
+        self.espacios = espacios
+        self.huecos = []          # textos por elemento, en orden de apertura
+        self.largos = []
+        self.cerrados = []
+        self.abiertas = []        # pila: (etiqueta, índice de hueco o None, excluida)
+        self.dentro_excluida = 0
+        self.dentro_pre = 0
+        self.datos = []           # texto entre dos etiquetas (una cadena de BeautifulSoup)
+        self.vacias_cerradas = [] # <br> etc. ya cerrados al abrirlos; su </br> posterior se ignora
+        self.primero_abierto = 0  # primer hueco todavía abierto
+        self.largo_cerrado = 0    # caracteres (con separadores) de los huecos ya cerrados antes de él
+        self.proxima_revision = limite
+        self.listo = False
+
+    # --- Eventos del parser ---
+    def handle_starttag(self, tag, attrs):
+        self._volcar()
+        if tag in VACIAS:
+            self.vacias_cerradas.append(tag)
+            return
+        excluida = tag in self.excluidas
+        hueco = None
+        if not self.dentro_excluida and not excluida and tag in self.etiquetas:
+            hueco = len(self.huecos)
+            self.huecos.append([])
+            self.largos.append(0)
+            self.cerrados.append(False)
+        if excluida:
+            self.dentro_excluida += 1
+        if tag in PRESERVAN_ESPACIOS:
+            self.dentro_pre += 1
+        self.abiertas.append((tag, hueco, excluida))
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>: BeautifulSoup lo abre y cierra en el acto, sin esperar un </br>
+        if tag in VACIAS:
+            self._volcar()
+            return
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Como BeautifulSoup: un </br> que sigue a un <br> se descarta sin cortar
+        # la cadena de texto; un </br> suelto solo la corta
+        if tag in self.vacias_cerradas:
+            self.vacias_cerradas.remove(tag)
+            return
+        self._volcar()
+        # Como BeautifulSoup: cierra hasta el último elemento abierto con ese nombre
+        for i in range(len(self.abiertas) - 1, -1, -1):
+            if self.abiertas[i][0] == tag:
+                break
+        else:
+            return
+        while len(self.abiertas) > i:
+            nombre, hueco, excluida = self.abiertas.pop()
+            if excluida:
+                self.dentro_excluida -= 1
+            if nombre in PRESERVAN_ESPACIOS:
+                self.dentro_pre -= 1
+            if hueco is not None:
+                self.cerrados[hueco] = True
+        self._avanzar()
+
+    def handle_data(self, data):
+        if not self.dentro_excluida:
+            self.datos.append(data)
+
+    def handle_comment(self, data):
+        self._volcar()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def close(self):
+        super().close()
+        self._volcar()
+
+    def _volcar(self):
+        if not self.datos:
+            return
+        data = "".join(self.datos)
+        self.datos = []
+        if not data:
+            return
+        if not self.dentro_pre and not data.strip(ESPACIOS_ASCII):
+            data = "\n" if "\n" in data else " "
+        for _, hueco, _ in self.abiertas:
+            if hueco is not None:
+                self.huecos[hueco].append(data)
+                self.largos[hueco] += len(data)
+        self._revisar()
+
+    # --- Prefijo ya decidido del texto final ---
+    def _avanzar(self):
+        while self.primero_abierto < len(self.huecos) and self.cerrados[self.primero_abierto]:
+            self.largo_cerrado += self.largos[self.primero_abierto] + 1
+            self.primero_abierto += 1
+        self._revisar()
+
+    def _prefijo(self):
+        partes = ["".join(h) for h in self.huecos[:self.primero_abierto + 1]]
+        return " ".join(partes)
+
+    def _revisar(self):
+        if self.listo or self.limite is None:
+            return
+        largo = self.largo_cerrado
+        if self.primero_abierto < len(self.huecos):
+            largo += self.largos[self.primero_abierto]
+        if largo < self.proxima_revision:
+            return
+        # Los huecos siguientes solo se agregan detrás: si el prefijo ya da
+        # `limite` caracteres sin contar espacios finales, el recorte es definitivo
+        if len(ajustar_espacios(self._prefijo(), self.espacios).rstrip()) >= self.limite:
+            self.listo = True
+        else:
+            self.proxima_revision = largo + max(self.limite // 4, 1)
+
+    def texto(self):
+        """Texto final (ya recortado a `limite` si lo hay)."""
+        if self.listo:
+            texto = self._prefijo()
+        else:
+            texto = " ".join("".join(h) for h in self.huecos)
+        texto = ajustar_espacios(texto, self.espacios)
+        return texto[:self.limite] if self.limite is not None else texto
+
+
+def extraer_texto(html, etiquetas=("p",), excluidas=EXCLUIDAS_BASICAS, limite=5000, espacios="recortar"):
+    """Versión sin red (HTML ya descargado) del mismo extractor."""
+    extractor = ExtractorTexto(etiquetas, excluidas, limite, espacios)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.texto()
+
+
+def _codificacion(respuesta, primer_bloque):
+    """Charset de Content-Type, si no el de <meta charset>, si no UTF-8."""
+    m = re.search(r"charset=[\"']?([\w-]+)", respuesta.headers.get("Content-Type", ""), re.IGNORECASE)
+    if m is None:
+        m = _CHARSET.search(primer_bloque[:2048])
+        nombre = m.group(1).decode("ascii", "ignore") if m else "utf-8"
+    else:
+        nombre = m.group(1)
+    try:
+        codecs.lookup(nombre)
+    except LookupError:
+        nombre = "utf-8"
+    return nombre
+
+
+def descargar_texto(sesion, url, timeout=10, etiquetas=("p",), excluidas=EXCLUIDAS_BASICAS, limite=5000,
+                    espacios="recortar", headers=None, max_bytes=MAX_BYTES_PAGINA, fin=None):
+    """
+    Descarga `url` en streaming y devuelve (texto, estadísticas).
+    estadísticas = {'bytes': leídos de la red, 'cache': bool, 'motivo': por qué se dejó de leer}
+    motivo: 'completa', 'limite' (texto suficiente), 'tipo' (no es HTML), 'tamano' o 'plazo'
+    (se pasó `fin`, instante de time.monotonic()); con 'tipo', 'tamano' y 'plazo' el texto es "".
+    Los errores de red se propagan igual que con sesion.get().
+    """
+    estadisticas = {"bytes": 0, "cache": False, "motivo": "completa"}
+    if fin is not None:
+        timeout = max(min(timeout, fin - time.monotonic()), 0.1)
+    respuesta = sesion.get(url, timeout=timeout, headers=headers or {"User-Agent": "Mozilla/5.0"}, stream=True)
+    try:
+        estadisticas["cache"] = getattr(respuesta, "from_cache", False)
+        tipo = respuesta.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if tipo and tipo not in TIPOS_HTML:
+            estadisticas["motivo"] = "tipo"
+            return "", estadisticas
+        if int(respuesta.headers.get("Content-Length") or 0) > max_bytes:
+            estadisticas["motivo"] = "tamano"
+            return "", estadisticas
+
+        extractor = ExtractorTexto(etiquetas, excluidas, limite, espacios)
+        decodificador = None
+        leidos = 0
+        cuerpo = []               # solo se conserva mientras la página pueda guardarse entera en caché
+        guardar = getattr(respuesta, "guardar_en_cache", None)
+        for bloque in respuesta.iter_content(TAMANO_BLOQUE):
+            if decodificador is None:
+                decodificador = codecs.getincrementaldecoder(_codificacion(respuesta, bloque))("replace")
+            leidos += len(bloque)
+            if guardar is not None:
+                cuerpo.append(bloque)
+            extractor.feed(decodificador.decode(bloque))
+            if extractor.listo:
+                estadisticas["motivo"] = "limite"
+                break
+            if leidos > max_bytes:
+                estadisticas["motivo"] = "tamano"
+                break
+            if fin is not None and time.monotonic() > fin:
+                estadisticas["motivo"] = "plazo"
+                break
+        else:
+            if decodificador is not None:
+                extractor.feed(decodificador.decode(b"", final=True))
+            extractor.close()
+            if guardar is not None and respuesta.status_code == 200:
+                guardar(b"".join(cuerpo))
+
+        # Bytes que llegaron por la red (comprimidos si hubo gzip); 0 si vino de caché
+        if not estadisticas["cache"]:
+            tell = getattr(respuesta.raw, "tell", None)
+            estadisticas["bytes"] = tell() if tell is not None else leidos
+        if estadisticas["motivo"] in ("tamano", "plazo"):
+            return "", estadisticas
+        return extractor.texto(), estadisticas
+    finally:
+        respuesta.close()
+
+
+# -------------------------------------------------------------------
+# Varias páginas a la vez con un plazo total
+# -------------------------------------------------------------------
+# Los resultados de una búsqueda se descargan en paralelo en un pool de
+# hilos compartido; pasado el plazo se devuelve lo que haya terminado
+# (las descargas rezagadas ven `fin` y cortan la lectura).
+
+_pool_descargas = None
+_lock_pool = threading.Lock()
+
+
+def pool_descargas():
+    """Pool de hilos único para las descargas de todas las búsquedas."""
+    global _pool_descargas
+    with _lock_pool:
+        if _pool_descargas is None:
+            _pool_descargas = ThreadPoolExecutor(max_workers=HILOS_DESCARGA, thread_name_prefix="descarga")
+        return _pool_descargas
+
+
+def descargar_textos(sesion, urls, plazo=None, **parametros):
+    """
+    Descarga `urls` en paralelo y devuelve [(texto, estadísticas)] en el mismo
+    orden. Las que no terminan en `plazo` segundos quedan con motivo 'plazo'
+    y las que fallan con motivo 'error' (la excepción en estadísticas['error']).
+    """
+    fin = time.monotonic() + plazo if plazo is not None else None
+    futuros = [pool_descargas().submit(descargar_texto, sesion, url, fin=fin, **parametros) for url in urls]
+    wait(futuros, timeout=plazo)
+    resultados = []
+    for futuro in futuros:
+        # Un timeout recortado al plazo también cuenta como 'plazo'
+        if not futuro.done() or (futuro.exception() is not None and fin is not None
+                                 and time.monotonic() >= fin):
+            futuro.cancel()
+            resultados.append(("", {"bytes": 0, "cache": False, "motivo": "plazo"}))
+        elif futuro.exception() is not None:
+            resultados.append(("", {"bytes": 0, "cache": False, "motivo": "error", "error": futuro.exception()}))
+        else:
+            resultados.append(futuro.result())
+    return resultados
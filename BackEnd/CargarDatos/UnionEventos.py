@@ -0,0 +1,238 @@
+from array import array
+import math
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Índice espacial de eventos NASA (CNEOS) para la unión con MetBull
+# -------------------------------------------------------------------
+
+RADIO_GRADOS = 0.5   # distancia máxima (en grados) para considerar coincidencia
+VENTANA_ANIOS = 1    # diferencia máxima de años entre meteorito y evento
+RADIO_KM = 55.6      # equivalente aproximado de 0.5° sobre un círculo máximo
+RADIO_TIERRA_KM = 6371.0
+
+# CNEOS publica lat/lon como magnitudes sin signo; el hemisferio va en
+# las columnas lat-dir ('N'/'S') y lon-dir ('E'/'W'). MetBull ya trae signo.
+DIRECCIONES_NEGATIVAS = ("S", "W")
+
+
+def con_signo(valor, direccion):
+    """Coordenada CNEOS con el signo de su hemisferio (sin dirección queda igual)."""
+    return -valor if str(direccion or "").strip().upper() in DIRECCIONES_NEGATIVAS else valor
+
+
+def _en_rango(lat, lon):
+    """Coordenadas posibles: |lat| <= 90 y |lon| <= 180 (descarta NaN, inf y basura como 1e308)."""
+    return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
+
+
+def _celda(valor):
+    """Índice de la celda de la rejilla (de RADIO_GRADOS de lado) para una coordenada."""
+    return math.floor(valor / RADIO_GRADOS)
+
+
+class IndiceEventos:
+    """
+    Rejilla lat/lon agrupada por año con los eventos NASA ya convertidos a número.
+    Las coordenadas y los años se parsean una sola vez; cada meteorito solo
+    compara contra los eventos de las celdas vecinas dentro de ±VENTANA_ANIOS.
+    """
+
+    def __init__(self, eventos):
+        self.eventos = eventos
+        self.lat = array("d")
+        self.lon = array("d")
+        self.anio = array("q")
+        self.celdas = {}
+
+        for idx, e in enumerate(eventos):
+            try:
+                lat = con_signo(float(e["lat"]), e.get("lat-dir"))
+                lon = con_signo(float(e["lon"]), e.get("lon-dir"))
+                anio = int(e["date"][:4])
+                valido = _en_rango(lat, lon)
+            except (ValueError, TypeError):
+                lat = lon = math.nan
+                anio = 0
+                valido = False
+            self.lat.append(lat)
+            self.lon.append(lon)
+            self.anio.append(anio)
+
+            # Eventos sin coordenadas válidas o sin año nunca pueden coincidir
+            if not valido:
+                continue
+            self.celdas.setdefault((anio, _celda(lat), _celda(lon)), []).append(idx)
+
+    def candidatos(self, lat, lon, anio):
+        """Índices (en orden original) de los eventos en la ventana espacial y temporal."""
+        fila, columna = _celda(lat), _celda(lon)
+        encontrados = []
+        for a in range(anio - VENTANA_ANIOS, anio + VENTANA_ANIOS + 1):
+            for f in (fila - 1, fila, fila + 1):
+                for c in (columna - 1, columna, columna + 1):
+                    encontrados.extend(self.celdas.get((a, f, c), ()))
+        encontrados.sort()
+        return encontrados
+
+    def mas_cercano(self, meteorito):
+        """
+        Devuelve (idx, evento) del evento más cercano que cumple distancia < RADIO_GRADOS
+        y |año| <= VENTANA_ANIOS, o (None, None). En empate gana el de menor índice,
+        igual que el recorrido secuencial original.
+        """
+        try:
+            lat = float(meteorito["coordinadesLat"])
+            lon = float(meteorito["coordinadesLon"])
+            anio = int(meteorito["Year"])
+        except (ValueError, TypeError):
+            return None, None
+        if not _en_rango(lat, lon):
+            return None, None
+
+        match_idx = None
+        min_distancia = float("inf")
+        for idx in self.candidatos(lat, lon, anio):
+            distancia = ((self.lat[idx] - lat) ** 2 + (self.lon[idx] - lon) ** 2) ** 0.5
+            if distancia < RADIO_GRADOS and distancia < min_distancia:
+                min_distancia = distancia
+                match_idx = idx
+
+        if match_idx is None:
+            return None, None
+        return match_idx, self.eventos[match_idx]
+
+
+# -------------------------------------------------------------------
+# Unión vectorizada (NumPy) con métrica intercambiable
+# -------------------------------------------------------------------
+
+def distancia_grados(lat1, lon1, lat2, lon2):
+    """Distancia euclídea en grados (criterio original de unir_datos)."""
+    return np.power((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2, 0.5)
+
+
+def distancia_haversine(lat1, lon1, lat2, lon2):
+    """Distancia de círculo máximo en km; correcta cerca de los polos y del antimeridiano."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# métrica → (función de distancia, umbral de coincidencia)
+METRICAS = {
+    "grados": (distancia_grados, RADIO_GRADOS),
+    "haversine": (distancia_haversine, RADIO_KM),
+}
+
+
+def _a_float(serie):
+    """Convierte una columna de texto a float64 (NaN si no es numérica)."""
+    return pd.to_numeric(serie, errors="coerce").astype("float64").to_numpy()
+
+
+def _a_anio(serie):
+    """
+    Convierte una columna a año entero con la misma regla que int(): solo enteros
+    escritos como tales ("1999" sí, "1999.0" no). Devuelve (años, válidos).
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        valores = serie.to_numpy(dtype="float64")
+        validos = np.isfinite(valores)
+        anios = np.zeros(len(valores), dtype="int64")
+        anios[validos] = np.trunc(valores[validos]).astype("int64")
+        return anios, validos
+
+    texto = serie.astype(str).str.strip()
+    validos = texto.str.fullmatch(r"[+-]?\d+").fillna(False).to_numpy(dtype=bool)
+    anios = np.zeros(len(texto), dtype="int64")
+    anios[validos] = texto[validos].astype("int64").to_numpy()
+    return anios, validos
+
+
+def _signos(df, columna):
+    """-1.0 donde la dirección es S/W, 1.0 en el resto (o si no hay columna de dirección)."""
+    if columna not in df:
+        return np.ones(len(df))
+    negativa = df[columna].fillna("").astype(str).str.strip().str.upper().isin(DIRECCIONES_NEGATIVAS)
+    return np.where(negativa.to_numpy(dtype=bool), -1.0, 1.0)
+
+
+def _coordenadas_en_rango(lat, lon):
+    """Máscara de _en_rango por filas (NaN queda fuera)."""
+    return (np.abs(lat) <= 90.0) & (np.abs(lon) <= 180.0)
+
+
+def columnas_eventos(eventos):
+    """Columnas float64 lat/lon (con signo) y año de los eventos NASA (lista de dicts o DataFrame)."""
+    df = eventos if isinstance(eventos, pd.DataFrame) else pd.DataFrame(list(eventos))
+    if df.empty:
+        return np.empty(0), np.empty(0), np.empty(0, dtype="int64"), np.empty(0, dtype=bool)
+    lat = _a_float(df["lat"]) * _signos(df, "lat-dir")
+    lon = _a_float(df["lon"]) * _signos(df, "lon-dir")
+    anio, validos = _a_anio(df["date"].fillna("").astype(str).str[:4])
+    validos = validos & _coordenadas_en_rango(lat, lon)
+    return lat, lon, anio, validos
+
+
+def columnas_meteoritos(meteoritos):
+    """Columnas float64 lat/lon y año de los meteoritos MetBull (lista de dicts o DataFrame)."""
+    df = meteoritos if isinstance(meteoritos, pd.DataFrame) else pd.DataFrame(list(meteoritos))
+    if df.empty:
+        return np.empty(0), np.empty(0), np.empty(0, dtype="int64"), np.empty(0, dtype=bool)
+    lat = _a_float(df["coordinadesLat"])
+    lon = _a_float(df["coordinadesLon"])
+    anio, validos = _a_anio(df["Year"].fillna(""))
+    validos = validos & _coordenadas_en_rango(lat, lon)
+    return lat, lon, anio, validos
+
+
+def emparejar_vectorizado(meteoritos, eventos, metrica="grados", bloque=4096):
+    """
+    Para cada meteorito devuelve el índice del evento más cercano dentro del umbral
+    de la métrica y de ±VENTANA_ANIOS, o -1 si no hay ninguno.
+
+    Los meteoritos se agrupan por año; cada grupo solo se compara (por bloques y con
+    broadcasting) contra los eventos de su ventana de años. En empate gana el evento
+    de menor índice, igual que el recorrido secuencial.
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida: {metrica} (usa {', '.join(METRICAS)})")
+    distancia, umbral = METRICAS[metrica]
+
+    m_lat, m_lon, m_anio, m_validos = columnas_meteoritos(meteoritos)
+    e_lat, e_lon, e_anio, e_validos = columnas_eventos(eventos)
+
+    resultado = np.full(len(m_lat), -1, dtype="int64")
+
+    # Eventos válidos ordenados por año (y por índice original dentro de cada año)
+    e_idx = np.flatnonzero(e_validos)
+    e_idx = e_idx[np.argsort(e_anio[e_idx], kind="stable")]
+    e_anios_ord = e_anio[e_idx]
+
+    m_idx = np.flatnonzero(m_validos)
+    m_idx = m_idx[np.argsort(m_anio[m_idx], kind="stable")]
+    anios, inicios = np.unique(m_anio[m_idx], return_index=True)
+    fines = np.append(inicios[1:], len(m_idx))
+
+    for anio, ini, fin in zip(anios, inicios, fines):
+        lo = np.searchsorted(e_anios_ord, anio - VENTANA_ANIOS, side="left")
+        hi = np.searchsorted(e_anios_ord, anio + VENTANA_ANIOS, side="right")
+        if lo == hi:
+            continue
+        candidatos = np.sort(e_idx[lo:hi])   # orden original → desempate por índice
+        c_lat = e_lat[candidatos][np.newaxis, :]
+        c_lon = e_lon[candidatos][np.newaxis, :]
+
+        for b in range(ini, fin, bloque):
+            filas = m_idx[b:min(b + bloque, fin)]
+            d = distancia(m_lat[filas][:, np.newaxis], m_lon[filas][:, np.newaxis], c_lat, c_lon)
+            d = np.where(d < umbral, d, np.inf)
+            mejor = np.argmin(d, axis=1)
+            hay = np.isfinite(d[np.arange(len(filas)), mejor])
+            resultado[filas[hay]] = candidatos[mejor[hay]]
+
+    return resultado
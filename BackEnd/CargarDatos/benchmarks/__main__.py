@@ -0,0 +1,34 @@
+import argparse
+
+from benchmarks import columnar, ia, limpieza, parseo, relevancia, seleccion, union, web
+
+# -------------------------------------------------------------------
+# Benchmarks del pipeline CargarDatos (desde BackEnd/CargarDatos)
+# Uso: python -m benchmarks union --tamanos 10000 70000 300000
+#      python -m benchmarks parseo --desde-cache
+#      python -m benchmarks ia --concurrencia 4
+#      python -m benchmarks contexto --ia
+#      python -m benchmarks relevancia --textos 2000
+#      python -m benchmarks descarga --especial
+#      python -m benchmarks latencia --plazo 8
+#      python -m benchmarks busquedas
+#      python -m benchmarks columnar --filas 50000
+#      python -m benchmarks limpieza --filas 20000
+#      python -m benchmarks bloques --filas 50000 --bloque 5000
+#      python -m benchmarks parsers --casos 50000
+#      python -m benchmarks seleccion --tamanos 5000 20000 70000
+#      python -m benchmarks registros --tamanos 70000 200000
+# Cada área registra sus subcomandos; las implementaciones anteriores con
+# las que se comparan están en tests/referencias.py.
+# -------------------------------------------------------------------
+
+AREAS = (union, parseo, ia, relevancia, web, columnar, limpieza, seleccion)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline CargarDatos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    for area in AREAS:
+        area.registrar(sub)
+
+    args = parser.parse_args()
+    args.correr(args)
@@ -0,0 +1,80 @@
+import os
+
+import pandas as pd
+
+from benchmarks.comun import cronometrar, prelimpieza_sintetica
+
+# -------------------------------------------------------------------
+# Intercambio entre etapas: CSV vs Parquet vs Arrow IPC
+# -------------------------------------------------------------------
+
+def bench_columnar(n, repeticiones):
+    import tempfile
+    import AlmacenColumnar as ac
+
+    if not ac.disponible():
+        print("⚠️ pyarrow no está instalado: las etapas siguen usando CSV")
+        return
+
+    pa = ac.pa
+    df = prelimpieza_sintetica(n)
+    anidadas = [c for c, t in ac.COLUMNAS_PRELIMPIEZA.items() if t in ac.ANIDADOS]
+    podadas = ["Name", "Year", "Mass", "geography"]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        base = os.path.join(directorio, "meteoritos_Metbull_PreLimpieza")
+        print(f"🧪 {n} filas sintéticas de PreLimpieza")
+        _, t = cronometrar(df.to_csv, base + ".csv", index=False, encoding="utf-8")
+        print(f"  escribir CSV    : {t:7.3f}s | {os.path.getsize(base + '.csv') / 1e6:7.1f} MB")
+        for formato in ("parquet", "arrow"):
+            _, t = cronometrar(ac.guardar_tabla, df, base, ac.COLUMNAS_PRELIMPIEZA, formato=formato, csv=False)
+            ruta = base + ac.FORMATOS[formato]
+            print(f"  escribir {formato:7s}: {t:7.3f}s | {os.path.getsize(ruta) / 1e6:7.1f} MB")
+
+        def leer_csv(columnas):
+            # Como crear_csv_limpio_separado: CSV + literal_eval de los dicts
+            leido = pd.read_csv(base + ".csv", low_memory=False,
+                                usecols=None if columnas is None else (lambda c: c in columnas))
+            for c in anidadas:
+                if c in leido.columns:
+                    leido[c] = [ac._dict(v) for v in leido[c]]
+            return leido
+
+        lecturas = [
+            ("CSV + literal_eval", leer_csv),
+            ("Parquet → pandas", lambda cols: ac.a_dataframe(ac.leer_tabla_arrow(base + ".parquet", cols))),
+            ("Arrow mmap → pandas", lambda cols: ac.a_dataframe(ac.leer_tabla_arrow(base + ".arrow", cols))),
+            ("Parquet (tabla)", lambda cols: ac.leer_tabla_arrow(base + ".parquet", cols)),
+            ("Arrow mmap (tabla)", lambda cols: ac.leer_tabla_arrow(base + ".arrow", cols)),
+        ]
+        for etiqueta, columnas in (("todas las columnas", None), (f"solo {', '.join(podadas)}", podadas)):
+            print(f"\n  Lectura — {etiqueta}")
+            for nombre, leer in lecturas:
+                mejor = float("inf")
+                for _ in range(repeticiones):
+                    antes = pa.total_allocated_bytes()
+                    resultado, t = cronometrar(leer, columnas)
+                    asignado = pa.total_allocated_bytes() - antes
+                    mejor = min(mejor, t)
+                    del resultado
+                memoria = f" | Arrow asignó {asignado / 1e6:7.1f} MB" if "tabla" in nombre else ""
+                print(f"    {nombre:20s}: {mejor * 1000:8.1f} ms{memoria}")
+
+        # Mismo contenido en CSV y en columnar (anidadas normalizadas igual que al guardar)
+        csv = leer_csv(None)
+        columnar = ac.a_dataframe(ac.leer_tabla_arrow(base + ".parquet"))
+        planas = [c for c in df.columns if c not in anidadas]
+        distintas = sum(
+            1 for c in anidadas for a, b in zip(csv[c], columnar[c])
+            if ac._anidado(ac.COLUMNAS_PRELIMPIEZA[c], a) != ac._anidado(ac.COLUMNAS_PRELIMPIEZA[c], b))
+        texto_csv = pd.read_csv(base + ".csv", dtype=str, usecols=planas,      # "n/a" es texto, no NaN
+                                keep_default_na=False).to_dict(orient="records")
+        distintas += sum(a != b for a, b in zip(texto_csv, ac.registros_texto(columnar[planas])))
+        print(f"\n{'✅' if not distintas else '❌'} Valores distintos entre CSV y Parquet: {distintas}")
+
+
+def registrar(sub):
+    p = sub.add_parser("columnar", help="Intercambio entre etapas: CSV vs Parquet vs Arrow IPC")
+    p.add_argument("--filas", type=int, default=50_000)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p.set_defaults(correr=lambda a: bench_columnar(a.filas, a.repeticiones))
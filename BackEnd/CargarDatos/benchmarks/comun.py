@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Utilidades compartidas por los benchmarks
+# -------------------------------------------------------------------
+
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+data_dir = os.path.join(script_dir, "data")
+
+FILTROS_PERSONALES = ["Canyon Diablo", "Ali", "Willamette", "Winchcombe", "Fukang", "Hoba", "Gancedo", "El Chaco",
+                      "Ahnighito", "Bacubirito", "Tunguska", "Cheliábinsk", "Barringer", "Chicxulub",
+                      "Sikhote-Alin", "Allende", "Mbozi", "Bacubirito", "Armanty", "Ahnighito"]
+
+
+def cronometrar(funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def leer_eventos():
+    """Eventos CNEOS de data/meteoritos_NasaCNEOS.csv como dicts de texto."""
+    ruta = os.path.join(data_dir, "meteoritos_NasaCNEOS.csv")
+    return pd.read_csv(ruta, dtype=str).fillna("").to_dict(orient="records")
+
+
+def rss_mb():
+    """Pico de memoria residente de este proceso (MB)."""
+    import resource
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1e6 if sys.platform == "darwin" else pico / 1024    # bytes en macOS, KB en Linux
+
+
+def medir_memoria_disponible():
+    """El pico de memoria se mide con el módulo resource (solo Linux/macOS)."""
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        print("⚠️ El pico de memoria se mide con el módulo resource (Linux/macOS)")
+        return False
+    return True
+
+
+def en_proceso_nuevo(funcion, *args):
+    """
+    Ejecuta funcion(*args) en un proceso "spawn", que no hereda la memoria de
+    este. En Linux ru_maxrss sobrevive al exec: quien llama no debe haber
+    cargado los datos grandes.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as proceso:
+        return proceso.submit(funcion, *args).result()
+
+
+def prelimpieza_sintetica(n, semilla=11):
+    """
+    n filas con el formato de meteoritos_Metbull_PreLimpieza (listado + ficha
+    de detalle con dicts anidados), incluidos los casos raros del catálogo:
+    años con texto, masas sin unidad o ilegibles, coordenadas DMS/decimales.
+    """
+    rnd = random.Random(semilla)
+    masas = ["{:.1f} g", "{:.2f} kg", "{:.0f} mg", "{:.1f} t", "{:.1f}", "{:.1f} ton", "{:,.1f} g"]
+    anios = ["{}", "{}", "{}", "{} or 1999", "({})", "ca. {}", "", "{}s"]
+
+    def dms(valor, positivo, negativo):
+        g = abs(valor)
+        grados, minutos = int(g), int(g % 1 * 60)
+        segundos = round((g * 3600) % 60, 1)
+        return f"{grados}° {minutos}' {segundos}\"{positivo if valor >= 0 else negativo}"
+
+    def coordenadas(lat, lon):
+        formato = rnd.randrange(6)
+        if formato == 0:
+            return f"{dms(lat, 'N', 'S')}, {dms(lon, 'E', 'W')}"
+        if formato == 1:
+            return f"({lat:.5f}, {lon:.5f})"
+        if formato == 2:
+            return f"{abs(lat):.2f} {'N' if lat >= 0 else 'S'} {abs(lon):.2f} {'E' if lon >= 0 else 'W'}"
+        if formato == 3:
+            return f"{lat:.3f}°N, {lon:.3f}°E"
+        return rnd.choice([None, "", "Unknown"]) if formato == 4 else f"{lat:.2f},{lon:.2f}"
+
+    parrafo = ("The meteorite was found by local residents after a bright fireball was observed. "
+               "Fragments were recovered over several weeks and distributed to museums. ")
+    filas = []
+    for i in range(n):
+        lat, lon = rnd.uniform(-90, 90), rnd.uniform(-180, 180)
+        anio = rnd.randint(800, 2024)
+        masa = rnd.choice(masas).format(rnd.uniform(0.1, 50_000)) if rnd.random() > 0.05 else rnd.choice(["", "n/a"])
+        fotos = rnd.randrange(4)
+        fila = {
+            "Name": f"Sintetico {i}" + ("**" if rnd.random() < 0.1 else ""),
+            "Status": rnd.choice(["Official", "Provisional", None]),
+            "Fall": rnd.choice(["Found", "Fell"]),
+            "Year": rnd.choice(anios).format(anio),
+            "Place": rnd.choice(["Sahara", "Antarctica", "Oman", None]),
+            "Type": rnd.choice(["L6", "H5", "Iron, IIAB", "CM2"]),
+            "Mass": masa,
+            "Country": rnd.choice(["Algeria", "Chile", "Oman", "Argentina"]),
+            "basic_info": {
+                "Name": f"Sintetico {i}",
+                "Abbreviation": f"Sin{i}" if rnd.random() < 0.5 else None,
+                "Observed fall": rnd.choice(["Yes", "No"]),
+                "Year found" if rnd.random() < 0.7 else "Year fell": rnd.choice(anios).format(anio),
+                "Country": "Chile",
+            } if rnd.random() > 0.05 else {},
+            "classification": {"Recommended": rnd.choice(["L6", "H5", "Iron, IIAB"])},
+            "geography": {k: v for k, v in (("Catalogue of Meteorites", coordenadas(lat, lon)),
+                                             ("Recommended", coordenadas(lat, lon))) if v is not None},
+            "Data_MB109": {"Latitude": f"{lat:.4f}", "Longitude": f"{lon:.4f}", "Mass (g)": "120",
+                           "Class": "L6", "Comments": "Submitted by a synthetic classifier"}
+            if rnd.random() < 0.3 else {},
+            "historia": parrafo * rnd.randint(1, 12) if rnd.random() > 0.2 else "No hay información",
+            "importancia": "No hay información",
+            "descubrimiento": "No hay información",
+            "impacto": "No hay información",
+            "references": "Meteoritical Bulletin, no. 109, MAPS 55. " * rnd.randint(1, 6),
+            "images": {"fotos": [{"autor": f"Autor {j}", "referencia": "MetBull",
+                                  "foto_original": f"https://www.lpi.usra.edu/meteor/photo/{i}_{j}.jpg"}
+                                 for j in range(fotos)] or ["No hay información"]},
+        }
+        fila["Mass_grams"] = None
+        filas.append(fila)
+    return pd.DataFrame(filas)
@@ -0,0 +1,174 @@
+import time
+
+from benchmarks.comun import cronometrar
+
+# -------------------------------------------------------------------
+# Planificador de inferencia contra un servidor Ollama falso
+# -------------------------------------------------------------------
+
+def servidor_ollama_falso(tokens=40, segundos_por_token=0.005):
+    """
+    Servidor local que imita POST /api/chat de Ollama (NDJSON en streaming).
+    Devuelve (host, estado) donde estado registra el orden de llegada y el
+    máximo de peticiones simultáneas.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    estado = {"orden": [], "en_curso": 0, "max_en_curso": 0}
+    lock = threading.Lock()
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            cuerpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = cuerpo["messages"][-1]["content"]
+            with lock:
+                estado["orden"].append(prompt)
+                estado["en_curso"] += 1
+                estado["max_en_curso"] = max(estado["max_en_curso"], estado["en_curso"])
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def enviar(obj):
+                    linea = (json.dumps(obj) + "\n").encode()
+                    self.wfile.write(f"{len(linea):x}\r\n".encode() + linea + b"\r\n")
+                    self.wfile.flush()
+
+                inicio = time.perf_counter_ns()
+                for i in range(tokens):
+                    time.sleep(segundos_por_token)
+                    enviar({"model": cuerpo["model"], "message": {"role": "assistant", "content": f"t{i} "},
+                            "done": False})
+                duracion = time.perf_counter_ns() - inicio
+                enviar({"model": cuerpo["model"], "message": {"role": "assistant", "content": ""},
+                        "done": True, "done_reason": "stop", "prompt_eval_count": len(prompt.split()),
+                        "prompt_eval_duration": 1, "eval_count": tokens, "eval_duration": duracion,
+                        "total_duration": duracion})
+                self.wfile.write(b"0\r\n\r\n")
+            finally:
+                with lock:
+                    estado["en_curso"] -= 1
+
+        def do_GET(self):  # /api/tags: modelos instalados (para el digest de la caché)
+            cuerpo = json.dumps({"models": [{"name": "llama3:latest", "model": "llama3:latest",
+                                             "digest": "0" * 64, "size": 0}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_port}", estado
+
+
+def bench_ia(peticiones, concurrencia, tokens, segundos_por_token, host):
+    from PlanificadorIA import PRIORIDAD_ESPECIAL, PRIORIDAD_NORMAL, PlanificadorIA
+
+    estado = None
+    if not host:
+        host, estado = servidor_ollama_falso(tokens, segundos_por_token)
+        print(f"🧪 Servidor Ollama falso en {host} ({tokens} tokens, {segundos_por_token}s/token)")
+
+    planificador = PlanificadorIA(concurrencia=concurrencia, host=host)
+    # Normales primero en el tiempo; los especiales deben adelantarlos en la cola
+    prompts = [(f"normal {i}", PRIORIDAD_NORMAL) for i in range(peticiones)]
+    prompts += [(f"especial {i}", PRIORIDAD_ESPECIAL) for i in range(max(1, peticiones // 4))]
+
+    inicio = time.perf_counter()
+    futuros = [planificador.enviar(p, prioridad, etiqueta=p) for p, prioridad in prompts]
+    respuestas = [f.result()[0] for f in futuros]
+    total = time.perf_counter() - inicio
+    planificador.cerrar()
+
+    resumen = planificador.resumen()
+    print(f"\n📊 {len(prompts)} peticiones en {total:.2f}s — {resumen}")
+    print(f"  respuestas no vacías: {sum(bool(r) for r in respuestas)}/{len(respuestas)}")
+    if estado is not None:
+        orden = estado["orden"]
+        # Como mucho `concurrencia` normales pueden haber salido antes que el último especial
+        # (los que ya estaban en curso cuando se encolaron los especiales)
+        ultimo_especial = max(i for i, p in enumerate(orden) if p.startswith("especial"))
+        normales_antes = sum(p.startswith("normal") for p in orden[:ultimo_especial])
+        print(f"  máx. simultáneas en el servidor: {estado['max_en_curso']} (techo {concurrencia})"
+              f" {'✅' if estado['max_en_curso'] <= concurrencia else '❌'}")
+        print(f"  especiales antes que los normales pendientes: "
+              f"{'✅' if normales_antes <= concurrencia else '❌'}")
+
+
+# -------------------------------------------------------------------
+# Contexto para la IA: recorte fijo vs presupuesto de tokens
+# -------------------------------------------------------------------
+
+def bench_contexto(limite, presupuesto, ia, host):
+    from ContextoIA import construir_contexto, estimar_tokens
+    from RegistroTrabajo import RegistroTrabajo
+
+    textos = []
+    for name, year, texto in RegistroTrabajo().textos_web():
+        textos.append((name, texto))
+        if limite and len(textos) >= limite:
+            break
+    if not textos:
+        print("⚠️ El registro de trabajo no tiene textos web (ejecutar antes DatosEnriquesidos.py)")
+        return
+    print(f"📄 {len(textos)} textos web del registro de trabajo, presupuesto {presupuesto} tokens")
+
+    antes = despues = 0
+    t_total = 0.0
+    for name, texto in textos:
+        (_, e), t = cronometrar(construir_contexto, texto, name, presupuesto)
+        antes += estimar_tokens(texto[:15000])
+        despues += e["tokens_despues"]
+        t_total += t
+    print(f"  tokens estimados (recorte [:15000]): {antes / len(textos):8.0f} por meteorito")
+    print(f"  tokens estimados (presupuesto):      {despues / len(textos):8.0f} por meteorito"
+          f" — {t_total / len(textos) * 1000:.1f} ms de compactación")
+
+    if not ia:
+        return
+
+    # Inferencia real (o servidor falso) sin caché, para medir tokens de prompt y latencia
+    import PlanificadorIA
+    import DatosEnriquesidos
+
+    if not host:
+        host, _ = servidor_ollama_falso()
+    for etiqueta, presupuesto_tokens in (("recorte [:15000]", None), ("presupuesto", presupuesto)):
+        planificador = PlanificadorIA.PlanificadorIA(host=host)
+        PlanificadorIA._planificador = planificador
+        inicio = time.perf_counter()
+        for name, texto in textos:
+            DatosEnriquesidos.obtener_datos_con_ia_especial({"name": name}, texto, presupuesto_tokens=presupuesto_tokens)
+        total = time.perf_counter() - inicio
+        planificador.cerrar()
+        r = planificador.resumen()
+        print(f"  🤖 {etiqueta:17s}: {r['tokens_prompt'] / len(textos):8.0f} tokens de prompt,"
+              f" {total / len(textos):6.2f}s por meteorito")
+
+
+def registrar(sub):
+    p = sub.add_parser("ia", help="Planificador de inferencia (servidor Ollama falso o real)")
+    p.add_argument("--peticiones", type=int, default=40)
+    p.add_argument("--concurrencia", type=int, default=4, help="Igual que OLLAMA_NUM_PARALLEL")
+    p.add_argument("--tokens", type=int, default=40)
+    p.add_argument("--segundos-por-token", type=float, default=0.005)
+    p.add_argument("--host", help="Servidor Ollama real (por defecto se levanta uno falso)")
+    p.set_defaults(correr=lambda a: bench_ia(a.peticiones, a.concurrencia, a.tokens, a.segundos_por_token, a.host))
+
+    p = sub.add_parser("contexto", help="Tokens de prompt y latencia: recorte fijo vs presupuesto")
+    p.add_argument("--limite", type=int, default=50)
+    p.add_argument("--presupuesto", type=int, default=1500)
+    p.add_argument("--ia", action="store_true", help="Medir también la inferencia")
+    p.add_argument("--host", help="Servidor Ollama real (por defecto uno falso)")
+    p.set_defaults(correr=lambda a: bench_contexto(a.limite, a.presupuesto, a.ia, a.host))
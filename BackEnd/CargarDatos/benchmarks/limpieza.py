@@ -0,0 +1,197 @@
+import os
+import random
+import time
+
+import pandas as pd
+
+from benchmarks.comun import (cronometrar, en_proceso_nuevo, medir_memoria_disponible, prelimpieza_sintetica,
+                              rss_mb)
+from tests.referencias import limpiar_original, normalizar_masa_original, parse_coordinates_original, \
+    parse_year_original
+
+# -------------------------------------------------------------------
+# Limpieza MetBull: iterrows + literal_eval vs vectorizada
+# -------------------------------------------------------------------
+
+def bench_limpieza(n, repeticiones, entrada):
+    import filecmp
+    import shutil
+    import tempfile
+    import AlmacenColumnar as ac
+    from LimpiezaMetbull import limpiar_metbull
+
+    with tempfile.TemporaryDirectory() as directorio:
+        base = os.path.join(directorio, "meteoritos_Metbull_PreLimpieza")
+        if entrada:
+            shutil.copy(entrada, base + ".csv")
+        else:
+            prelimpieza_sintetica(n).to_csv(base + ".csv", index=False, encoding="utf-8")
+        filas = len(pd.read_csv(base + ".csv", usecols=[0], low_memory=False))
+        print(f"🧪 Limpieza de {filas} filas de PreLimpieza ({os.path.getsize(base + '.csv') / 1e6:.1f} MB de CSV)")
+
+        salida_original = os.path.join(directorio, "original.csv")
+        salida_vectorizada = os.path.join(directorio, "meteoritos_Metbull")
+
+        def original():
+            leido, t_leer = cronometrar(pd.read_csv, base + ".csv", low_memory=False)
+            limpio, t_limpiar = cronometrar(limpiar_original, leido)
+            _, t_escribir = cronometrar(limpio.to_csv, salida_original, index=False, encoding="utf-8")
+            return t_leer, t_limpiar, t_escribir
+
+        def vectorizada():
+            leido, t_leer = cronometrar(ac.leer_tabla, base)
+            limpio, t_limpiar = cronometrar(limpiar_metbull, leido)
+            _, t_escribir = cronometrar(ac.guardar_tabla, limpio, salida_vectorizada, ac.COLUMNAS_METBULL)
+            return t_leer, t_limpiar, t_escribir
+
+        tiempos = {}
+        for nombre, correr in (("iterrows + literal_eval", original), ("vectorizada", vectorizada)):
+            tiempos[nombre] = min((correr() for _ in range(repeticiones)), key=sum)
+            t_leer, t_limpiar, t_escribir = tiempos[nombre]
+            print(f"  {nombre:24s}: leer {t_leer:6.2f}s | limpiar {t_limpiar:6.2f}s"
+                  f" | escribir {t_escribir:6.2f}s | total {t_leer + t_limpiar + t_escribir:6.2f}s")
+
+        o, v = tiempos["iterrows + literal_eval"], tiempos["vectorizada"]
+        print(f"\n  ⚡ Leer + limpiar: {(o[0] + o[1]) / (v[0] + v[1]):5.1f}x | total: {sum(o) / sum(v):5.1f}x"
+              f" (la vectorizada escribe además el Parquet)")
+
+        # Mismo CSV limpio byte a byte, partiendo del CSV y del Parquet
+        identico = filecmp.cmp(salida_original, salida_vectorizada + ".csv", shallow=False)
+        print(f"{'✅' if identico else '❌'} CSV limpio idéntico al original (entrada CSV)")
+        if ac.disponible():
+            ac.guardar_tabla(ac.leer_tabla(base, esquema=ac.COLUMNAS_PRELIMPIEZA), base, ac.COLUMNAS_PRELIMPIEZA, csv=False)
+            desde_parquet = limpiar_metbull(ac.leer_tabla(base))
+            desde_parquet.to_csv(salida_vectorizada + ".csv", index=False, encoding="utf-8")
+            identico = filecmp.cmp(salida_original, salida_vectorizada + ".csv", shallow=False)
+            print(f"{'✅' if identico else '❌'} CSV limpio idéntico al original (entrada Parquet)")
+
+
+# -------------------------------------------------------------------
+# Limpieza por bloques: pico de memoria
+# -------------------------------------------------------------------
+
+def _escribir_prelimpieza_sintetica(ruta, n):
+    prelimpieza_sintetica(n).to_csv(ruta, index=False, encoding="utf-8")
+
+
+def _limpiar_midiendo(directorio, filas_por_bloque):
+    """Limpieza completa o por bloques en este proceso → (segundos, RSS inicial y pico en MB)."""
+    import AlmacenColumnar as ac
+    from LimpiezaMetbull import limpiar_metbull, limpiar_por_bloques
+
+    entrada = os.path.join(directorio, "meteoritos_Metbull_PreLimpieza")
+    salida = os.path.join(directorio, "meteoritos_Metbull_bloques" if filas_por_bloque else "meteoritos_Metbull")
+    inicial = rss_mb()
+    inicio = time.perf_counter()
+    if filas_por_bloque:
+        limpiar_por_bloques(entrada, salida, filas_por_bloque)
+    else:
+        ac.guardar_tabla(limpiar_metbull(ac.leer_tabla(entrada)), salida, ac.COLUMNAS_METBULL)
+    return time.perf_counter() - inicio, inicial, rss_mb()
+
+
+def bench_bloques(n, filas_por_bloque, entrada):
+    import shutil
+    import tempfile
+    import AlmacenColumnar as ac
+
+    if not medir_memoria_disponible():
+        return
+
+    # Aquí nunca se carga la tabla sintética: se escribe y se limpia en procesos nuevos
+    with tempfile.TemporaryDirectory() as directorio:
+        base = os.path.join(directorio, "meteoritos_Metbull_PreLimpieza")
+        if entrada:
+            shutil.copy(entrada, base + ".csv")
+        else:
+            en_proceso_nuevo(_escribir_prelimpieza_sintetica, base + ".csv", n)
+        print(f"🧪 PreLimpieza de {os.path.getsize(base + '.csv') / 1e6:.1f} MB, bloques de {filas_por_bloque} filas")
+
+        for etiqueta, bloque in (("completa", None), ("por bloques", filas_por_bloque)):
+            segundos, inicial, pico = en_proceso_nuevo(_limpiar_midiendo, directorio, bloque)
+            print(f"  {etiqueta:12s}: {segundos:6.2f}s | RSS pico {pico:7.1f} MB"
+                  f" ({pico - inicial:+7.1f} MB sobre el proceso recién importado)")
+
+        if ac.disponible():
+            import pyarrow.parquet as pq
+            completa = pq.read_table(os.path.join(directorio, "meteoritos_Metbull.parquet"))
+            por_bloques = pq.read_table(os.path.join(directorio, "meteoritos_Metbull_bloques.parquet"))
+            print(f"{'✅' if completa.equals(por_bloques) else '❌'} Mismas filas y valores en ambos modos")
+
+
+# -------------------------------------------------------------------
+# Parsers de coordenadas, años y masas: original vs memo vs vectorizado
+# -------------------------------------------------------------------
+
+_TROZOS = ["12", "3.5", "007", "°", "'", '"', "′", "″", " ", ",", ".", "N", "s", "E", "w", "-", "+",
+           "(", ")", "\\", "nan", "1e3", "1_0", "kg", "mg", "g", "t", "ton", "tonne", "KG", "٣", "\t",
+           "abc", "0", "1999", "ca.", "or", "  "]
+
+
+def casos_parsers(n, semilla=5):
+    """
+    Entradas del microbenchmark: coordenadas, años y masas con los formatos
+    del catálogo sintético, más n combinaciones aleatorias de trozos.
+    (La equivalencia con los parsers originales la comprueba
+    tests/test_limpieza_parsers.py.)
+    """
+    rnd = random.Random(semilla)
+    catalogo = prelimpieza_sintetica(max(n // 10, 1), semilla)
+    geografia = [g.get(k) for g in catalogo["geography"] for k in ("Catalogue of Meteorites", "Recommended")]
+    aleatorios = ["".join(rnd.choice(_TROZOS) for _ in range(rnd.randint(0, 8))) for _ in range(n)]
+    return {
+        "coordenadas": [g for g in geografia if g is not None] + aleatorios,
+        "anios": list(catalogo["Year"]) + aleatorios,
+        "masas": list(catalogo["Mass"]) + aleatorios,
+    }
+
+
+def bench_parsers(n, unicos, llamadas):
+    import LimpiezaMetbull as lm
+
+    casos = casos_parsers(n)
+    pares = [
+        ("coordenadas", parse_coordinates_original, lm.parseCoordinates, lm._coordenadas_memo),
+        ("anios", parse_year_original, lm.parse_year, lm._anio_memo),
+        ("masas", normalizar_masa_original, lm.normalizar_masa, lm._gramos_memo),
+    ]
+
+    # --- Microbenchmark: textos del catálogo que se repiten ---
+    rnd = random.Random(3)
+    print(f"⏱️ {llamadas} llamadas sobre {unicos} textos distintos")
+    for nombre, original, memo, cache in pares:
+        reservorio = [x for x in casos[nombre][:unicos] if nombre != "coordenadas" or isinstance(x, str)]
+        carga = rnd.choices(reservorio, k=llamadas)
+        _, t_original = cronometrar(lambda: [original(x) for x in carga])
+        cache.cache_clear()
+        _, t_frio = cronometrar(lambda: [memo(x) for x in carga])
+        aciertos = cache.cache_info().hits / llamadas
+        _, t_caliente = cronometrar(lambda: [memo(x) for x in carga])
+        if nombre == "coordenadas":
+            _, t_vector = cronometrar(lm.coordenadas, carga)
+        else:
+            _, t_vector = cronometrar(lm.anios if nombre == "anios" else lm.masas_en_gramos, carga)
+        por_llamada = lambda t: t / llamadas * 1e6
+        print(f"  {nombre:12s}: original {por_llamada(t_original):5.2f} µs | memo {por_llamada(t_frio):5.2f} µs"
+              f" ({aciertos:.0%} aciertos), memo lleno {por_llamada(t_caliente):5.2f} µs"
+              f" | vectorizado {por_llamada(t_vector):5.2f} µs")
+
+
+def registrar(sub):
+    p = sub.add_parser("limpieza", help="Limpieza MetBull: iterrows + literal_eval vs vectorizada")
+    p.add_argument("--filas", type=int, default=20_000)
+    p.add_argument("--repeticiones", type=int, default=1)
+    p.add_argument("--entrada", help="meteoritos_Metbull_PreLimpieza.csv real (por defecto, sintético)")
+    p.set_defaults(correr=lambda a: bench_limpieza(a.filas, a.repeticiones, a.entrada))
+
+    p = sub.add_parser("bloques", help="Limpieza completa vs por bloques: pico de memoria")
+    p.add_argument("--filas", type=int, default=50_000)
+    p.add_argument("--bloque", type=int, default=5000)
+    p.add_argument("--entrada", help="meteoritos_Metbull_PreLimpieza.csv real (por defecto, sintético)")
+    p.set_defaults(correr=lambda a: bench_bloques(a.filas, a.bloque, a.entrada))
+
+    p = sub.add_parser("parsers", help="Parsers de coordenadas/años/masas: µs por llamada")
+    p.add_argument("--casos", type=int, default=50_000, help="Entradas aleatorias generadas")
+    p.add_argument("--unicos", type=int, default=5000)
+    p.add_argument("--llamadas", type=int, default=200_000)
+    p.set_defaults(correr=lambda a: bench_parsers(a.casos, a.unicos, a.llamadas))
@@ -0,0 +1,64 @@
+import os
+
+from benchmarks.comun import cronometrar
+
+# -------------------------------------------------------------------
+# Parseo de fichas de detalle MetBull (bs4 vs lxml)
+# -------------------------------------------------------------------
+
+def cargar_corpus(directorio=None, desde_cache=False, limite=None):
+    """Páginas de detalle: archivos .html de un directorio o las guardadas en la caché HTTP."""
+    paginas = []
+    if directorio:
+        for nombre in sorted(os.listdir(directorio)):
+            if nombre.endswith((".html", ".htm")):
+                with open(os.path.join(directorio, nombre), "r", encoding="utf-8", errors="replace") as f:
+                    paginas.append((nombre, f.read()))
+    if desde_cache:
+        from CacheHttp import cache_compartida
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        for entrada in cache_compartida().entradas("%metbull.php?code=%"):
+            codificacion = get_encoding_from_headers(CaseInsensitiveDict(entrada["cabeceras"])) or "utf-8"
+            paginas.append((entrada["url"], entrada["cuerpo"].decode(codificacion, errors="replace")))
+    return paginas[:limite] if limite else paginas
+
+
+def bench_parseo(directorio, desde_cache, limite, repeticiones):
+    from ExtractorMetbull import extraer_bs4, extraer_lxml
+
+    paginas = cargar_corpus(directorio, desde_cache, limite)
+    if not paginas:
+        print("⚠️ Corpus vacío: usar --corpus DIR y/o --desde-cache")
+        return
+    mb = sum(len(html.encode("utf-8")) for _, html in paginas) / 1024 ** 2
+    print(f"📄 {len(paginas)} páginas ({mb:.1f} MB)")
+
+    resultados = {}
+    for nombre, motor in (("bs4", extraer_bs4), ("lxml", extraer_lxml)):
+        def pasada():
+            return [motor(html) for _, html in paginas]
+
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            salida, t = cronometrar(pasada)
+            mejor = min(mejor, t)
+        resultados[nombre] = salida
+        print(f"  {nombre:5s}: {mejor:8.3f}s — {len(paginas) / mejor:8.1f} páginas/s")
+
+    distintas = [n for (n, _), a, b in zip(paginas, resultados["bs4"], resultados["lxml"]) if a != b]
+    if distintas:
+        print(f"❌ {len(distintas)} páginas con salida distinta, p. ej.: {distintas[:5]}")
+    else:
+        print("✅ Salida idéntica en todas las páginas")
+
+
+def registrar(sub):
+    p = sub.add_parser("parseo", help="Fichas de detalle MetBull (BeautifulSoup vs lxml)")
+    p.add_argument("--corpus", help="Directorio con páginas de detalle .html")
+    p.add_argument("--desde-cache", action="store_true",
+                   help="Usar las fichas guardadas en la caché HTTP (cache_http)")
+    p.add_argument("--limite", type=int, default=None)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p.set_defaults(correr=lambda a: bench_parseo(a.corpus, a.desde_cache, a.limite, a.repeticiones))
@@ -0,0 +1,110 @@
+import json
+import os
+import random
+
+from benchmarks.comun import cronometrar
+from tests.referencias import relevancia_original
+
+# -------------------------------------------------------------------
+# Clasificador de relevancia (regresión + microbenchmark)
+# -------------------------------------------------------------------
+
+FRASES_RELEVANCIA = [
+    "was discovered", "impact caused", "economic impact", "impacted", "airburst", "parent body",
+    "fusion crust", "chondrules", "kinetic energy", "observed fall", "studies show", "classified as",
+    "buy", "price", "museum piece", "coordinates", "newsletter", "caused a fire", "cause damage",
+]
+RELLENO_RELEVANCIA = ["the", "rock", "was", "found", "near", "village", "meteorite", "stone", "large", "in",
+                      "and", "of", "a", "scientists", "report", "impactful", "structured", "impacts"]
+
+
+def corpus_relevancia(n, semilla=7):
+    """Textos sintéticos con frases de los grupos, nombres cerca del carácter 300 y casos límite."""
+    rnd = random.Random(semilla)
+    nombres = ["Hoba", "Allende", "Sikhote-Alin", "Abadla 002", "El Chaco", "Ali", "Gancedo", ""]
+    corpus = []
+    for _ in range(n):
+        nombre = rnd.choice(nombres)
+        densidad = rnd.choice([0.03, 0.001])   # páginas con muchas frases clave o casi ninguna
+        palabras = []
+        for _ in range(rnd.choice([10, 60, 300, 2500])):
+            r = rnd.random()
+            if r < densidad:
+                palabras.append(rnd.choice(FRASES_RELEVANCIA))
+            elif r < densidad + 0.02 and nombre:
+                palabras.append(rnd.choice([nombre, nombre.upper(), nombre.split()[0] + "ite", nombre + "s"]))
+            else:
+                palabras.append(rnd.choice(RELLENO_RELEVANCIA))
+        texto = " ".join(palabras)
+        if nombre and rnd.random() < 0.3:  # nombre justo en el borde de los 300 caracteres
+            corte = 300 - rnd.randint(0, len(nombre) + 1)
+            texto = texto[:corte].ljust(corte) + nombre + rnd.choice(["", "x", " "]) + texto[corte:]
+        corpus.append((nombre, texto))
+    return corpus
+
+
+def bench_relevancia(n, repeticiones):
+    from RegistroTrabajo import RegistroTrabajo
+    from Relevancia import ClasificadorRelevancia, clasificador
+
+    regex = ClasificadorRelevancia(motor="regex")
+    corpus = corpus_relevancia(n)
+    reales = [(name, texto) for name, _, texto in RegistroTrabajo().textos_web()]
+    corpus += reales
+    print(f"📄 Corpus: {len(corpus)} textos ({len(reales)} del registro de trabajo)")
+
+    motores = [("original", relevancia_original), ("regex", regex.es_relevante)]
+    if clasificador.motor != "regex":
+        motores.append((clasificador.motor, clasificador.es_relevante))
+    for nombre, funcion in motores:
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            decisiones, t = cronometrar(lambda: [funcion(texto, name) for name, texto in corpus])
+            mejor = min(mejor, t)
+        print(f"  {nombre:13s}: {mejor * 1e6 / len(corpus):8.1f} µs/texto — {sum(decisiones)} relevantes")
+        if nombre == "original":
+            referencia = decisiones
+            continue
+        distintas = [i for i, (a, b) in enumerate(zip(referencia, decisiones)) if a != b]
+        if distintas:
+            print(f"❌ {len(distintas)} decisiones distintas, p. ej. índices {distintas[:5]}")
+        else:
+            print("✅ Mismas decisiones en todo el corpus")
+
+    # Los conteos por grupo del autómata deben coincidir con los de las regex
+    distintos = sum(1 for _, texto in corpus
+                    if clasificador.contar(texto.lower()) != regex.contar(texto.lower()))
+    print(f"{'✅' if not distintos else '❌'} Conteos por grupo distintos: {distintos}")
+
+
+def congelar_muestras(n):
+    """Agrega a tests/datos/textos_relevancia.json hasta `n` textos del registro con la decisión original."""
+    from RegistroTrabajo import RegistroTrabajo
+
+    ruta = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "tests", "datos", "textos_relevancia.json")
+    with open(ruta, encoding="utf-8") as f:
+        muestras = json.load(f)
+    vistos = {m["texto"] for m in muestras}
+    nuevos = 0
+    for name, _, texto in RegistroTrabajo().textos_web():
+        if nuevos >= n:
+            break
+        if texto in vistos:
+            continue
+        muestras.append({"nombre": name, "texto": texto, "relevante": relevancia_original(texto, name)})
+        vistos.add(texto)
+        nuevos += 1
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(muestras, f, ensure_ascii=False, indent=1)
+    print(f"🧊 {nuevos} textos del registro congelados en {ruta}")
+
+
+def registrar(sub):
+    p = sub.add_parser("relevancia", help="Filtro de relevancia: original vs clasificador precompilado")
+    p.add_argument("--textos", type=int, default=2000)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p.add_argument("--congelar", type=int, metavar="N",
+                   help="Agregar N textos del registro de trabajo a las muestras de tests/test_relevancia.py")
+    p.set_defaults(correr=lambda a: congelar_muestras(a.congelar) if a.congelar
+                   else bench_relevancia(a.textos, a.repeticiones))
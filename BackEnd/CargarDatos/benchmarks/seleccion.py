@@ -0,0 +1,140 @@
+import random
+import sys
+import time
+
+from benchmarks.comun import (FILTROS_PERSONALES, cronometrar, en_proceso_nuevo, leer_eventos,
+                              medir_memoria_disponible, rss_mb)
+from benchmarks.union import meteoritos_sinteticos
+from tests.referencias import seleccion_original, unir_datos_original
+
+# -------------------------------------------------------------------
+# Selección de iniciar_procesamiento: original vs máscaras
+# -------------------------------------------------------------------
+
+def coincidencias_sinteticas(n, semilla=13):
+    """n dicts con la forma de unir_datos (nombres únicos, masas en texto, fotos)."""
+    rnd = random.Random(semilla)
+    campos = ["status", "fall", "place", "type", "country", "basic_name", "basic_abbrev", "basic_fall",
+              "basic_yearFound", "basic_country", "classification", "coordinadesExact", "coordinadesLat",
+              "coordinadesLon", "coordinadesRecomend", "coordinadesLatRecomend", "coordinadesLonRecomend",
+              "dataMB109_Lat", "dataMB109_Lon", "dataMB109_Mass", "dataMB109_Class", "nasa_date", "nasa_energy"]
+    nombres = FILTROS_PERSONALES + ["Northwest Africa", "Dhofar", "Allan Hills", "Jiddat al Harasis", "Sahara"]
+    coincidencias = []
+    for i in range(n):
+        c = {"name": f"{rnd.choice(nombres)} {i:05d}",
+             "year": str(rnd.randint(800, 2024)) if rnd.random() > 0.05 else "",
+             "mass": rnd.choice([f"{rnd.uniform(0.1, 60_000):.3f}", str(rnd.randint(1, 9000)), "", "n/a"])}
+        c.update({campo: f"{campo} {i}" for campo in campos})
+        c["metBull_fotos"] = [{"autor": "Autor", "referencia": "MetBull", "link": f"https://x/{i}_{j}.jpg"}
+                              for j in range(rnd.choice([0, 0, 0, 1, 2]))]
+        coincidencias.append(c)
+    return coincidencias
+
+
+def bench_seleccion(tamanos, max_original):
+    from SeleccionMeteoritos import resumen_tiempos, seleccionar
+
+    for n in tamanos:
+        coincidencias = coincidencias_sinteticas(n)
+        print(f"\n🧮 {n} coincidencias")
+        nueva, t_nueva = cronometrar(seleccionar, coincidencias, FILTROS_PERSONALES)
+        print(f"  máscaras  : {t_nueva:7.3f}s ({resumen_tiempos(nueva['tiempos'])})")
+        if n > max_original:
+            print(f"  original  : omitido (n > {max_original}, es cuadrático)")
+            continue
+        original, t_original = cronometrar(seleccion_original, coincidencias, FILTROS_PERSONALES)
+        print(f"  original  : {t_original:7.3f}s  → ⚡ {t_original / t_nueva:.0f}x")
+        for clave in ("cumplen", "no_cumplen", "especiales"):
+            iguales = [c["name"] for c in original[clave]] == [c["name"] for c in nueva[clave]]
+            print(f"  {'✅' if iguales else '❌'} {clave}: {len(original[clave])} vs {len(nueva[clave])}")
+
+
+# -------------------------------------------------------------------
+# Registros unidos: dicts de 39 claves vs MeteoritoUnido (__slots__)
+# -------------------------------------------------------------------
+
+def meteoritos_union_sinteticos(eventos, n, semilla=42):
+    """meteoritos_sinteticos con todas las columnas de COLUMNAS_UNION_METBULL (todo texto)."""
+    rnd = random.Random(semilla)
+    meteoritos = meteoritos_sinteticos(eventos, n, semilla)
+    for i, m in enumerate(meteoritos):
+        m.update({
+            "Status": "Official", "Fall": rnd.choice(["Found", "Fell"]), "Place": f"Lugar {i % 500}",
+            "Type": rnd.choice(["L6", "H5", "Iron, IIAB"]), "Mass": f"{10 ** rnd.uniform(-1, 5):.3f}",
+            "Country": rnd.choice(["Algeria", "Chile", "Oman"]), "basic_name": m["Name"], "basic_abbrev": "",
+            "basic_fall": "No", "basic_yearFound": m["Year"], "basic_country": "Chile",
+            "classification_recomend": "L6", "coordinadesExact": f"({m['coordinadesLat']}, {m['coordinadesLon']})",
+            "coordinadesRecomend": "", "coordinadesLatRecomend": m["coordinadesLat"],
+            "coordinadesLonRecomend": m["coordinadesLon"],
+            "DataMB109_Lat": "", "DataMB109_Lon": "", "DataMB109_Mass": "", "DataMB109_Piece": "",
+            "DataMB109_Class": "", "DataMB109_Weathering": "", "DataMB109_Fayalite": "",
+            "DataMB109_Ferrosilite": "", "DataMB109_Classifier": "", "DataMB109_Main_mass": "",
+            "DataMB109_Coments": "Submitted by a synthetic classifier" if rnd.random() < 0.3 else "",
+            "fotos": "; ".join(f"Autor {j} | MetBull | https://www.lpi.usra.edu/meteor/photo/{i}_{j}.jpg"
+                               for j in range(rnd.choice([0, 0, 1, 2]))),
+        })
+    return meteoritos
+
+
+def _unir_midiendo(n, modo):
+    """
+    Unión + selección en este proceso, con dicts ("antes") o MeteoritoUnido.
+    → (segundos, RSS inicial y pico en MB, registros, crc32 del JSON de salida).
+    """
+    import json
+    import zlib
+    import DatosEnriquesidos as de
+    from SeleccionMeteoritos import seleccionar
+
+    eventos = leer_eventos()
+    meteoritos = meteoritos_union_sinteticos(eventos, n)
+    inicial = rss_mb()
+    inicio = time.perf_counter()
+    if modo == "dicts":
+        coincidencias = unir_datos_original(meteoritos, eventos)
+        seleccion = seleccion_original(coincidencias, FILTROS_PERSONALES, cuadratica=False)
+    else:
+        coincidencias = de.unir_datos(meteoritos, eventos)
+        seleccion = seleccionar(coincidencias, FILTROS_PERSONALES)
+    segundos, pico = time.perf_counter() - inicio, rss_mb()
+
+    crc = 0
+    for c in coincidencias:
+        registro = c if isinstance(c, dict) else c.a_dict()
+        crc = zlib.crc32(json.dumps(registro, ensure_ascii=False).encode("utf-8"), crc)
+    return segundos, inicial, pico, len(coincidencias), len(seleccion["cumplen"]), crc
+
+
+def bench_registros(tamanos):
+    from MeteoritoUnido import MeteoritoUnido, CAMPOS_UNIDOS
+
+    if not medir_memoria_disponible():
+        return
+
+    vacio = dict.fromkeys(CAMPOS_UNIDOS, "")
+    print(f"📏 Por registro (sin contar los valores): dict {sys.getsizeof(vacio)} B"
+          f" | MeteoritoUnido {sys.getsizeof(MeteoritoUnido())} B")
+
+    for n in tamanos:
+        # "spawn" y sin cargar datos aquí: en Linux ru_maxrss sobrevive al exec
+        print(f"\n🧪 {n} meteoritos sintéticos + eventos CNEOS: unir_datos + selección")
+        resultados = {}
+        for modo, etiqueta in (("dicts", "dicts (antes)"), ("registros", "MeteoritoUnido")):
+            segundos, inicial, pico, total, cumplen, crc = en_proceso_nuevo(_unir_midiendo, n, modo)
+            resultados[modo] = (total, cumplen, crc)
+            print(f"  {etiqueta:15s}: {segundos:6.2f}s | RSS pico {pico:7.1f} MB ({pico - inicial:+7.1f} MB)"
+                  f" | {total} registros, {cumplen} cumplen")
+        iguales = resultados["dicts"] == resultados["registros"]
+        print(f"  {'✅' if iguales else '❌'} Mismos registros y mismo JSON en ambos modos")
+
+
+def registrar(sub):
+    p = sub.add_parser("seleccion", help="Selección de iniciar_procesamiento: original vs máscaras")
+    p.add_argument("--tamanos", type=int, nargs="+", default=[5000, 20_000, 70_000])
+    p.add_argument("--max-original", type=int, default=20_000,
+                   help="Tamaño máximo para la selección original (es cuadrática)")
+    p.set_defaults(correr=lambda a: bench_seleccion(a.tamanos, a.max_original))
+
+    p = sub.add_parser("registros", help="Unión + selección: dicts por registro vs MeteoritoUnido")
+    p.add_argument("--tamanos", type=int, nargs="+", default=[70_000, 200_000])
+    p.set_defaults(correr=lambda a: bench_registros(a.tamanos))
@@ -0,0 +1,89 @@
+import random
+
+from UnionEventos import IndiceEventos, con_signo, emparejar_vectorizado
+
+from benchmarks.comun import cronometrar, leer_eventos
+from tests.referencias import emparejar_python
+
+# -------------------------------------------------------------------
+# Unión MetBull ↔ CNEOS
+# -------------------------------------------------------------------
+
+def eventos_con_signo(eventos):
+    """Eventos CNEOS con lat/lon ya firmadas y sin lat-dir/lon-dir (entrada para emparejar_python)."""
+    firmados = []
+    for e in eventos:
+        e = dict(e)
+        for eje in ("lat", "lon"):
+            try:
+                e[eje] = str(con_signo(float(e[eje]), e.pop(f"{eje}-dir", "")))
+            except (ValueError, TypeError):
+                e.pop(f"{eje}-dir", None)
+        firmados.append(e)
+    return firmados
+
+
+def meteoritos_sinteticos(eventos, n, semilla=42):
+    """Genera n meteoritos con el formato de meteoritos_Metbull.csv (todo texto);
+    aproximadamente la mitad cae cerca de algún evento real."""
+    rnd = random.Random(semilla)
+    eventos = eventos_con_signo(eventos)   # cerca del evento real, no de su reflejo en el hemisferio N/E
+    con_coordenadas = [e for e in eventos if e.get("lat") and e.get("lon") and e.get("date")]
+    meteoritos = []
+    for i in range(n):
+        if con_coordenadas and rnd.random() < 0.5:
+            e = rnd.choice(con_coordenadas)
+            lat = min(max(float(e["lat"]) + rnd.uniform(-0.6, 0.6), -90.0), 90.0)
+            lon = min(max(float(e["lon"]) + rnd.uniform(-0.6, 0.6), -180.0), 180.0)
+            anio = int(e["date"][:4]) + rnd.randint(-2, 2)
+        else:
+            lat = rnd.uniform(-90, 90)
+            lon = rnd.uniform(-180, 180)
+            anio = rnd.randint(1800, 2025)
+        meteoritos.append({
+            "Name": f"Sintetico {i}",
+            "Year": str(anio) if rnd.random() > 0.02 else "",
+            "coordinadesLat": str(round(lat, 1)),
+            "coordinadesLon": str(round(lon, 1)),
+        })
+    return meteoritos
+
+
+def bench_union(tamanos, max_python):
+    eventos = leer_eventos()
+    print(f"Eventos CNEOS: {len(eventos)}")
+
+    for n in tamanos:
+        meteoritos = meteoritos_sinteticos(eventos, n)
+        print(f"\n🧪 {n} meteoritos sintéticos")
+
+        vectorizado, t_vec = cronometrar(emparejar_vectorizado, meteoritos, eventos)
+        vectorizado = [int(i) for i in vectorizado]
+        print(f"  vectorizado (grados):   {t_vec:8.3f}s — {sum(i >= 0 for i in vectorizado)} coincidencias")
+
+        haversine, t_hav = cronometrar(emparejar_vectorizado, meteoritos, eventos, metrica="haversine")
+        print(f"  vectorizado (haversine):{t_hav:8.3f}s — {sum(i >= 0 for i in haversine)} coincidencias")
+
+        def por_indice():
+            indice = IndiceEventos(eventos)
+            return [indice.mas_cercano(m)[0] for m in meteoritos]
+
+        indice, t_ind = cronometrar(por_indice)
+        indice = [-1 if i is None else i for i in indice]
+        print(f"  índice (Python):        {t_ind:8.3f}s — {'idéntico' if indice == vectorizado else 'DIFERENTE'}")
+
+        if n <= max_python:
+            # El recorrido original no conoce lat-dir/lon-dir: recibe las coordenadas ya firmadas
+            python, t_py = cronometrar(emparejar_python, meteoritos, eventos_con_signo(eventos))
+            print(f"  anidado (Python puro):  {t_py:8.3f}s — {'idéntico' if python == vectorizado else 'DIFERENTE'}"
+                  f" — x{t_py / t_vec:.0f} más lento que vectorizado")
+        else:
+            print(f"  anidado (Python puro):  omitido (> --max-python {max_python})")
+
+
+def registrar(sub):
+    p = sub.add_parser("union", help="Unión MetBull ↔ CNEOS (Python vs índice vs NumPy)")
+    p.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 70_000, 300_000])
+    p.add_argument("--max-python", type=int, default=10_000,
+                   help="Tamaño máximo para el recorrido anidado (es cuadrático)")
+    p.set_defaults(correr=lambda a: bench_union(a.tamanos, a.max_python))
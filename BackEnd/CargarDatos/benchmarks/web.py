@@ -0,0 +1,231 @@
+import os
+import random
+import time
+
+from benchmarks.comun import FILTROS_PERSONALES, cronometrar
+from tests.referencias import extraer_original
+
+# -------------------------------------------------------------------
+# Descarga de resultados web: página completa + bs4 vs streaming
+# -------------------------------------------------------------------
+
+def pagina_noticias(i):
+    """Página de noticias "pesada": scripts en cabecera, menú, artículo, comentarios y rastreadores."""
+    rnd = random.Random(i)
+    palabras = ["meteorite", "fell", "near", "the", "village", "impact", "crater", "scientists", "said",
+                "fragments", "were", "recovered", "by", "local", "residents", "after", "bright", "fireball"]
+
+    def parrafo():
+        return " ".join(rnd.choice(palabras) for _ in range(rnd.randint(40, 90))) + "."
+
+    script = "var x=" + "1234567890" * rnd.randint(5_000, 25_000) + ";"
+    menu = "".join(f'<li><a href="/s/{k}">Sección {k}</a></li>' for k in range(rnd.randint(50, 300)))
+    articulo = "".join(f"<p>{parrafo()}</p>\n" for _ in range(rnd.randint(15, 60)))
+    comentarios = "".join(f'<div class="c"><p>{parrafo()}</p></div>' for _ in range(rnd.randint(20, 200)))
+    return (f"<!DOCTYPE html><html><head><title>Noticia {i}</title><style>{'.a{b:c}' * 3000}</style>"
+            f"<script>{script}</script></head><body><header><nav><ul>{menu}</ul></nav></header>"
+            f"<main><article><h1>Noticia {i}</h1>{articulo}</article><section>{comentarios}</section></main>"
+            f"<footer><p>© Diario</p></footer><script>{script}</script></body></html>")
+
+
+def servidor_web_falso():
+    """
+    Sirve /pagina/<i> (HTML de noticias), /pdf/<i> (application/pdf) y
+    /enorme/<i> (HTML de 8 MB), en bloques como un servidor real.
+    ?espera=<s> retrasa la respuesta (sitios lentos).
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            ruta, _, consulta = self.path.partition("?")
+            _, tipo, i = ruta.split("/")
+            espera = float(dict(p.split("=") for p in consulta.split("&") if p).get("espera", 0))
+            time.sleep(espera)   # sitio lento en responder
+            if tipo == "pdf":
+                cuerpo, contenido = b"%PDF-1.4" + b"0" * 2_000_000, "application/pdf"
+            elif tipo == "enorme":
+                cuerpo = b"<html><body><pre>" + b"0123456789" * 800_000 + b"</pre></body></html>"
+                contenido = "text/html; charset=utf-8"
+            else:
+                cuerpo, contenido = pagina_noticias(int(i)).encode("utf-8"), "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", contenido)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            for inicio in range(0, len(cuerpo), 64 * 1024):
+                self.wfile.write(cuerpo[inicio:inicio + 64 * 1024])
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionError:
+                pass   # el cliente cortó la lectura
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_port}"
+
+
+def bench_descarga(meteoritos, especial):
+    import requests
+    from TextoWeb import EXCLUIDAS_BASICAS, EXCLUIDAS_EXTENDIDAS, descargar_texto
+
+    base = servidor_web_falso()
+    sesion = requests.Session()   # sin caché HTTP: se mide la red
+    por_meteorito = 10 if especial else 3
+    rnd = random.Random(3)
+    urls = [[f"{base}/{rnd.choices(['pagina', 'pdf', 'enorme'], [90, 7, 3])[0]}/{m * por_meteorito + k}"
+             for k in range(por_meteorito)] for m in range(meteoritos)]
+    parametros = (dict(etiquetas=("p", "article", "div", "main"), excluidas=EXCLUIDAS_EXTENDIDAS,
+                       limite=10000, espacios="normalizar") if especial
+                  else dict(etiquetas=("p",), excluidas=EXCLUIDAS_BASICAS, limite=5000, espacios="recortar"))
+    print(f"🌐 {meteoritos} meteoritos × {por_meteorito} resultados ({'especial' if especial else 'normal'})")
+
+    def original():
+        textos, total = [], []
+        for lista in urls:
+            bytes_m = 0
+            for url in lista:
+                respuesta = sesion.get(url, timeout=30)
+                bytes_m += len(respuesta.content)
+                textos.append(extraer_original(respuesta.text, especial))
+            total.append(bytes_m)
+        return textos, total
+
+    def streaming():
+        textos, total, motivos = [], [], {}
+        for lista in urls:
+            bytes_m = 0
+            for url in lista:
+                texto, descarga = descargar_texto(sesion, url, timeout=30, **parametros)
+                bytes_m += descarga["bytes"]
+                motivos[descarga["motivo"]] = motivos.get(descarga["motivo"], 0) + 1
+                textos.append(texto)
+            total.append(bytes_m)
+        return textos, total, motivos
+
+    (textos_o, bytes_o), t_o = cronometrar(original)
+    (textos_s, bytes_s, motivos), t_s = cronometrar(streaming)
+    for nombre, total, t in (("completa+bs4", bytes_o, t_o), ("streaming", bytes_s, t_s)):
+        print(f"  {nombre:13s}: {sum(total) / len(total) / 1024:8.0f} KB por meteorito"
+              f" (máx {max(total) / 1024:6.0f} KB) | {t / len(total):6.3f}s por meteorito")
+    print(f"  Motivos de corte: {motivos}")
+
+    # Las páginas que no son HTML o exceden el tamaño se descartan: ahí el texto pasa a ser ""
+    html = [i for i, url in enumerate(u for lista in urls for u in lista) if "/pagina/" in url]
+    distintas = [i for i in html if textos_o[i] != textos_s[i]]
+    print(f"{'✅' if not distintas else '❌'} Texto distinto en {len(distintas)} de {len(html)} páginas HTML")
+
+
+def bench_latencia(meteoritos, por_meteorito, plazo):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from TextoWeb import HILOS_DESCARGA, descargar_texto, descargar_textos
+
+    base = servidor_web_falso()
+    sesion = requests.Session()   # sin caché HTTP: se mide la red
+    adaptador = HTTPAdapter(pool_connections=HILOS_DESCARGA, pool_maxsize=HILOS_DESCARGA)
+    sesion.mount("http://", adaptador)
+    rnd = random.Random(5)
+
+    def espera():
+        r = rnd.random()   # la mayoría responde rápido; algunos tardan y unos pocos no responden
+        return round(rnd.uniform(0.05, 0.3) if r < 0.8 else rnd.uniform(1, 3) if r < 0.95 else 30, 2)
+
+    urls = [[f"{base}/pagina/{m * por_meteorito + k}?espera={espera()}" for k in range(por_meteorito)]
+            for m in range(meteoritos)]
+    print(f"🐢 {meteoritos} meteoritos × {por_meteorito} resultados; plazo por meteorito {plazo}s")
+
+    def secuencial(lista):
+        textos = []
+        for url in lista:
+            try:
+                textos.append(descargar_texto(sesion, url, timeout=10)[0])
+            except Exception:
+                textos.append("")
+        return textos
+
+    def paralelo(lista):
+        return [texto for texto, _ in descargar_textos(sesion, lista, plazo=plazo, timeout=10)]
+
+    fuera_de_orden = 0
+    for nombre, funcion in (("secuencial", secuencial), ("paralelo", paralelo)):
+        tiempos, paginas, textos = [], 0, []
+        for lista in urls:
+            obtenidos, t = cronometrar(funcion, lista)
+            tiempos.append(t)
+            paginas += sum(1 for texto in obtenidos if texto)
+            textos.append(obtenidos)
+        tiempos.sort()
+        p = lambda q: tiempos[min(len(tiempos) - 1, int(q * len(tiempos)))]
+        print(f"  {nombre:10s}: p50 {p(0.5):6.2f}s | p95 {p(0.95):6.2f}s | máx {tiempos[-1]:6.2f}s"
+              f" | {paginas} páginas con texto")
+        if nombre == "secuencial":
+            referencia = textos
+        else:
+            # Cada página obtenida a tiempo queda en su posición del ranking con el mismo texto
+            fuera_de_orden = sum(1 for ref, obt in zip(referencia, textos)
+                                 for a, b in zip(ref, obt) if b and a != b)
+    print(f"{'✅' if not fuera_de_orden else '❌'} Páginas distintas o fuera de orden: {fuera_de_orden}")
+
+
+# -------------------------------------------------------------------
+# Caché y coalescencia de consultas de búsqueda
+# -------------------------------------------------------------------
+
+def bench_busquedas(latencia, hilos):
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from BusquedaWeb import BuscadorWeb, CacheBusquedas, ProveedorFalso
+
+    # Cada meteorito marcado se busca con la variante normal (3) y la especial (10)
+    peticiones = [(f"{nombre} meteorite {1900 + len(nombre)}", n)
+                  for nombre in FILTROS_PERSONALES for n in (3, 10)]
+    random.Random(1).shuffle(peticiones)
+    print(f"🔎 {len(peticiones)} búsquedas ({len(set(c for c, _ in peticiones))} consultas distintas), "
+          f"{hilos} hilos, {latencia}s por consulta al proveedor")
+
+    def correr(buscar):
+        with ThreadPoolExecutor(hilos) as pool:
+            return list(pool.map(lambda p: buscar(*p), peticiones))
+
+    proveedor = ProveedorFalso(latencia=latencia)
+    referencia, t = cronometrar(correr, proveedor.buscar)
+    print(f"  sin caché     : {proveedor.llamadas:3d} llamadas al proveedor | {t:6.2f}s")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheBusquedas(nombre=os.path.join(directorio, "busquedas.sqlite"))
+        for etiqueta in ("caché fría", "caché caliente"):
+            proveedor = ProveedorFalso(latencia=latencia)
+            buscador = BuscadorWeb(proveedor, cache)
+            resultados, t = cronometrar(correr, buscador.buscar)
+            e = buscador.estadisticas
+            print(f"  {etiqueta:14s}: {proveedor.llamadas:3d} llamadas al proveedor | {t:6.2f}s"
+                  f" | aciertos {e['aciertos']}, coalescidas {e['coalescidas']}")
+            iguales = resultados == referencia
+            print(f"  {'✅' if iguales else '❌'} Mismos resultados que sin caché")
+
+
+def registrar(sub):
+    p = sub.add_parser("descarga", help="Bytes por meteorito: página completa + bs4 vs streaming")
+    p.add_argument("--meteoritos", type=int, default=20)
+    p.add_argument("--especial", action="store_true", help="10 resultados y extracción extendida")
+    p.set_defaults(correr=lambda a: bench_descarga(a.meteoritos, a.especial))
+
+    p = sub.add_parser("latencia", help="Latencia por meteorito: descargas en serie vs en paralelo con plazo")
+    p.add_argument("--meteoritos", type=int, default=8)
+    p.add_argument("--resultados", type=int, default=10)
+    p.add_argument("--plazo", type=float, default=12)
+    p.set_defaults(correr=lambda a: bench_latencia(a.meteoritos, a.resultados, a.plazo))
+
+    p = sub.add_parser("busquedas", help="Consultas al buscador: sin caché vs caché + coalescencia")
+    p.add_argument("--latencia", type=float, default=0.5, help="Segundos por consulta al proveedor falso")
+    p.add_argument("--hilos", type=int, default=8)
+    p.set_defaults(correr=lambda a: bench_busquedas(a.latencia, a.hilos))
@@ -0,0 +1,499 @@
+import re
+
+import pandas as pd
+
+from UnionEventos import IndiceEventos, emparejar_vectorizado
+
+# -------------------------------------------------------------------
+# Implementaciones anteriores del pipeline (referencias congeladas)
+# Las pruebas y los benchmarks comparan contra ellas; no se modifican al
+# cambiar el código de producción.
+# -------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------
+# Unión MetBull ↔ CNEOS
+# -------------------------------------------------------------------
+
+def emparejar_python(meteoritos, eventos):
+    """Recorrido anidado original de unir_datos (referencia en Python puro)."""
+    resultado = []
+    for m in meteoritos:
+        match_idx = -1
+        min_distancia = float("inf")
+        for idx, e in enumerate(eventos):
+            try:
+                distancia = ((float(e["lat"]) - float(m["coordinadesLat"])) ** 2 +
+                             (float(e["lon"]) - float(m["coordinadesLon"])) ** 2) ** 0.5
+            except (ValueError, TypeError):
+                continue
+            try:
+                if distancia < 0.5 and abs(int(e["date"][:4]) - int(m["Year"])) <= 1:
+                    if distancia < min_distancia:
+                        min_distancia = distancia
+                        match_idx = idx
+            except (ValueError, TypeError):
+                continue
+        resultado.append(match_idx)
+    return resultado
+
+
+# -------------------------------------------------------------------
+# Clasificador de relevancia
+# -------------------------------------------------------------------
+
+PATRONES_RELEVANTES_ORIGINALES = [
+    # --- Impacto físico / ambiental / consecuencias ---
+    r"(impact(ed|ing)?|cause(d)? (a )?(damage|change|shock|event|fire|explosion|impact)|"
+    r"impact (area|zone|site)|impact effect|blast wave|crater formation|"
+    r"released energy|energy of impact|impact velocity|entry velocity|angle of impact|"
+    r"impact magnitude|airburst|collision energy)",
+
+    # --- Historia / origen / descubrimiento ---
+    r"(discovered in|was discovered|originated from|formed in|composition of|parent body|source asteroid|"
+    r"was part of|fragmented from|classified as|recovered in|meteorite classification|"
+    r"scientists (believe|suggest)|studies (show|indicate)|analysis revealed)",
+
+    # --- Datos científicos ---
+    r"(velocity of|speed of entry|temperature reached|pressure impact|shock stage|"
+    r"kinetic energy|mass of the meteorite|density|fusion crust|matrix|chondrules|"
+    r"chemical composition|structure|grain size|surface features|melting point)",
+
+    # --- Importancia o contexto histórico ---
+    r"(news report|witnessed event|documented fall|reported by|observed fall|"
+    r"impact caused|caused panic|injured|destroyed|hit the ground|"
+    r"economic impact|affected the region|changed the landscape)"
+]
+
+PATRONES_IRRELEVANTES_ORIGINALES = [
+    r"(found in|located in|coordinates|latitude|longitude|"
+    r"copyright|newsletter|subscribe|buy|price|store|shop|review|discount|"
+    r"collection|museum piece|sold by|available for sale)"
+]
+
+
+def relevancia_original(texto, nombre_meteorito=None):
+    """texto_contiene_palabras_clave original: un re.search por grupo (referencia)."""
+    if not texto or len(texto.strip()) < 100:
+        return False
+    texto = texto.lower()
+    nombre_meteorito = (nombre_meteorito or "").lower().strip()
+    if sum(bool(re.search(p, texto)) for p in PATRONES_IRRELEVANTES_ORIGINALES) >= 2:
+        return False
+    coincidencias = sum(bool(re.search(p, texto)) for p in PATRONES_RELEVANTES_ORIGINALES)
+    nombre_presente = False
+    if nombre_meteorito:
+        patron_nombre = re.escape(nombre_meteorito.split()[0])
+        if re.search(rf"\b{patron_nombre}\b", texto):
+            nombre_presente = True
+        if re.search(rf"\b{patron_nombre}\b", texto[:300]):
+            coincidencias += 1
+            nombre_presente = True
+    return coincidencias >= 2 and nombre_presente
+
+
+# -------------------------------------------------------------------
+# Extracción de texto de resultados web
+# -------------------------------------------------------------------
+
+def extraer_original(html, especial=False, limite=None):
+    """Extracción original de buscar_en_web / buscar_en_web_especial (referencia)."""
+    import re
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    if especial:
+        for tag in soup(["script", "style", "noscript", "footer", "header", "nav", "aside"]):
+            tag.decompose()
+        contenido = " ".join(p.get_text() for p in soup.find_all(["p", "article", "div", "main"]))
+        return re.sub(r"\s+", " ", contenido).strip()[:limite or 10000]
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return " ".join(p.get_text() for p in soup.find_all("p")).strip()[:limite or 5000]
+
+
+# -------------------------------------------------------------------
+# Limpieza MetBull: iterrows + literal_eval
+# -------------------------------------------------------------------
+
+def parse_coordinates_original(coordString):
+    """parseCoordinates original (referencia): regex por llamada, sin memo."""
+    if not coordString:
+        return {"lat": None, "lon": None}
+
+    coordString = re.sub(r"[()\"\\]", "", coordString).strip()
+
+    parts = [p.strip() for p in coordString.split(",")]
+    if len(parts) < 2:
+        parts = re.split(r"\s+", coordString)
+        if len(parts) < 2:
+            return {"lat": None, "lon": None}
+
+    def gmsToDecimal(part):
+        match = re.match(
+            r"(\d+(?:\.\d+)?)°?\s*(\d+(?:\.\d+)?)?['′]?\s*(\d+(?:\.\d+)?)?['\"″]?\s*([NSEW])?",
+            part.strip(),
+            re.I
+        )
+        if not match:
+            try:
+                return float(part)
+            except:
+                return None
+
+        deg = float(match.group(1))
+        min_ = float(match.group(2)) if match.group(2) else 0
+        sec = float(match.group(3)) if match.group(3) else 0
+        dir_ = match.group(4).upper() if match.group(4) else None
+
+        decimal = deg + min_/60 + sec/3600
+
+        if dir_ in ["S", "W"]:
+            decimal = -decimal
+
+        return decimal
+
+    lat = gmsToDecimal(parts[0])
+    lon = gmsToDecimal(parts[1])
+    return {"lat": lat, "lon": lon}
+
+
+def parse_year_original(year_str):
+    """parse_year original (referencia)."""
+    if not year_str or pd.isna(year_str):
+        return None
+    match = re.match(r"(\d{3,4})", str(year_str))
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def normalizar_masa_original(masa):
+    """normalizar_masa original (referencia): cadena de replace/endswith por llamada."""
+    if masa is None or (isinstance(masa, float) and pd.isna(masa)):
+        return None
+
+    if not isinstance(masa, str):
+        masa = str(masa)
+
+    masa = masa.strip().lower().replace(",", ".").replace(" ", "")
+
+    if masa.endswith("mg"):
+        masa = masa.replace("mg", "")
+        factor = 0.001
+    elif masa.endswith("kg"):
+        masa = masa.replace("kg", "")
+        factor = 1000.0
+    elif masa.endswith("t") or masa.endswith("ton") or masa.endswith("tonne"):
+        masa = masa.replace("t", "").replace("ton", "").replace("tonne", "")
+        factor = 1_000_000.0
+    elif masa.endswith("g"):
+        masa = masa.replace("g", "")
+        factor = 1.0
+    else:
+        factor = 1.0
+
+    try:
+        valor = float(masa)
+        return round(valor * factor, 3)
+    except ValueError:
+        return None
+
+
+def limpiar_original(df):
+    """Bucle original de crear_csv_limpio_separado (referencia): literal_eval + iterrows."""
+    import ast
+
+    def parse_coords_safe(text):
+        if not text or not isinstance(text, str):
+            return None, None
+        coords = parse_coordinates_original(text)
+        return coords["lat"], coords["lon"]
+
+    def safe_eval(value):
+        try:
+            if isinstance(value, str) and value.startswith("{"):
+                return ast.literal_eval(value)
+        except Exception:
+            pass
+        return value
+
+    def safe_dict(value):
+        return value if isinstance(value, dict) else {}
+
+    df = df.copy()
+    for col in ["basic_info", "classification", "geography", "Data_MB109", "images"]:
+        if col in df.columns:
+            df[col] = df[col].apply(safe_eval)
+
+    clean_rows = []
+    for _, row in df.iterrows():
+        basic_info = safe_dict(row.get("basic_info", {}))
+        classification = safe_dict(row.get("classification", {}))
+        geography = safe_dict(row.get("geography", {}))
+        Data_MB109 = safe_dict(row.get("Data_MB109", {}))
+
+        year_value = parse_year_original(basic_info.get("Year fell")) or parse_year_original(basic_info.get("Year found"))
+        try:
+            basic_yearFound = int(year_value)
+        except (TypeError, ValueError):
+            basic_yearFound = None
+
+        coordExactText = geography.get("Catalogue of Meteorites")
+        coordRecomendText = geography.get("Recommended")
+        latExact, lonExact = parse_coords_safe(coordExactText)
+        latRecomend, lonRecomend = parse_coords_safe(coordRecomendText)
+        if not basic_yearFound or (
+            latExact is None and lonExact is None and latRecomend is None and lonRecomend is None
+        ):
+            continue
+
+        clean_row = {
+            "Name": str(row.get("Name", "")).replace("**", "").strip(),
+            "Year": int(parse_year_original(row.get("Year"))) if parse_year_original(row.get("Year")) else None,
+            "Mass": normalizar_masa_original(row.get("Mass")),
+            "Country": row.get("Country"),
+            "Type": row.get("Type"),
+            "Place": row.get("Place"),
+            "Status": row.get("Status"),
+            "Fall": row.get("Fall"),
+            "basic_name": basic_info.get("Name"),
+            "basic_abbrev": basic_info.get("Abbreviation"),
+            "basic_fall": basic_info.get("Observed fall"),
+            "basic_yearFound": basic_yearFound,
+            "basic_country": basic_info.get("Country"),
+            "classification_recomend": classification.get("Recommended"),
+            "coordinadesExact": coordExactText,
+            "coordinadesLat": round(latExact, 1) if latExact is not None else None,
+            "coordinadesLon": round(lonExact, 1) if lonExact is not None else None,
+            "coordinadesRecomend": coordRecomendText,
+            "coordinadesLatRecomend": round(latRecomend, 1) if latRecomend is not None else None,
+            "coordinadesLonRecomend": round(lonRecomend, 1) if lonRecomend is not None else None,
+            "DataMB109_Lat": Data_MB109.get("Latitude"),
+            "DataMB109_Lon": Data_MB109.get("Longitude"),
+            "DataMB109_Mass": Data_MB109.get("Mass (g)"),
+            "DataMB109_Piece": Data_MB109.get("Pieces"),
+            "DataMB109_Class": Data_MB109.get("Class"),
+            "DataMB109_Weathering": Data_MB109.get("Weathering grade"),
+            "DataMB109_Fayalite": Data_MB109.get("Fayalite (mol%)"),
+            "DataMB109_Ferrosilite": Data_MB109.get("Ferrosilite (mol%)"),
+            "DataMB109_Classifier": Data_MB109.get("Classifier"),
+            "DataMB109_Main_mass": Data_MB109.get("Main mass"),
+            "DataMB109_Coments": Data_MB109.get("Comments"),
+        }
+
+        imagenes = safe_dict(row.get("images", {}))
+        fotos_info = []
+        if "fotos" in imagenes and isinstance(imagenes["fotos"], list):
+            for f in imagenes["fotos"]:
+                if isinstance(f, dict):
+                    fotos_info.append(
+                        f"{f.get('autor', 'Desconocido')} | {f.get('referencia', 'No hay información')} | {f.get('foto_original', 'No hay información')}"
+                    )
+        else:
+            fotos_info = ["No hay información"]
+
+        clean_row.update({
+            "historia": row.get("historia", "No hay información"),
+            "importancia": row.get("importancia", "No hay información"),
+            "descubrimiento": row.get("descubrimiento", "No hay información"),
+            "impacto": row.get("impacto", "No hay información"),
+            "references": row.get("references", "No hay información"),
+            "fotos": "; ".join(fotos_info)
+        })
+        clean_rows.append(clean_row)
+
+    return pd.DataFrame(clean_rows)
+
+
+# -------------------------------------------------------------------
+# Selección de iniciar_procesamiento
+# -------------------------------------------------------------------
+
+def seleccion_original(coincidencias, filtros_personales, cuadratica=True):
+    """
+    Filtros de iniciar_procesamiento antes de SeleccionMeteoritos (referencia).
+    cuadratica=False cambia solo la búsqueda por nombre de no_cumple por la
+    máscara (misma memoria, para medir tamaños grandes).
+    """
+    df = pd.DataFrame(coincidencias)
+    df["Mass_num"] = df["mass"].apply(
+        lambda x: float(x) if str(x).replace(".", "", 1).isdigit() else 0
+    )
+    df["Year_num"] = df["year"].apply(
+        lambda y: int(y) if str(y).isdigit() else 0
+    )
+
+    df["Mass_num"] = pd.to_numeric(df.get("mass", 0), errors="coerce").fillna(0)
+
+    df["tiene_fotos"] = df["metBull_fotos"].apply(lambda fotos: bool(fotos and len(fotos) > 0))
+
+    cumple_criterios = df[
+        (df["Mass_num"] >= 4000) | (df["tiene_fotos"])
+    ].to_dict(orient="records")
+
+    if cuadratica:
+        no_cumple = df[~df.index.isin(
+            [df.index[df["name"] == c["name"]][0] for c in cumple_criterios]
+        )].to_dict(orient="records")
+    else:
+        no_cumple = df[~((df["Mass_num"] >= 4000) | (df["tiene_fotos"]))].to_dict(orient="records")
+
+    especiales = []
+    if filtros_personales:
+        palabras = [p.lower() for p in filtros_personales]
+        especiales = [c for c in coincidencias if any(p in c["name"].lower() for p in palabras)]
+    return {"cumplen": cumple_criterios, "no_cumplen": no_cumple, "especiales": especiales}
+
+
+# -------------------------------------------------------------------
+# unir_datos con un dict por registro
+# -------------------------------------------------------------------
+
+def unir_datos_original(meteoritos, eventos, metrica="grados", motor="vectorizado"):
+    """
+    unir_datos antes de MeteoritoUnido: un dict literal por registro (referencia).
+    Une cada meteorito con el evento NASA más cercano (±1 año).
+      - metrica: 'grados' (euclídea, < 0.5°) o 'haversine' (km, < RADIO_KM).
+      - motor: 'vectorizado' (NumPy por bloques) o 'indice' (rejilla en Python puro,
+        solo métrica 'grados').
+    """
+    coincidencias = []
+    usados = set()  # IDs o índices de eventos NASA ya emparejados
+
+    if motor == "vectorizado":
+        emparejados = emparejar_vectorizado(meteoritos, eventos, metrica=metrica)
+    elif motor == "indice" and metrica == "grados":
+        # Índice espacial: coordenadas y años de los eventos se parsean una sola vez
+        indice = IndiceEventos(eventos)
+        emparejados = [indice.mas_cercano(m)[0] for m in meteoritos]
+    else:
+        raise ValueError(f"Combinación no soportada: motor={motor}, metrica={metrica}")
+
+    for m, match_idx in zip(meteoritos, emparejados):
+        # Evento más cercano cuyo año concuerda (±1)
+        match_encontrado = None
+        if match_idx is not None and match_idx >= 0:
+            match_idx = int(match_idx)
+            match_encontrado = eventos[match_idx]
+
+        fotos_raw = m.get("fotos", "")
+        fotos_limpias = []
+        if isinstance(fotos_raw, str) and fotos_raw.strip():
+            fotos_list = [f.strip() for f in fotos_raw.split(";") if f.strip()]
+            for f in fotos_list:
+                partes = [p.strip() for p in f.split("|")]
+                fotos_limpias.append({
+                    "autor": partes[0] if len(partes) > 0 else "Desconocido",
+                    "referencia": partes[1] if len(partes) > 1 else "No especificado",
+                    "link": partes[2] if len(partes) > 2 else "Sin enlace"
+                })
+
+        # Datos base
+        data = {
+            "name": m.get("Name", ""),
+            "status": m.get("Status", ""),
+            "fall": m.get("Fall", ""),
+            "year": m.get("Year", ""),
+            "place": m.get("Place", ""),
+            "type": m.get("Type", ""),
+            "mass": m.get("Mass", ""),
+            "country": m.get("Country", ""),
+            "basic_name": m.get("basic_name", ""),
+            "basic_abbrev": m.get("basic_abbrev", ""),
+            "basic_fall": m.get("basic_fall", ""),
+            "basic_yearFound": m.get("basic_yearFound", ""),
+            "basic_country": m.get("basic_country", ""),
+            "classification": m.get("classification_recomend", ""),
+            "coordinadesExact": m.get("coordinadesExact", ""),
+            "coordinadesLat": m.get("coordinadesLat", ""),
+            "coordinadesLon": m.get("coordinadesLon", ""),
+            "coordinadesRecomend": m.get("coordinadesRecomend", ""),
+            "coordinadesLatRecomend": m.get("coordinadesLatRecomend", ""),
+            "coordinadesLonRecomend": m.get("coordinadesLonRecomend", ""),
+            "dataMB109_Lat": m.get("DataMB109_Lat", ""),
+            "dataMB109_Lon": m.get("DataMB109_Lon", ""),
+            "dataMB109_Mass": m.get("DataMB109_Mass", ""),
+            "dataMB109_Piece": m.get("DataMB109_Piece", ""),
+            "dataMB109_Class": m.get("DataMB109_Class", ""),
+            "dataMB109_Weathering": m.get("DataMB109_Weathering", ""),
+            "dataMB109_Fayalite": m.get("DataMB109_Fayalite", ""),
+            "dataMB109_Ferrosilite": m.get("DataMB109_Ferrosilite", ""),
+            "dataMB109_Classifier": m.get("DataMB109_Classifier", ""),
+            "dataMB109_Main_mass": m.get("DataMB109_Main_mass", ""),
+            "dataMB109_Coments": m.get("DataMB109_Coments", ""),
+            "impact_date": "",
+            "impact_lat": "",
+            "impact_lon": "",
+            "impact_alt": "",
+            "impact_vel": "",
+            "impact_energy": "",
+            "impact_e": "",
+            "metBull_fotos": fotos_limpias,
+        }
+
+        # Si hay coincidencia NASA → se completan campos
+        if match_encontrado:
+            data.update({
+                "impact_date": match_encontrado.get("date", ""),
+                "impact_lat": match_encontrado.get("lat", ""),
+                "impact_lon": match_encontrado.get("lon", ""),
+                "impact_alt": match_encontrado.get("alt", ""),
+                "impact_vel": match_encontrado.get("vel", ""),
+                "impact_energy": match_encontrado.get("energy", ""),
+                "impact_e": match_encontrado.get("impact_e", ""),
+            })
+            usados.add(match_idx)
+
+        coincidencias.append(data)
+
+    # 🔹 Agregar impactos NASA sin coincidencias
+    sin_match = [e for i, e in enumerate(eventos) if i not in usados]
+    for i, e in enumerate(sin_match, start=1):
+        coincidencias.append({
+            "name": f"Impacto {i}",
+            "status": "Desconocido",
+            "fall": "",
+            "year": e.get("date", "")[:4] if e.get("date") else "",
+            "place": "No identificado",
+            "type": "",
+            "mass": "",
+            "country": "",
+            "basic_name": "",
+            "basic_abbrev": "",
+            "basic_fall": "",
+            "basic_yearFound": "",
+            "basic_country": "",
+            "classification": "No hay información",
+            "coordinadesExact": "",
+            "coordinadesLat": e.get("lat", ""),
+            "coordinadesLon": e.get("lon", ""),
+            "coordinadesRecomend": "",
+            "coordinadesLatRecomend": "",
+            "coordinadesLonRecomend": "",
+            "dataMB109_Lat": "",
+            "dataMB109_Lon": "",
+            "dataMB109_Mass": "",
+            "dataMB109_Piece": "",
+            "dataMB109_Class": "",
+            "dataMB109_Weathering": "",
+            "dataMB109_Fayalite": "",
+            "dataMB109_Ferrosilite": "",
+            "dataMB109_Classifier": "",
+            "dataMB109_Main_mass": "",
+            "dataMB109_Coments": "Solo se tiene registro del impacto, sin meteorito asociado.",
+            "impact_date": e.get("date", ""),
+            "impact_lat": e.get("lat", ""),
+            "impact_lon": e.get("lon", ""),
+            "impact_alt": e.get("alt", ""),
+            "impact_vel": e.get("vel", ""),
+            "impact_energy": e.get("energy", ""),
+            "impact_e": e.get("impact_e", ""),
+            "metBull_fotos": [],
+        })
+
+    total = len(coincidencias)
+    con_match = sum(1 for c in coincidencias if c["impact_date"])
+    print(f"✅ {total} registros procesados — {con_match} con datos NASA (incluidos impactos sin meteorito)")
+
+    return coincidencias
@@ -0,0 +1,46 @@
+import os
+import stat
+
+import pytest
+
+from AlmacenJsonl import EscritorJsonl, compactar
+
+# -------------------------------------------------------------------
+# Compactación atómica: los archivos exportados conservan sus permisos
+# -------------------------------------------------------------------
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="permisos POSIX")
+
+
+def _permisos(ruta):
+    return stat.S_IMODE(os.stat(ruta).st_mode)
+
+
+def _jsonl(tmp_path):
+    ruta = str(tmp_path / "meteoritos.jsonl")
+    with EscritorJsonl(ruta) as escritor:
+        escritor.escribir({"name": "Hoba", "year": "1920"})
+    return ruta
+
+
+def test_exportacion_nueva_sigue_la_umask(tmp_path):
+    ruta_json = str(tmp_path / "meteoritos.json")
+    anterior = os.umask(0o022)
+    try:
+        compactar(_jsonl(tmp_path), ruta_json)
+    finally:
+        os.umask(anterior)
+    # Legible por otros usuarios (ImportJsontoSql.js), como con open(..., "w")
+    assert _permisos(ruta_json) == 0o644
+
+
+def test_exportacion_existente_conserva_sus_permisos(tmp_path):
+    ruta_jsonl = _jsonl(tmp_path)
+    ruta_json = str(tmp_path / "meteoritos.json")
+    with open(ruta_json, "w") as f:
+        f.write("[]")
+    os.chmod(ruta_json, 0o664)
+    os.chmod(ruta_jsonl, 0o640)
+    compactar(ruta_jsonl, ruta_json)
+    assert _permisos(ruta_json) == 0o664
+    assert _permisos(ruta_jsonl) == 0o640
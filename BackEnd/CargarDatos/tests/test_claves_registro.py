@@ -0,0 +1,67 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+import pytest
+
+from AlmacenJsonl import EscritorJsonl, compactar, leer_jsonl, normalizar_anio
+from RegistroTrabajo import RegistroTrabajo, clave
+
+# -------------------------------------------------------------------
+# Claves (name, year): el mismo año leído como entero o como float
+# -------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("anio, esperado", [
+    (873, "873"), (873.0, "873"), ("873", "873"), ("873.0", "873"), (" 873.00 ", "873"), (-5.0, "-5"),
+    ("", ""), (None, "None"), ("12.5", "12.5"), ("ca. 1900", "ca. 1900"), (float("nan"), "nan"),
+])
+def test_normalizar_anio(anio, esperado):
+    assert normalizar_anio(anio) == esperado
+
+
+def test_compactar_une_formatos_del_anio(tmp_path):
+    ruta = str(tmp_path / "meteoritos.jsonl")
+    with EscritorJsonl(ruta) as escritor:
+        escritor.escribir({"name": "Hoba", "year": "1920.0", "ia_historia": "vieja"})
+        escritor.escribir({"name": "Hoba", "year": 1920, "ia_historia": "nueva"})
+        escritor.escribir({"name": "Allende", "year": "1969"})
+    assert compactar(ruta) == 2
+    assert [r.get("ia_historia") for r in leer_jsonl(ruta)] == ["nueva", None]
+
+
+def _huella_sin_normalizar(registro):
+    base = {k: v for k, v in registro.items() if not k.startswith("ia_")}
+    return hashlib.sha256(json.dumps(base, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+def test_registro_migra_claves_y_conserva_progreso(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite")
+    RegistroTrabajo(ruta).cerrar()
+
+    # Filas de la versión anterior: año como float y huella sin normalizar
+    anteriores = [{"name": "Hoba", "year": "1920.0", "mass": "60 t"}, {"name": "Gibeon", "year": "1836.0"},
+                  {"name": "Gibeon", "year": "1836"}]
+    con = sqlite3.connect(ruta)
+    for i, r in enumerate(anteriores):
+        con.execute("INSERT INTO registros (name, year, huella, tipo, etapa, resultado, actualizado) "
+                    "VALUES (?, ?, ?, 'criterios', 'enriquecido', ?, ?)",
+                    (r["name"], r["year"], _huella_sin_normalizar(r), "0" * 64, time.time() + i))
+    con.commit()
+    con.close()
+
+    registro = RegistroTrabajo(ruta)
+    try:
+        filas = registro._con.execute("SELECT name, year FROM registros ORDER BY name").fetchall()
+        assert filas == [("Gibeon", "1836"), ("Hoba", "1920")]
+
+        # Los mismos datos con el año entero no se vuelven a procesar; los cambiados sí
+        assert registro.registrar_unidos([{"name": "Hoba", "year": "1920", "mass": "60 t"},
+                                          {"name": "Gibeon", "year": 1836}], "criterios") == []
+        cambiado = {"name": "Hoba", "year": 1920.0, "mass": "66 t"}
+        assert registro.registrar_unidos([cambiado], "criterios") == [cambiado]
+        assert registro.estado({"name": "Hoba", "year": "1920"})["etapa"] == "unido"
+        assert clave(cambiado) == ("Hoba", "1920")
+    finally:
+        registro.cerrar()
@@ -0,0 +1,34 @@
+import DatosEnriquesidos as de
+from MeteoritoUnido import MeteoritoUnido
+
+# -------------------------------------------------------------------
+# Enriquecimiento: el registro unido llega a la IA con su nombre
+# -------------------------------------------------------------------
+
+RELLENO = " ".join(f"The city council approved budget item number {i} for the park." for i in range(12))
+TEXTO_WEB = (f"---\nFuente: https://ejemplo.org/noticias\n{RELLENO}\n"
+             f"---\nFuente: https://ejemplo.org/chelyabinsk\nThe Chelyabinsk stone was recovered by locals.\n")
+
+
+class _PlanificadorFalso:
+    def __init__(self):
+        self.llamadas = []
+
+    def chat(self, prompt, prioridad, etiqueta=None):
+        self.llamadas.append((prompt, etiqueta))
+        return "nombre: Chelyabinsk"
+
+
+def test_registro_unido_da_nombre_al_contexto(monkeypatch):
+    planificador = _PlanificadorFalso()
+    monkeypatch.setattr(de, "planificador_compartido", lambda: planificador)
+    meteorito = MeteoritoUnido(name="Chelyabinsk", year="2013", mass="1 t", country="Russia").copy()
+
+    de.obtener_datos_con_ia(meteorito, TEXTO_WEB, presupuesto_tokens=60)
+
+    (prompt, etiqueta), = planificador.llamadas
+    assert etiqueta == "Chelyabinsk"
+    # Con el presupuesto justo para un fragmento gana el que nombra al meteorito
+    assert "The Chelyabinsk stone was recovered by locals." in prompt
+    assert "budget item" not in prompt
+    assert "nombre: Chelyabinsk\naño: 2013\nmasa: 1 t\npaís: Russia" in prompt
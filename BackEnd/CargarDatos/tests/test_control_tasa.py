@@ -0,0 +1,68 @@
+import asyncio
+
+from ControlTasa import ControladorAIMD
+
+# -------------------------------------------------------------------
+# ControladorAIMD.adquirir_async: huecos en orden de llegada, sin sondeo
+# -------------------------------------------------------------------
+
+
+def _controlador():
+    # Ventana fija de un hueco y tasa alta: solo cuenta la concurrencia
+    return ControladorAIMD("prueba", concurrencia_inicial=1, concurrencia_max=1,
+                           tasa_inicial=1000.0, tasa_max=1000.0)
+
+
+def test_huecos_en_orden_de_llegada():
+    async def principal():
+        controlador, orden = _controlador(), []
+
+        async def peticion(i):
+            async with controlador.permiso_async() as r:
+                orden.append(i)
+                await asyncio.sleep(0.005)
+                r["status"] = 200
+
+        await asyncio.gather(*(peticion(i) for i in range(20)))
+        return orden
+
+    assert asyncio.run(principal()) == list(range(20))
+
+
+def test_espera_sin_sondeo():
+    async def principal():
+        controlador = _controlador()
+        consultas = 0
+        espera_original = controlador._espera
+
+        def espera_contada(ahora):
+            nonlocal consultas
+            consultas += 1
+            return espera_original(ahora)
+
+        controlador._espera = espera_contada
+        await controlador.adquirir_async()
+        esperando = asyncio.create_task(controlador.adquirir_async())
+        await asyncio.sleep(0.5)
+        controlador.liberar(200)
+        await asyncio.wait_for(esperando, 1)
+        return consultas
+
+    # Una consulta para el primero y dos para el segundo (al llegar y al liberarse)
+    assert asyncio.run(principal()) == 3
+
+
+def test_cancelar_el_primero_pasa_el_turno():
+    async def principal():
+        controlador = _controlador()
+        await controlador.adquirir_async()
+        primero = asyncio.create_task(controlador.adquirir_async())
+        segundo = asyncio.create_task(controlador.adquirir_async())
+        await asyncio.sleep(0.01)
+        primero.cancel()
+        await asyncio.sleep(0.01)
+        controlador.liberar(200)
+        await asyncio.wait_for(segundo, 1)
+        return controlador.en_curso, len(controlador._turnos)
+
+    assert asyncio.run(principal()) == (1, 0)
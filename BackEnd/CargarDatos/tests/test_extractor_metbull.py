@@ -0,0 +1,31 @@
+import os
+
+from ExtractorMetbull import extraer_bs4, extraer_lxml
+
+# -------------------------------------------------------------------
+# Fichas de detalle MetBull: motor lxml vs BeautifulSoup
+# -------------------------------------------------------------------
+# tests/datos/ficha_metbull.html sigue el diseño de las fichas del LPI, con
+# <script>/<style> dentro de las celdas que se extraen (get_text() de bs4
+# no los incluye). Para comparar con páginas reales guardadas en la caché:
+# `python -m benchmarks parseo --desde-cache`.
+
+FICHA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "ficha_metbull.html")
+
+with open(FICHA, encoding="utf-8") as f:
+    HTML = f.read()
+
+
+def test_lxml_igual_a_bs4():
+    assert extraer_lxml(HTML) == extraer_bs4(HTML)
+
+
+def test_texto_sin_script_ni_style():
+    datos, fotos = extraer_lxml(HTML)
+    assert datos["historia"] == ("A bright fireball was observed over the Chelyabinsk region at 09:20 local time. "
+                                 "The shock wave broke windows in the city; about 1500 people were injured. "
+                                 "Enable JavaScript to see the fall map. Fragments were recovered from Lake Chebarkul.")
+    assert datos["references"] == "Meteoritical Bulletin, no. 102, MAPS 48, 2013."
+    assert datos["geography"]["Coordinates"] == "54° 49' N, 61° 7' E"
+    assert datos["classification"] == {"Recommended": "LL5"}
+    assert len(fotos) == 2
@@ -0,0 +1,58 @@
+import pytest
+
+from IndiceMetbull import IndiceMetbull, bajas_sospechosas, comparar_listado, huella_fila
+
+# -------------------------------------------------------------------
+# Crawl incremental: comparación del listado con el índice y bajas
+# -------------------------------------------------------------------
+
+
+def _fila(name, anio="2000", href=True):
+    fila = {"Name": name, "Year": anio}
+    if href:
+        fila["_href"] = f"/meteor/metbull.php?code={name}"
+    return fila
+
+
+def _indice(tmp_path, filas, pais="Chile"):
+    indice = IndiceMetbull(str(tmp_path / "indice.sqlite"))
+    indice.actualizar(pais, [(f["Name"], f.get("_href"), huella_fila(f)) for f in filas])
+    return indice
+
+
+def test_comparar_listado(tmp_path):
+    anteriores = [_fila("A"), _fila("B"), _fila("C")]
+    indice = _indice(tmp_path, anteriores)
+    try:
+        previas = {f["Name"]: {**f, "historia": "ficha"} for f in anteriores}
+        rows = [_fila("A"), _fila("B", anio="2001"), _fila("D")]
+        filas, a_descargar, huellas, cuenta = comparar_listado(rows, indice.conocidos("Chile"), previas)
+    finally:
+        indice.cerrar()
+    assert dict(cuenta) == {"sin cambios": 1, "cambiadas": 1, "nuevas": 1, "eliminadas": 1}
+    assert filas[0]["historia"] == "ficha"
+    assert [f["Name"] for f in a_descargar] == ["B", "D"]
+    assert [name for name, _, _ in huellas] == ["A", "B", "D"]
+    assert not bajas_sospechosas(cuenta)
+
+
+@pytest.mark.parametrize("nombres, sospechoso", [
+    ([], True),                     # página sin filas: todas de baja
+    (["A"], True),                  # deja fuera 3 de 4
+    (["A", "B"], False),            # la mitad: se acepta
+    (["A", "B", "C", "X"], False),
+])
+def test_bajas_sospechosas(tmp_path, nombres, sospechoso):
+    conocidas = [_fila(n) for n in "ABCD"]
+    indice = _indice(tmp_path, conocidas)
+    try:
+        _, _, _, cuenta = comparar_listado([_fila(n) for n in nombres], indice.conocidos("Chile"),
+                                           {f["Name"]: f for f in conocidas})
+    finally:
+        indice.cerrar()
+    assert bajas_sospechosas(cuenta) is sospechoso
+
+
+def test_pais_nuevo_sin_bajas():
+    _, _, _, cuenta = comparar_listado([], {}, {})
+    assert not bajas_sospechosas(cuenta)
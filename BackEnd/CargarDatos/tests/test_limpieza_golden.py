@@ -0,0 +1,45 @@
+import os
+import shutil
+
+import pytest
+
+import AlmacenColumnar as ac
+from DatosxPaisMetbull import crear_csv_limpio_separado
+
+# -------------------------------------------------------------------
+# Limpieza MetBull contra un archivo dorado
+# -------------------------------------------------------------------
+# tests/datos/meteoritos_Metbull_PreLimpieza.csv es una muestra chica con los
+# casos raros del catálogo (años con texto, masas sin unidad o ilegibles,
+# coordenadas DMS/decimales, dicts anidados vacíos); meteoritos_Metbull.csv
+# es la salida del bucle original (iterrows + literal_eval) para esa entrada.
+# La limpieza vectorizada debe producir el mismo CSV byte a byte.
+
+DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+ENTRADA = os.path.join(DATOS, "meteoritos_Metbull_PreLimpieza.csv")
+ESPERADO = os.path.join(DATOS, "meteoritos_Metbull.csv")
+
+
+def _leer(ruta):
+    with open(ruta, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    shutil.copy(ENTRADA, tmp_path / "meteoritos_Metbull_PreLimpieza.csv")
+    return str(tmp_path)
+
+
+def test_csv_limpio_identico_desde_csv(directorio):
+    crear_csv_limpio_separado(directorio)
+    assert _leer(os.path.join(directorio, "meteoritos_Metbull.csv")) == _leer(ESPERADO)
+
+
+@pytest.mark.skipif(not ac.disponible(), reason="pyarrow no está instalado")
+def test_csv_limpio_identico_desde_parquet(directorio):
+    base = os.path.join(directorio, "meteoritos_Metbull_PreLimpieza")
+    ac.guardar_tabla(ac.leer_tabla(base, esquema=ac.COLUMNAS_PRELIMPIEZA), base, ac.COLUMNAS_PRELIMPIEZA, csv=False)
+    os.remove(base + ".csv")
+    crear_csv_limpio_separado(directorio)
+    assert _leer(os.path.join(directorio, "meteoritos_Metbull.csv")) == _leer(ESPERADO)
@@ -0,0 +1,120 @@
+import random
+
+import numpy as np
+import pytest
+
+import LimpiezaMetbull as lm
+from tests.referencias import normalizar_masa_original, parse_coordinates_original, parse_year_original
+
+# -------------------------------------------------------------------
+# Parsers de LimpiezaMetbull (memo y vectorizados) vs los originales
+# -------------------------------------------------------------------
+# Prueba de propiedades con generación sembrada: formatos del catálogo más
+# combinaciones aleatorias de trozos que tocan los bordes (signos, unidades,
+# separadores, dígitos no ASCII) y valores que no son texto.
+
+SEMILLAS = [5, 17, 2024]
+CASOS_POR_SEMILLA = 4000
+
+TROZOS = ["12", "3.5", "007", "°", "'", '"', "′", "″", " ", ",", ".", "N", "s", "E", "w", "-", "+",
+          "(", ")", "\\", "nan", "1e3", "1_0", "kg", "mg", "g", "t", "ton", "tonne", "KG", "٣", "\t",
+          "abc", "0", "1999", "ca.", "or", "  "]
+NO_TEXTO = [None, float("nan"), 0, 1999, 1999.0, 2.5, True, ""]
+
+
+def _dms(valor, positivo, negativo):
+    g = abs(valor)
+    return f"{int(g)}° {int(g % 1 * 60)}' {round((g * 3600) % 60, 1)}\"{positivo if valor >= 0 else negativo}"
+
+
+def _coordenada_catalogo(rnd):
+    lat, lon = rnd.uniform(-90, 90), rnd.uniform(-180, 180)
+    return rnd.choice([
+        f"{_dms(lat, 'N', 'S')}, {_dms(lon, 'E', 'W')}",
+        f"({lat:.5f}, {lon:.5f})",
+        f"{abs(lat):.2f} {'N' if lat >= 0 else 'S'} {abs(lon):.2f} {'E' if lon >= 0 else 'W'}",
+        f"{lat:.3f}°N, {lon:.3f}°E",
+        f"{lat:.2f},{lon:.2f}",
+        "Unknown",
+    ])
+
+
+def _anio_catalogo(rnd):
+    return rnd.choice(["{}", "{} or 1999", "({})", "ca. {}", "{}s", ""]).format(rnd.randint(800, 2024))
+
+
+def _masa_catalogo(rnd):
+    formato = rnd.choice(["{:.1f} g", "{:.2f} kg", "{:.0f} mg", "{:.1f} t", "{:.1f}", "{:.1f} ton", "{:,.1f} g"])
+    return formato.format(rnd.uniform(0.1, 50_000))
+
+
+def casos(semilla, catalogo):
+    rnd = random.Random(semilla)
+    aleatorios = ["".join(rnd.choice(TROZOS) for _ in range(rnd.randint(0, 8))) for _ in range(CASOS_POR_SEMILLA)]
+    return [catalogo(rnd) for _ in range(CASOS_POR_SEMILLA // 4)] + aleatorios
+
+
+def mismo_valor(a, b):
+    """Mismo tipo y valor (NaN igual a NaN)."""
+    if type(a) is not type(b):
+        return False
+    return a == b or (isinstance(a, float) and a != a and b != b)
+
+
+def mismo_numero(esperado, valor):
+    """Salida escalar (None/float/int) vs vectorizada (float64, NaN = None)."""
+    if esperado is None:
+        return valor != valor
+    return esperado == valor or (esperado != esperado and valor != valor)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_parseCoordinates_igual_al_original(semilla):
+    lm._coordenadas_memo.cache_clear()
+    for x in casos(semilla, _coordenada_catalogo) + ["", None]:
+        esperado = parse_coordinates_original(x)
+        for _ in range(2):  # sin memo y desde el memo
+            obtenido = lm.parseCoordinates(x)
+            assert all(mismo_valor(esperado[k], obtenido[k]) for k in ("lat", "lon")), x
+            obtenido["lat"] = "modificado"     # el dict devuelto no debe ser el del memo
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_parse_year_igual_al_original(semilla):
+    lm._anio_memo.cache_clear()
+    for x in casos(semilla, _anio_catalogo) + NO_TEXTO:
+        esperado = parse_year_original(x)
+        assert mismo_valor(esperado, lm.parse_year(x)), x
+        assert mismo_valor(esperado, lm.parse_year(x)), x
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_normalizar_masa_igual_al_original(semilla):
+    lm._gramos_memo.cache_clear()
+    for x in casos(semilla, _masa_catalogo) + NO_TEXTO:
+        esperado = normalizar_masa_original(x)
+        assert mismo_valor(esperado, lm.normalizar_masa(x)), x
+        assert mismo_valor(esperado, lm.normalizar_masa(x)), x
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_coordenadas_vectorizadas(semilla):
+    textos = casos(semilla, _coordenada_catalogo) + ["", None]
+    lat, lat_ok, lon, lon_ok = lm.coordenadas(textos)
+    for x, la, lo in zip(textos, np.where(lat_ok, lat, np.nan), np.where(lon_ok, lon, np.nan)):
+        esperado = parse_coordinates_original(x) if isinstance(x, str) else {"lat": None, "lon": None}
+        assert mismo_numero(esperado["lat"], la) and mismo_numero(esperado["lon"], lo), x
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_anios_vectorizados(semilla):
+    valores = casos(semilla, _anio_catalogo) + NO_TEXTO
+    for x, v in zip(valores, lm.anios(valores)):
+        assert mismo_numero(parse_year_original(x), v), x
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_masas_vectorizadas(semilla):
+    valores = casos(semilla, _masa_catalogo) + NO_TEXTO
+    for x, v in zip(valores, lm.masas_en_gramos(valores)):
+        assert mismo_numero(normalizar_masa_original(x), v), x
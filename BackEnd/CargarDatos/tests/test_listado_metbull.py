@@ -0,0 +1,46 @@
+import pytest
+
+from DatosxPaisMetbull import parsear_listado
+
+# -------------------------------------------------------------------
+# Listados por país: tabla de resultados, "sin resultados" y páginas ajenas
+# -------------------------------------------------------------------
+# El aviso de búsqueda vacía de MetBull no se pudo comprobar sin acceso al
+# sitio; los textos de abajo cubren las variantes que acepta el patrón.
+
+LISTADO = """<html><head><title>Meteoritical Bulletin: Search the Database</title></head><body>
+<table border="1">
+<tr><th>Name</th><th>Year</th><th>Mass</th></tr>
+<tr><td><a href="metbull.php?code=57165">Chelyabinsk</a></td><td>2013</td><td>1 t</td></tr>
+<tr><td>Sin enlace</td><td>1990</td><td>5 g</td></tr>
+</table></body></html>"""
+
+
+def _pagina(cuerpo, titulo="Meteoritical Bulletin: Search the Database"):
+    return f"<html><head><title>{titulo}</title></head><body>{cuerpo}</body></html>"
+
+
+def test_listado_con_tabla():
+    filas, enlaces = parsear_listado(LISTADO, "Russia")
+    assert [f["Name"] for f in filas] == ["Chelyabinsk", "Sin enlace"]
+    assert [f["_href"] for f in enlaces] == ["metbull.php?code=57165"]
+
+
+@pytest.mark.parametrize("aviso", [
+    "No meteorites found.", "No records matched your search criteria.",
+    "Your search returned 0 records.", "0 meteorites found",
+])
+def test_sin_resultados_es_listado_vacio(aviso):
+    assert parsear_listado(_pagina(f"<p>{aviso}</p>"), "Tuvalu") == ([], [])
+
+
+@pytest.mark.parametrize("html", [
+    _pagina("<div>Checking if the site connection is secure</div>", titulo="Just a moment..."),
+    _pagina("<h1>503 Service Temporarily Unavailable</h1>", titulo="503"),
+    _pagina("<table><tr><td>Name</td></tr></table>"),      # tabla de resultados con otro diseño
+    "",
+])
+def test_pagina_sin_tabla_falla(html):
+    # Si se devolviera vacía, el país quedaría guardado sin meteoritos y no se reintentaría
+    with pytest.raises(ValueError, match="sin tabla de resultados"):
+        parsear_listado(html, "Russia")
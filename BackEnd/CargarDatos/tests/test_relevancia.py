@@ -0,0 +1,57 @@
+import json
+import os
+import re
+
+import pytest
+
+import Relevancia as rel
+from tests.referencias import (PATRONES_IRRELEVANTES_ORIGINALES, PATRONES_RELEVANTES_ORIGINALES,
+                               relevancia_original)
+
+# -------------------------------------------------------------------
+# Filtro de relevancia contra decisiones congeladas
+# -------------------------------------------------------------------
+# tests/datos/textos_relevancia.json guarda textos con la forma de
+# RegistroTrabajo.textos_web() (páginas de referencia, noticias, tiendas,
+# museos, textos cortos) y la decisión del filtro original para cada uno.
+# `python -m benchmarks relevancia --congelar N` agrega textos del registro.
+
+MUESTRAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "textos_relevancia.json")
+
+with open(MUESTRAS, encoding="utf-8") as f:
+    TEXTOS = json.load(f)
+
+GRUPOS = list(zip(rel.PATRONES_RELEVANTES + rel.PATRONES_IRRELEVANTES,
+                  rel.FRASES_RELEVANTES + rel.FRASES_IRRELEVANTES))
+
+
+def test_patrones_congelados():
+    assert rel.PATRONES_RELEVANTES == PATRONES_RELEVANTES_ORIGINALES
+    assert rel.PATRONES_IRRELEVANTES == PATRONES_IRRELEVANTES_ORIGINALES
+
+
+@pytest.mark.parametrize("patron, frases", GRUPOS)
+def test_frases_son_las_del_patron(patron, frases):
+    assert len(set(frases)) == len(frases)
+    assert all(re.fullmatch(patron, frase) for frase in frases)
+    # Toda coincidencia del patrón empieza con alguna frase de la lista
+    for frase in frases:
+        for inicio in range(len(frase)):
+            m = re.match(patron, frase[inicio:])
+            assert not m or any(frase[inicio:].startswith(f) for f in frases), frase[inicio:]
+
+
+@pytest.mark.parametrize("muestra", TEXTOS, ids=lambda m: m["nombre"] or "sin-nombre")
+def test_decisiones_congeladas(muestra):
+    assert relevancia_original(muestra["texto"], muestra["nombre"]) == muestra["relevante"]
+    assert rel.clasificador.es_relevante(muestra["texto"], muestra["nombre"]) == muestra["relevante"]
+    regex = rel.ClasificadorRelevancia(motor="regex")
+    assert regex.es_relevante(muestra["texto"], muestra["nombre"]) == muestra["relevante"]
+
+
+@pytest.mark.skipif(rel.clasificador.motor == "regex", reason="pyahocorasick no está instalado")
+@pytest.mark.parametrize("muestra", TEXTOS, ids=lambda m: m["nombre"] or "sin-nombre")
+def test_automata_cuenta_como_las_regex(muestra):
+    regex = rel.ClasificadorRelevancia(motor="regex")
+    texto = muestra["texto"].lower()
+    assert rel.clasificador.contar(texto) == regex.contar(texto)
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+import TextoWeb as tw
+from tests.referencias import extraer_original
+
+# -------------------------------------------------------------------
+# Extractor incremental de TextoWeb vs BeautifulSoup (html.parser)
+# -------------------------------------------------------------------
+# HTML aleatorio sembrado con los casos que separan o unen cadenas de texto:
+# elementos vacíos con y sin cierre (<br>, </br>, <br/>), cierres sueltos,
+# <pre>, comentarios, elementos excluidos y espacios de todo tipo.
+
+SEMILLAS = [3, 11, 2024]
+CASOS_POR_SEMILLA = 1000
+
+TROZOS = ["<p>", "</p>", "<br>", "</br>", "<br/>", "</br >", "<div>", "</div>", "<pre>", "</pre>", " ", "\n",
+          "\t", "a", "b c", "  \n ", "<hr>", "</hr>", "<img src=x>", "</img>", "<noscript>", "</noscript>",
+          "<footer>", "</footer>", "<!-- c -->", "<wbr>", "</wbr>", "<article>", "&amp;", "<script>x</script>"]
+
+MODOS = {
+    "basica": dict(etiquetas=("p",), excluidas=tw.EXCLUIDAS_BASICAS, espacios="recortar", limite=5000),
+    "especial": dict(etiquetas=("p", "article", "div", "main"), excluidas=tw.EXCLUIDAS_EXTENDIDAS,
+                     espacios="normalizar", limite=10000),
+}
+
+
+def _comparar(html):
+    for modo, parametros in MODOS.items():
+        esperado = extraer_original(html, especial=modo == "especial")
+        assert tw.extraer_texto(html, **parametros) == esperado, (modo, html)
+
+
+@pytest.mark.parametrize("html", [
+    "<p>a<br>\n\n</br>\n\nb</p>",      # </br> tras <br>: se descarta, la cadena sigue entera
+    "<p>a\n</br>\nb</p>",              # </br> suelto: corta la cadena
+    "<p>a<br/>\n</br>\nb</p>",         # <br/> no espera cierre
+    "<p> </br> </p><p>c</p>",
+    "<p>a<br><br>\n</br></br>\n</br>b</p>",
+])
+def test_cierres_de_elementos_vacios(html):
+    _comparar(html)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_igual_a_beautifulsoup(semilla):
+    rnd = random.Random(semilla)
+    for _ in range(CASOS_POR_SEMILLA):
+        _comparar("".join(rnd.choice(TROZOS) for _ in range(rnd.randint(1, 25))))
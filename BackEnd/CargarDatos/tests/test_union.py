@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from UnionEventos import IndiceEventos, emparejar_vectorizado
+
+# -------------------------------------------------------------------
+# Unión MetBull ↔ CNEOS: los dos motores con datos de borde
+# -------------------------------------------------------------------
+
+
+def _evento(lat, lon, fecha="2013-02-15 03:20:33", lat_dir="", lon_dir=""):
+    return {"date": fecha, "lat": lat, "lat-dir": lat_dir, "lon": lon, "lon-dir": lon_dir}
+
+
+def _meteorito(lat, lon, anio="2013"):
+    return {"Name": "Prueba", "Year": anio, "coordinadesLat": lat, "coordinadesLon": lon}
+
+
+def _por_indice(meteoritos, eventos):
+    indice = IndiceEventos(eventos)
+    return [-1 if i is None else i for i, _ in map(indice.mas_cercano, meteoritos)]
+
+
+def _vectorizado(meteoritos, eventos):
+    return [int(i) for i in emparejar_vectorizado(meteoritos, eventos)]
+
+
+MOTORES = [_por_indice, _vectorizado]
+
+
+@pytest.mark.parametrize("emparejar", MOTORES)
+@pytest.mark.parametrize("lat, lon", [("1e308", "0"), ("0", "-1e308"), ("95", "10"), ("10", "200"),
+                                      ("inf", "0"), ("nan", "0")])
+def test_coordenadas_fuera_de_rango_no_coinciden(emparejar, lat, lon):
+    # Ni como evento ni como meteorito: sin OverflowError al calcular la celda
+    assert emparejar([_meteorito(lat, lon)], [_evento(lat, lon)]) == [-1]
+    assert emparejar([_meteorito(lat, lon), _meteorito("10", "10")],
+                     [_evento("10.1", "10"), _evento(lat, lon)]) == [-1, 0]
+
+
+@pytest.mark.parametrize("emparejar", MOTORES)
+def test_bordes_del_rango_coinciden(emparejar):
+    eventos = [_evento("90", "180"), _evento("-90", "-180")]
+    meteoritos = [_meteorito("89.8", "179.9"), _meteorito("-89.9", "-179.8")]
+    assert emparejar(meteoritos, eventos) == [0, 1]
+
+
+@pytest.mark.parametrize("emparejar", MOTORES + [lambda m, e: _vectorizado(m, pd.DataFrame(e))])
+def test_direcciones_cneos_dan_el_signo(emparejar):
+    # CNEOS publica magnitudes sin signo y el hemisferio en lat-dir / lon-dir
+    eventos = [_evento("54.8", "61.1", lat_dir="N", lon_dir="E"),      # Chelyabinsk
+               _evento("38.1", "64.8", lat_dir="S", lon_dir="W"),
+               _evento("14.8", "142.4", lat_dir="s", lon_dir=" w ")]
+    meteoritos = [_meteorito("54.8", "61.1"), _meteorito("-38.1", "-64.8"), _meteorito("38.1", "64.8"),
+                  _meteorito("-14.8", "-142.4"), _meteorito("14.8", "142.4")]
+    assert emparejar(meteoritos, eventos) == [0, 1, -1, 2, -1]
+
+
+def test_direcciones_con_eventos_tipados():
+    # Parquet de CNEOS: lat/lon float64, direcciones como texto (con nulos)
+    eventos = pd.DataFrame({"date": ["2013-02-15", "2013-02-15"], "lat": [38.1, 10.0], "lat-dir": ["S", None],
+                            "lon": [64.8, 10.0], "lon-dir": ["W", None]})
+    meteoritos = [_meteorito("-38.1", "-64.8"), _meteorito("10", "10")]
+    assert _vectorizado(meteoritos, eventos) == [0, 1]